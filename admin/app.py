@@ -1,33 +1,160 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import requests
+import pyarrow as pa
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from requests.adapters import HTTPAdapter
 import os
+import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from downsample import lttb, merge_ohlc
 
 st.set_page_config(page_title="Coin Predict MVP", layout="wide")
 
 BASE_URL = os.getenv("API_URL", "http://nginx")
+# static_data 볼륨을 직접 마운트한 경우 Arrow 스냅샷을 HTTP 없이 mmap으로 읽음
+LOCAL_STATIC_DIR = os.getenv("LOCAL_STATIC_DIR")
+# Worker와 같은 심볼 목록 설정 파일
+SYMBOLS_FILE = os.getenv(
+    "SYMBOLS_FILE", str(Path(__file__).resolve().parent.parent / "config/symbols.json")
+)
+# 개요 페이지: 전체 심볼 스냅샷을 동시에 가져오는 요청 수 (= 연결 풀 크기)
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))
+# 상세 차트에 그리는 최대 캔들 수 (넘으면 연속된 봉을 합쳐서 그림)
+MAX_CHART_BARS = int(os.getenv("MAX_CHART_BARS", "1500"))
+SPARKLINE_POINTS = 120
+# 갱신 주기 + 여유 (History: 매 분 수집, 예측: 매 정시)
+HISTORY_STALE_MIN = 10
+FORECAST_STALE_MIN = 65
 
 
 @st.cache_data(ttl=60)
-def get_history_data(symbol):
-    """Nginx에서 과거 데이터 정적 파일(SSG) 조회"""
+def load_symbols():
+    """config/symbols.json의 심볼 목록 (Worker가 수집하는 목록과 동일, 1분마다 다시 읽음)"""
+    with open(SYMBOLS_FILE, "r") as f:
+        return json.load(f)["symbols"]
+
+
+@st.cache_resource
+def http_session():
+    """모든 정적 파일 요청이 공유하는 연결 풀 (keep-alive, 병렬 조회 시 FETCH_WORKERS개 연결)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def static_etags():
+    """url -> (ETag, Last-Modified, 파싱 결과) : 스크립트 재실행 사이에도 유지"""
+    return {}
+
+
+def fetch_static(url, parse):
+    """조건부 GET (If-None-Match / If-Modified-Since) -> 바뀌지 않았으면 304로 본문 없이 재사용"""
+    headers = {}
+    cached = static_etags().get(url)
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    response = http_session().get(url, headers=headers, timeout=5)
+    if response.status_code == 304 and cached:
+        return cached[2]
+    response.raise_for_status()
+
+    data = parse(response)
+    static_etags()[url] = (
+        response.headers.get("ETag"),
+        response.headers.get("Last-Modified"),
+        data,
+    )
+    return data
+
+
+def fetch_static_json(url):
+    return fetch_static(url, lambda response: response.json())
+
+
+def read_arrow(source):
+    """
+    Arrow IPC 파일 -> (DataFrame, metadata)
+    source: pa.memory_map 또는 pa.py_buffer (복사 없이 버퍼를 그대로 참조)
+    timestamp/float 타입이 파일에 그대로 있으므로 JSON 파싱 / pd.to_datetime 변환이 없음
+    """
+    with pa.ipc.open_file(source) as reader:
+        table = reader.read_all()
+    metadata = {
+        k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()
+    }
+    return table.to_pandas(), metadata
+
+
+def load_arrow_snapshot(name):
+    if LOCAL_STATIC_DIR:
+        path = os.path.join(LOCAL_STATIC_DIR, name)
+        if os.path.exists(path):
+            with pa.memory_map(path) as source:
+                return read_arrow(source)
+    return fetch_static(
+        f"{BASE_URL}/static/{name}",
+        lambda response: read_arrow(pa.py_buffer(response.content)),
+    )
+
+
+def load_history(symbol):
+    """Nginx에서 과거 데이터 정적 파일(SSG) 조회 -> (DataFrame, 생성 시점), 실패 시 예외"""
+    # 파일명 규칙 적용 (BTC/USDT -> BTC_USDT)
+    safe_symbol = symbol.replace("/", "_")
+    try:
+        df, metadata = load_arrow_snapshot(f"history_{safe_symbol}.arrow")
+        return df, metadata.get("updated_at")
+    except Exception as e:
+        # Arrow 스냅샷이 아직 없으면(이전 버전 Worker) JSON으로 조회
+        print(f"Arrow snapshot unavailable, falling back to JSON: {e}")
+
+    url = f"{BASE_URL}/static/history_{safe_symbol}.json"
+
+    data = fetch_static_json(url)
+    df = pd.DataFrame(data["data"])  # SSG 구조에 맞게 수정
+
+    # 날짜 변환 (ISO 8601 -> datetime)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df, data.get("updated_at")  # 생성 시점 반환
+
+
+def load_forecast(symbol):
+    """Nginx에서 예측 데이터 정적 파일(SSG) 조회 -> (DataFrame, 생성 시점), 실패 시 예외"""
+    safe_symbol = symbol.replace("/", "_")
     try:
-        # 파일명 규칙 적용 (BTC/USDT -> BTC_USDT)
-        safe_symbol = symbol.replace("/", "_")
-        url = f"{BASE_URL}/static/history_{safe_symbol}.json"
+        df, metadata = load_arrow_snapshot(f"prediction_{safe_symbol}.arrow")
+        return df, metadata.get("updated_at")
+    except Exception as e:
+        print(f"Arrow snapshot unavailable, falling back to JSON: {e}")
+
+    url = f"{BASE_URL}/static/prediction_{safe_symbol}.json"
 
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
+    data = fetch_static_json(url)
+    df = pd.DataFrame(data["forecast"])  # SSG 구조에 맞게 수정
 
-        data = response.json()
-        df = pd.DataFrame(data["data"])  # SSG 구조에 맞게 수정
+    # 날짜 변환
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    return df, data.get("updated_at")
 
-        # 날짜 변환 (ISO 8601 -> datetime)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        return df, data.get("updated_at")  # 생성 시점 반환
+
+@st.cache_data(ttl=60)
+def get_history_data(symbol):
+    try:
+        return load_history(symbol)
     except Exception as e:
         st.error(f"Failed to fetch history file: {e}")
         return pd.DataFrame(), None
@@ -35,37 +162,76 @@ def get_history_data(symbol):
 
 @st.cache_data(ttl=60)
 def get_forecast_data(symbol):
-    """Nginx에서 예측 데이터 정적 파일(SSG) 조회"""
     try:
-        safe_symbol = symbol.replace("/", "_")
-        url = f"{BASE_URL}/static/prediction_{safe_symbol}.json"
-
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-
-        data = response.json()
-        df = pd.DataFrame(data["forecast"])  # SSG 구조에 맞게 수정
-
-        # 날짜 변환
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        return df, data.get("updated_at")
+        return load_forecast(symbol)
     except Exception as e:
         st.error(f"Failed to fetch prediction file: {e}")
         return pd.DataFrame(), None
 
 
+def symbol_snapshot(symbol):
+    """
+    개요 페이지의 심볼 1행 (스레드 풀에서 실행되므로 st.* 호출 없이 에러도 행에 담음)
+    30일 종가는 LTTB로 SPARKLINE_POINTS개만 남김
+    """
+    row = {"symbol": symbol, "last": None, "change_24h": None, "trend": []}
+    row.update({"history_updated": None, "forecast_updated": None, "error": ""})
+    try:
+        history_df, row["history_updated"] = load_history(symbol)
+        if not history_df.empty:
+            close = history_df["close"].to_numpy(dtype=np.float64)
+            x = history_df["timestamp"].astype("int64").to_numpy()
+            keep = lttb(x, close, SPARKLINE_POINTS)
+            row["trend"] = close[keep].tolist()
+            row["last"] = close[-1]
+            if len(close) > 24:
+                row["change_24h"] = (close[-1] / close[-25] - 1) * 100
+    except Exception as e:
+        row["error"] = f"history: {e}"
+    try:
+        _, row["forecast_updated"] = load_forecast(symbol)
+    except Exception as e:
+        row["error"] = f"{row['error']} prediction: {e}".strip()
+    return row
+
+
+@st.cache_data(ttl=60)
+def get_overview(symbols):
+    """전체 심볼 스냅샷을 공유 연결 풀(http_session)로 병렬 조회"""
+    http_session()  # 스레드에서 처음 만들지 않도록 미리 생성
+    static_etags()
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        return pd.DataFrame(list(executor.map(symbol_snapshot, symbols)))
+
+
+def age_minutes(updated_at, now):
+    if pd.isna(updated_at) or not updated_at:
+        return None
+    return (now - pd.to_datetime(updated_at)).total_seconds() / 60
+
+
+def freshness_status(history_age, forecast_age):
+    if pd.isna(history_age) or pd.isna(forecast_age):
+        return "⚪ Missing"
+    if history_age < HISTORY_STALE_MIN and forecast_age < FORECAST_STALE_MIN:
+        return "🟢 Healthy"
+    return "🔴 Stale"
+
+
 # 차트 그리기 함수
 def plot_chart(symbol, history_df, forecast_df):
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
     # 과거 데이터 (Candlestick)
+    # History가 길어져도(1년 이상) 캔들은 MAX_CHART_BARS개 이하로 합쳐서 그림
+    chart_df, bars_per_candle = merge_ohlc(history_df, MAX_CHART_BARS)
     fig.add_trace(
         go.Candlestick(
-            x=history_df["timestamp"],
-            open=history_df["open"],
-            high=history_df["high"],
-            low=history_df["low"],
-            close=history_df["close"],
+            x=chart_df["timestamp"],
+            open=chart_df["open"],
+            high=chart_df["high"],
+            low=chart_df["low"],
+            close=chart_df["close"],
             name="History",
         ),
         secondary_y=False,
@@ -109,8 +275,10 @@ def plot_chart(symbol, history_df, forecast_df):
             secondary_y=False,
         )
 
+    days = (history_df["timestamp"].iloc[-1] - history_df["timestamp"].iloc[0]).days
+    merged = f", {bars_per_candle} bars/candle" if bars_per_candle > 1 else ""
     fig.update_layout(
-        title=f"{symbol} Price Analysis (30 Days + 24h Forecast)",
+        title=f"{symbol} Price Analysis ({days} Days{merged} + 24h Forecast)",
         xaxis_title="Time (UTC)",
         yaxis_title="Price (USDT)",
         height=600,
@@ -121,91 +289,159 @@ def plot_chart(symbol, history_df, forecast_df):
     return fig
 
 
+def show_overview(symbols):
+    """전체 심볼 가격 추이(스파크라인) / 최근 가격 / 정적 파일 신선도"""
+    st.subheader("🗂️ Overview")
+    with st.spinner(f"Fetching {len(symbols)} symbols..."):
+        overview = get_overview(tuple(symbols))
+
+    # 경과 시간은 캐시(1분)와 상관없이 화면을 그릴 때 계산
+    now = pd.Timestamp.now(tz="UTC")
+    overview["history_age"] = [age_minutes(t, now) for t in overview["history_updated"]]
+    overview["forecast_age"] = [
+        age_minutes(t, now) for t in overview["forecast_updated"]
+    ]
+    overview["status"] = [
+        freshness_status(h, f)
+        for h, f in zip(overview["history_age"], overview["forecast_age"])
+    ]
+
+    counts = overview["status"].value_counts()
+    cols = st.columns(3)
+    cols[0].metric("Healthy", int(counts.get("🟢 Healthy", 0)))
+    cols[1].metric("Stale", int(counts.get("🔴 Stale", 0)))
+    cols[2].metric("Missing", int(counts.get("⚪ Missing", 0)))
+
+    st.dataframe(
+        overview[
+            [
+                "status",
+                "symbol",
+                "last",
+                "change_24h",
+                "trend",
+                "history_age",
+                "forecast_age",
+                "error",
+            ]
+        ],
+        column_config={
+            "status": "Status",
+            "symbol": "Symbol",
+            "last": st.column_config.NumberColumn("Last", format="%.4f"),
+            "change_24h": st.column_config.NumberColumn("24h", format="%.2f%%"),
+            "trend": st.column_config.LineChartColumn("30 Days", width="medium"),
+            "history_age": st.column_config.NumberColumn(
+                "History (min ago)", format="%.0f"
+            ),
+            "forecast_age": st.column_config.NumberColumn(
+                "Forecast (min ago)", format="%.0f"
+            ),
+            "error": "Error",
+        },
+        hide_index=True,
+        width="stretch",
+    )
+
+
+def show_detail(symbol):
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        st.subheader(f"📊 {symbol} Market Status")
+
+        # API 호출
+        with st.spinner("Calling API Server..."):
+            history_df, h_updated = get_history_data(symbol)
+            forecast_df, f_updated = get_forecast_data(symbol)
+
+        if not history_df.empty:
+            # KPI 계산
+            last_close = history_df.iloc[-1]["close"]
+            prev_close = history_df.iloc[-2]["close"]
+            change = last_close - prev_close
+            change_pct = (change / prev_close) * 100
+
+            # 차트 그리기
+            fig = plot_chart(symbol, history_df, forecast_df)
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.warning("No historical data found. Please check Ingest Worker.")
+
+    with col2:
+        st.subheader("System Metrics")
+        if not history_df.empty:
+            st.metric("Current Price", f"${last_close:,.2f}", f"{change_pct:.2f}%")
+
+        st.divider()
+
+        st.subheader("Freshness Check")
+        # '데이터 생성 시점'을 표시
+        if f_updated:
+            # UTC 시간 문자열 파싱
+            diff_minutes = age_minutes(f_updated, pd.Timestamp.now(tz="UTC"))
+
+            st.write(f"Updated: {f_updated}")
+
+            if diff_minutes < FORECAST_STALE_MIN:  # 1시간 + 5분 여유
+                st.success(f"Healthy ({int(diff_minutes)} min ago)")
+            else:
+                st.error(f"Stale Data ({int(diff_minutes)} min ago)")
+        else:
+            st.error("Time info missing")
+
+        if not forecast_df.empty:
+            last_pred = forecast_df.iloc[-1]["price"]
+            start_pred = forecast_df.iloc[0]["price"]
+            pred_change = last_pred - start_pred
+
+            st.write("Next 24h Trend:")
+            if pred_change > 0:
+                st.success(f"📈 +${pred_change:,.2f}")
+            else:
+                st.error(f"📉 -${abs(pred_change):,.2f}")
+
+    with st.expander("View Raw JSON Content"):
+        st.json(
+            {
+                "history_tail": (
+                    history_df.tail(2).to_dict(orient="records")
+                    if not history_df.empty
+                    else {}
+                ),
+                "forecast_head": (
+                    forecast_df.head(2).to_dict(orient="records")
+                    if not forecast_df.empty
+                    else {}
+                ),
+                "metadata": {
+                    "history_updated": h_updated,
+                    "forecast_updated": f_updated,
+                },
+            }
+        )
+
+
 # 메인 UI 로직
 st.title("Coin Predict Admin Dashboard")
 st.markdown("코인 예측 모니터링 시스템")
 
 # 사이드바
 st.sidebar.header("Control Panel")
-symbol = st.sidebar.selectbox(
-    "Target Asset", ["BTC/USDT", "ETH/USDT", "XRP/USDT", "SOL/USDT", "DOGE/USDT"]
-)
+try:
+    symbols = load_symbols()
+except (OSError, ValueError, KeyError) as e:
+    st.error(f"심볼 설정 파일을 읽을 수 없습니다 ({SYMBOLS_FILE}): {e}")
+    st.stop()
+page = st.sidebar.radio("View", ["Overview", "Detail"])
+if page == "Detail":
+    symbol = st.sidebar.selectbox("Target Asset", symbols)
 
 if st.sidebar.button("Refresh Data"):
     st.cache_data.clear()  # 캐시 비우기 (새로고침)
 
 # 메인 화면
-col1, col2 = st.columns([3, 1])
-
-with col1:
-    st.subheader(f"📊 {symbol} Market Status")
-
-    # API 호출
-    with st.spinner("Calling API Server..."):
-        history_df, h_updated = get_history_data(symbol)
-        forecast_df, f_updated = get_forecast_data(symbol)
-
-    if not history_df.empty:
-        # KPI 계산
-        last_close = history_df.iloc[-1]["close"]
-        prev_close = history_df.iloc[-2]["close"]
-        change = last_close - prev_close
-        change_pct = (change / prev_close) * 100
-
-        # 차트 그리기
-        fig = plot_chart(symbol, history_df, forecast_df)
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.warning("No historical data found. Please check Ingest Worker.")
-
-with col2:
-    st.subheader("System Metrics")
-    if not history_df.empty:
-        st.metric("Current Price", f"${last_close:,.2f}", f"{change_pct:.2f}%")
-
-    st.divider()
-
-    st.subheader("Freshness Check")
-    # '데이터 생성 시점'을 표시
-    if f_updated:
-        # UTC 시간 문자열 파싱
-        updated_dt = pd.to_datetime(f_updated)
-        now_dt = pd.Timestamp.now(tz="UTC")
-        diff_minutes = (now_dt - updated_dt).total_seconds() / 60
-
-        st.write(f"Updated: {f_updated}")
-
-        if diff_minutes < 65:  # 1시간 + 5분 여유
-            st.success(f"Healthy ({int(diff_minutes)} min ago)")
-        else:
-            st.error(f"Stale Data ({int(diff_minutes)} min ago)")
-    else:
-        st.error("Time info missing")
-
-    if not forecast_df.empty:
-        last_pred = forecast_df.iloc[-1]["price"]
-        start_pred = forecast_df.iloc[0]["price"]
-        pred_change = last_pred - start_pred
-
-        st.write("Next 24h Trend:")
-        if pred_change > 0:
-            st.success(f"📈 +${pred_change:,.2f}")
-        else:
-            st.error(f"📉 -${abs(pred_change):,.2f}")
-
-with st.expander("View Raw JSON Content"):
-    st.json(
-        {
-            "history_tail": (
-                history_df.tail(2).to_dict(orient="records")
-                if not history_df.empty
-                else {}
-            ),
-            "forecast_head": (
-                forecast_df.head(2).to_dict(orient="records")
-                if not forecast_df.empty
-                else {}
-            ),
-            "metadata": {"history_updated": h_updated, "forecast_updated": f_updated},
-        }
-    )
+if page == "Overview":
+    show_overview(symbols)
+else:
+    show_detail(symbol)
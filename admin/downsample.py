@@ -0,0 +1,81 @@
+"""
+차트 렌더링 전 다운샘플링 (그리는 점 수를 화면 해상도 수준으로 제한)
+- merge_ohlc: 연속된 봉 k개를 캔들 1개로 합침 (open=first, high=max, low=min, close=last)
+  -> 고가/저가 꼬리가 사라지지 않으므로 캔들 차트용
+- lttb: Largest-Triangle-Three-Buckets, 선 모양(급등락 지점)을 유지하면서 점 수만 줄임
+  -> 스파크라인 / 라인 차트용
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# 합칠 봉 수 후보 (1h 봉 기준 2h / 3h / 4h / 6h / 8h / 12h / 1d / 2d / 3d 캔들)
+MERGE_FACTORS = (2, 3, 4, 6, 8, 12, 24, 48, 72)
+
+
+def merge_ohlc(df, max_bars):
+    """
+    timestamp(UTC) / open / high / low / close (/ volume) -> 약 max_bars개 이하의 캔들
+    k개씩 합치되 캔들 경계는 시각(epoch 기준 k * 봉 간격)에 맞춤 -> 빠진 봉이 있어도 어긋나지 않음
+    반환: (DataFrame, 캔들 하나에 합쳐진 봉 수)
+    """
+    n = len(df)
+    if n <= max_bars:
+        return df, 1
+
+    ratio = n / max_bars
+    k = next((f for f in MERGE_FACTORS if f >= ratio), math.ceil(ratio))
+    ts = df["timestamp"].astype("int64").to_numpy()
+    step = int(np.median(np.diff(ts)))
+    bucket = ts // (step * k)
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    ends = np.append(starts[1:], n) - 1
+    merged = {
+        "timestamp": pd.to_datetime(
+            bucket[starts] * step * k, unit=df["timestamp"].dt.unit, utc=True
+        ),
+        "open": df["open"].to_numpy()[starts],
+        "high": np.maximum.reduceat(df["high"].to_numpy(), starts),
+        "low": np.minimum.reduceat(df["low"].to_numpy(), starts),
+        "close": df["close"].to_numpy()[ends],
+    }
+    if "volume" in df.columns:
+        merged["volume"] = np.add.reduceat(df["volume"].to_numpy(), starts)
+    return pd.DataFrame(merged), k
+
+
+def lttb(x, y, threshold):
+    """
+    (x, y) 중 threshold개 점의 인덱스 (처음 / 끝 점은 항상 포함)
+    x는 숫자 배열 (timestamp는 int64 epoch 등으로 변환해서 전달)
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # 처음 / 끝 점을 뺀 나머지를 threshold - 2개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 버킷의 평균점 (마지막 버킷이면 끝 점)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        # 이전 선택 점 - 후보 - 다음 버킷 평균점 삼각형 넓이가 가장 큰 후보 선택
+        area = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
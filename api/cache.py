@@ -0,0 +1,87 @@
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+
+
+class TTLCache:
+    """
+    (symbol, measurement, window) -> 조회 결과 캐시
+    - TTL 만료 또는 데이터 버전(Worker가 마지막으로 쓴 시각)이 바뀌면 다시 조회
+    - max_size를 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+    - single-flight: 같은 키로 동시에 들어온 miss는 DB 조회 1번만 수행
+    이벤트 루프 한 곳에서만 쓰므로(프로세스당 1개) 별도 lock 없이 await 사이 구간이 원자적임.
+    """
+
+    def __init__(self, max_size=256, ttl_sec=60):
+        self.max_size = max_size
+        self.ttl_sec = ttl_sec
+        self._entries = OrderedDict()  # key -> (expires_at, version, value)
+        self._flights = {}  # key -> 진행 중인 조회의 asyncio.Future
+        self.counters = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+
+    def _lookup(self, key, version):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, entry_version, value = entry
+        if expires_at <= time.monotonic() or entry_version != version:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key, version, value):
+        self._entries[key] = (time.monotonic() + self.ttl_sec, version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def get(self, key, version):
+        """(hit 여부, 값)"""
+        found, value = self._lookup(key, version)
+        self.counters["hits" if found else "misses"] += 1
+        return found, value
+
+    def put(self, key, version, value):
+        self._store(key, version, value)
+
+    async def get_or_load(self, key, version, loader):
+        """loader: 인자 없는 coroutine 함수"""
+        found, value = self._lookup(key, version)
+        if found:
+            self.counters["hits"] += 1
+            return value
+
+        flight = self._flights.get(key)
+        if flight is None:
+            self.counters["misses"] += 1
+            flight = self._flights[key] = asyncio.ensure_future(loader())
+            flight.add_done_callback(partial(self._finish, key, version))
+        else:
+            self.counters["coalesced"] += 1
+
+        # shield: 요청 하나가 취소(클라이언트 연결 끊김)돼도 공유 조회는 계속 진행
+        return await asyncio.shield(flight)
+
+    def _finish(self, key, version, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # exception()을 읽어두면 기다리는 요청이 없어도 경고가 남지 않음
+        if not flight.cancelled() and flight.exception() is None:
+            self._store(key, version, flight.result())
+
+    def stats(self):
+        lookups = self.counters["hits"] + self.counters["misses"]
+        hit_ratio = self.counters["hits"] / lookups if lookups else 0.0
+        return {
+            **self.counters,
+            "size": len(self._entries),
+            "hit_ratio": round(hit_ratio, 4),
+        }
@@ -0,0 +1,41 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Response
+
+
+def validators(request, versions, extra=""):
+    """
+    Worker가 마지막으로 쓴 데이터 버전(ns)으로 ETag / Last-Modified를 만들고
+    If-None-Match / If-Modified-Since와 비교 -> (304 응답 또는 None, 응답 헤더)
+    같은 데이터라도 쿼리 파라미터(구간/포맷)가 다르면 다른 표현이므로 ETag에 포함함.
+    """
+    if not versions or not any(versions):
+        return None, {}  # 버전 기록이 없으면(Worker 미실행) 검증 헤더 없이 응답
+
+    tag_source = f"{request.url.path}?{request.url.query}|{versions}|{extra}"
+    etag = f'W/"{hashlib.sha1(tag_source.encode()).hexdigest()[:20]}"'
+    last_modified_sec = max(versions) // 1_000_000_000
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified_sec, usegmt=True),
+        "Cache-Control": "no-cache",  # 캐시는 하되 매번 재검증
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers=headers), headers
+        return None, headers
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return None, headers
+        if last_modified_sec <= since:
+            return Response(status_code=304, headers=headers), headers
+
+    return None, headers
@@ -1,11 +1,37 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from influxdb_client import InfluxDBClient
+from fastapi.responses import StreamingResponse
+from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
 from contextlib import asynccontextmanager
 import pandas as pd
+import asyncio
 import os
+import re
 import time
 from datetime import datetime, timezone
+from pathlib import Path
+
+from api.cache import TTLCache
+from api.conditional import validators
+from api.metrics import (
+    QUERY_DURATION,
+    ROWS_RETURNED,
+    SERIALIZATION_DURATION,
+    STORE_READS,
+    MetricsMiddleware,
+    metrics_response,
+)
+from api.serialization import (
+    FORECAST_COLUMNS,
+    HISTORY_COLUMNS,
+    FastJSONResponse,
+    frame_payload,
+)
+from api.stream import StreamHub, sse_message
+from scripts.data_versions import current_version
+from scripts.flux_queries import WINDOW_OFFSETS, query_window_async
+from scripts.ohlcv_store import OHLCVStore
+from scripts.rollups import ROLLUP_LOOKBACK_DAYS, rollup_measurement
 
 # load_dotenv()
 
@@ -15,27 +41,69 @@ INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
 INFLUXDB_ORG = os.getenv("INFLUXDB_ORG")
 INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET")
 
+# Worker와 공유하는 정적 파일 볼륨 (데이터 버전 확인용)
+BASE_DIR = Path(__file__).resolve().parent.parent
+STATIC_DIR = BASE_DIR / "static_data"
+
+# Worker가 InfluxDB와 함께 쓰는 로컬 OHLCV 저장소 (공유 볼륨, 비어 있으면 사용 안 함)
+# history 구간을 mmap 파일에서 바로 읽고, 저장소가 모르는 구간만 InfluxDB로 조회
+OHLCV_STORE_DIR = os.getenv("OHLCV_STORE_DIR", str(BASE_DIR / "ohlcv_store"))
+
+# 응답 캐시 (TTL은 Worker 수집 주기에 맞춤, 그 전이라도 Worker가 새로 쓰면 무효화)
+CACHE_TTL_SEC = int(os.getenv("CACHE_TTL_SEC", "60"))
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "256"))
+
+# uvicorn 워커 1개가 InfluxDB에 동시에 열 수 있는 연결 수
+INFLUXDB_POOL_SIZE = int(os.getenv("INFLUXDB_POOL_SIZE", "100"))
+
+# 실시간 push: Worker의 이벤트 포트 (host가 비어 있으면 사용 안 함)
+WORKER_EVENTS_HOST = os.getenv("WORKER_EVENTS_HOST", "worker")
+WORKER_EVENTS_PORT = int(os.getenv("WORKER_EVENTS_PORT", "8765"))
+STREAM_KEEPALIVE_SEC = int(os.getenv("STREAM_KEEPALIVE_SEC", "15"))
+
 client = None
+cache = TTLCache(max_size=CACHE_MAX_SIZE, ttl_sec=CACHE_TTL_SEC)
+hub = StreamHub()
+store = OHLCVStore(OHLCV_STORE_DIR) if OHLCV_STORE_DIR else None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     global client
     print("Connecting to InfluxDB...")
-    client = InfluxDBClient(
+    # async 클라이언트: 요청 처리 중 스레드를 점유하지 않고, 연결은 풀에서 재사용
+    client = InfluxDBClientAsync(
         url=INFLUXDB_URL,
         token=INFLUXDB_TOKEN,
         org=INFLUXDB_ORG,
         timeout=10000,  # 타임아웃 설정
-        retries=3,  # 연결 끊김 대비 재시도
+        connection_pool_maxsize=INFLUXDB_POOL_SIZE,
     )
+    hub_task = None
+    if WORKER_EVENTS_HOST:
+        hub_task = asyncio.create_task(
+            hub.run(WORKER_EVENTS_HOST, WORKER_EVENTS_PORT)
+        )
     yield
 
+    if hub_task is not None:
+        hub_task.cancel()
     print("Closing InfluxDB connection...")
-    client.close()
+    await client.close()
+
 
+app = FastAPI(
+    title="Coin Predict API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
-app = FastAPI(title="Coin Predict API", version="1.0.0", lifespan=lifespan)
+# 응답 포맷: rows(기본, 기존 호환) / columnar(필드별 배열 + epoch ms 타임스탬프)
+FORMAT_QUERY = Query("rows", pattern="^(rows|columnar)$")
+
+# 엔드포인트별 지연 시간 (/metrics)
+app.add_middleware(MetricsMiddleware)
 
 # CORS 설정
 app.add_middleware(
@@ -50,95 +118,450 @@ app.add_middleware(
 loaded_models = {}
 
 
+# 조회 구간 파라미터
+FLUX_DURATION = re.compile(r"^-?\d+(ns|us|ms|s|m|h|d|w|mo|y)$")
+OHLCV_FIELDS = ["open", "high", "low", "close", "volume"]
+MAX_LIMIT = 10000
+
+# Flux 상대 시간 단위 -> Timedelta 인자 (mo / y는 길이가 일정하지 않으므로 달력 기준 DateOffset)
+DURATION_UNITS = {
+    "ns": "nanoseconds",
+    "us": "microseconds",
+    "ms": "milliseconds",
+    "s": "seconds",
+    "m": "minutes",
+    "h": "hours",
+    "d": "days",
+    "w": "weeks",
+}
+
+
+def make_window(start, stop="2d", fields=None, every=None, limit=None):
+    """
+    조회 구간 (window_query 인자 + 캐시 키)
+    stop 기본값 2d -> 미래 데이터도 조회하기 위해 미래 시간까지 범위를 엶.
+    """
+    return {
+        "start": start,
+        "stop": stop,
+        "fields": tuple(fields) if fields else None,
+        "every": every,
+        "limit": limit,
+    }
+
+
+def flux_time(value: str, name: str):
+    """
+    '-48h' 같은 상대 시간은 그대로, ISO 8601 시각은 RFC3339(UTC)로 변환
+    (검증된 값만 Flux에 넣음)
+    """
+    if FLUX_DURATION.match(value):
+        return value
+    try:
+        ts = pd.Timestamp(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value}")
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def history_window(
+    start: str = Query("-30d", description="-48h 또는 2024-01-01T00:00:00Z"),
+    end: str = Query(None, description="기본값: 현재 이후 전체"),
+    fields: str = Query(None, description="close,volume (기본값: 전체)"),
+    every: str = Query(None, description="다운샘플링 간격 (예: 4h, 1d)"),
+    limit: int = Query(None, ge=1, le=MAX_LIMIT, description="마지막 N개 봉"),
+    since: str = Query(None, description="delta 모드: 클라이언트의 마지막 봉 시각"),
+):
+    """
+    /history 조회 구간 (range / _field filter / aggregateWindow / tail로 DB에 pushdown)
+    since가 있으면 start 대신 그 시각부터 조회 -> 클라이언트의 마지막 봉(진행 중이라 값이
+    바뀌었을 수 있음)과 그 이후 봉만 반환됨.
+    """
+    field_list = None
+    if fields:
+        field_list = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in field_list if f not in OHLCV_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {unknown}")
+
+    # 음수 / 0 길이 창(every=0s 등)은 집계가 불가능하므로 거부
+    match = FLUX_DURATION.match(every) if every else None
+    if every and (match is None or int(every[: -len(match.group(1))]) <= 0):
+        raise HTTPException(status_code=400, detail=f"Invalid every: {every}")
+
+    start_value = flux_time(since, "since") if since else flux_time(start, "start")
+    if every:
+        # aggregateWindow는 첫 창을 range 시작에서 자르므로 창 경계로 내려서 부분 봉을 없앰
+        start_ts = window_time(start_value, pd.Timestamp.now(tz="UTC"))
+        start_value = window_floor(start_ts, every).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    return make_window(
+        start_value,
+        flux_time(end, "end") if end else "2d",
+        field_list,
+        every,
+        limit,
+    )
+
+
+def history_measurement(
+    timeframe: str = Query(
+        "1h", description="1h(원본) 또는 Worker가 유지하는 롤업: 4h, 1d, 1w"
+    ),
+):
+    """타임프레임 -> 측정값 (롤업은 Worker가 미리 집계해 둔 ohlcv_<tf>를 그대로 읽음)"""
+    if timeframe == "1h":
+        return "ohlcv"
+    if timeframe not in ROLLUP_LOOKBACK_DAYS:
+        raise HTTPException(status_code=400, detail=f"Unknown timeframe: {timeframe}")
+    return rollup_measurement(timeframe)
+
+
+def flux_duration(value: str):
+    """'-48h' / '4d' / '1mo' -> Timedelta (mo / y는 DateOffset)"""
+    unit = FLUX_DURATION.match(value).group(1)
+    amount = int(value[: -len(unit)])
+    if unit == "mo":
+        return pd.DateOffset(months=amount)
+    if unit == "y":
+        return pd.DateOffset(years=amount)
+    return pd.Timedelta(**{DURATION_UNITS[unit]: amount})
+
+
+def window_time(value: str, now):
+    """flux_time 결과(상대 시간 / RFC3339) -> UTC Timestamp"""
+    if FLUX_DURATION.match(value) is None:
+        return pd.Timestamp(value)
+    return now + flux_duration(value)
+
+
+def window_floor(ts, every: str):
+    """
+    ts가 속한 aggregateWindow 창의 시작 (Flux와 같은 경계)
+    epoch 기준 every 간격 + WINDOW_OFFSETS(주봉은 월요일), mo / y는 epoch 이후 개월 수 기준
+    """
+    unit = FLUX_DURATION.match(every).group(1)
+    if unit in ("mo", "y"):
+        size = int(every[: -len(unit)]) * (12 if unit == "y" else 1)
+        months = (ts.year - 1970) * 12 + ts.month - 1
+        months -= months % size
+        year, month = 1970 + months // 12, months % 12 + 1
+        return pd.Timestamp(year=year, month=month, day=1, tz="UTC")
+    offset = flux_duration(WINDOW_OFFSETS.get(every, "0s"))
+    return (ts - offset).floor(flux_duration(every)) + offset
+
+
+def read_store(symbol: str, measurement: str, window: dict):
+    """
+    로컬 OHLCV 저장소에서 조회 -> (처리 여부, DataFrame / 데이터 없으면 None)
+    다운샘플링(every)이나 저장소가 보장하지 않는 구간이면 (False, None) -> InfluxDB로 조회
+    """
+    if store is None or window["every"] or not measurement.startswith("ohlcv"):
+        return False, None
+    now = pd.Timestamp.now(tz="UTC")
+    start = window_time(window["start"], now)
+    stop = window_time(window["stop"], now)
+
+    try:
+        df = store.read(
+            measurement, symbol, start, stop, window["fields"], window["limit"]
+        )
+    except Exception as e:
+        print(f"Store Read Error: {e}")
+        df = None
+    STORE_READS.labels(measurement, "miss" if df is None else "hit").inc()
+    if df is None:
+        return False, None
+    return True, df if len(df) else None
+
+
 # InfluxDB 쿼리 헬퍼 함수
-def query_influx(symbol: str, measurement: str, days: int = 30):
+async def query_influx_many(symbols: list, measurement: str, window: dict):
+    """여러 심볼을 한 번의 쿼리로 조회 -> {symbol: DataFrame}"""
     query_api = client.query_api()
+    start = time.perf_counter()
+    frames = await query_window_async(
+        query_api, INFLUXDB_BUCKET, measurement, symbols, **window
+    )
+    QUERY_DURATION.labels(measurement).observe(time.perf_counter() - start)
+    ROWS_RETURNED.labels(measurement).observe(sum(len(df) for df in frames.values()))
+    return frames
+
 
-    # 최근 N일 데이터 조회 + Pivot으로 테이블 형태 변환
-    # range stop: 2d -> 미래 데이터도 조회하기 위해 미래 시간까지 범위를 엶.
-    query = f"""
-    from(bucket: "{INFLUXDB_BUCKET}")
-      |> range(start: -{days}d, stop: 2d)
-      |> filter(fn: (r) => r["_measurement"] == "{measurement}")
-      |> filter(fn: (r) => r["symbol"] == "{symbol}")
-      |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-      |> sort(columns: ["_time"], desc: false)
+async def query_influx(symbol: str, measurement: str, window: dict):
+    """
+    로컬 저장소 -> 캐시 -> DB 순서로 조회 (동시 miss는 DB 조회 1번으로 합쳐짐)
+    데이터 없음(None)도 캐시하지만, DB 에러는 캐시하지 않음
     """
+    served, df = read_store(symbol, measurement, window)
+    if served:
+        return df
+
+    version = current_version(STATIC_DIR, measurement, symbol)
+    key = (symbol, measurement, tuple(window.items()))
+
+    async def load():
+        frames = await query_influx_many([symbol], measurement, window)
+        return frames.get(symbol)
 
     try:
-        df = query_api.query_data_frame(query)
+        return await cache.get_or_load(key, version, load)
     except Exception as e:
         print(f"DB Query Error: {e}")
         return None
 
-    if isinstance(df, list) or df.empty:
-        return None
 
-    # InfluxDB 리턴값 정리 ('_time' -> 'timestamp')
-    df.rename(columns={"_time": "timestamp"}, inplace=True)
+async def query_influx_cached_many(symbols: list, measurement: str, window: dict):
+    """로컬 저장소 / 캐시에 없는 심볼만 모아서 한 번의 쿼리로 조회"""
+    frames, remaining = {}, []
+    for symbol in symbols:
+        served, df = read_store(symbol, measurement, window)
+        if not served:
+            remaining.append(symbol)
+        elif df is not None:
+            frames[symbol] = df
+    symbols = remaining
+
+    missing = []
+    versions = {s: current_version(STATIC_DIR, measurement, s) for s in symbols}
+    keys = {s: (s, measurement, tuple(window.items())) for s in symbols}
+    for symbol in symbols:
+        found, df = cache.get(keys[symbol], versions[symbol])
+        if found:
+            if df is not None:
+                frames[symbol] = df
+        else:
+            missing.append(symbol)
+
+    if missing:
+        try:
+            fetched = await query_influx_many(missing, measurement, window)
+        except Exception as e:
+            print(f"DB Query Error: {e}")
+            return frames
+        for symbol in missing:
+            df = fetched.get(symbol)
+            cache.put(keys[symbol], versions[symbol], df)
+            if df is not None:
+                frames[symbol] = df
+
+    return frames
+
+
+async def render(build, headers=None):
+    """
+    응답 생성(DataFrame -> payload -> JSON bytes)은 CPU 작업이므로 이벤트 루프 밖(스레드)에서 수행
+    build: payload(dict)를 만드는 함수
+    """
+
+    def build_response():
+        with SERIALIZATION_DURATION.time():
+            return FastJSONResponse(build(), headers=headers)
+
+    return await asyncio.to_thread(build_response)
+
 
-    return df
+def data_versions(measurement, symbols):
+    return [current_version(STATIC_DIR, measurement, s) for s in symbols]
+
+
+@app.get("/history")
+async def get_history_many(
+    request: Request,
+    symbols: str = Query(..., description="BTC/USDT,ETH/USDT"),
+    format: str = FORMAT_QUERY,
+    window: dict = Depends(history_window),
+    measurement: str = Depends(history_measurement),
+):
+    """
+    여러 심볼의 과거 차트 데이터(기본 30일)를 한 번의 DB 조회로 반환
+    """
+    start_time = time.time()
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
+    not_modified, headers = validators(
+        request, data_versions(measurement, symbol_list)
+    )
+    if not_modified:
+        return not_modified
+
+    frames = await query_influx_cached_many(symbol_list, measurement, window)
+
+    if not frames:
+        raise HTTPException(status_code=404, detail=f"No history data for {symbols}")
+
+    execution_time = round(time.time() - start_time, 4)
+    return await render(
+        lambda: {
+            "symbols": symbol_list,
+            "execution_time": execution_time,
+            "format": format,
+            "data": {
+                symbol: {
+                    "count": len(df),
+                    "data": frame_payload(df, HISTORY_COLUMNS, format),
+                }
+                for symbol, df in frames.items()
+            },
+        },
+        headers,
+    )
 
 
 @app.get("/history/{symbol:path}")
-def get_history(symbol: str):
+async def get_history(
+    request: Request,
+    symbol: str,
+    format: str = FORMAT_QUERY,
+    window: dict = Depends(history_window),
+    measurement: str = Depends(history_measurement),
+):
     """
-    과거 30일치 차트 데이터 반환
+    과거 차트 데이터 반환 (기본 30일)
+    start / end / fields / every / limit은 모두 Flux 쿼리로 내려가 DB에서 필요한 만큼만 읽음
+    (every가 없으면 먼저 로컬 OHLCV 저장소에서 이진 탐색으로 읽음)
+    polling: If-None-Match로 304를 받거나, since=<마지막 봉 시각>으로 바뀐 봉만 받기
     """
     start_time = time.time()
-    df = query_influx(symbol, "ohlcv", days=30)
+    not_modified, headers = validators(request, data_versions(measurement, [symbol]))
+    if not_modified:
+        return not_modified
+
+    df = await query_influx(symbol, measurement, window)
 
     if df is None:
         raise HTTPException(status_code=404, detail=f"No history data for {symbol}")
 
-    # 필요한 컬럼만 추출
-    cols = ["timestamp", "open", "high", "low", "close", "volume"]
-    available_cols = [c for c in cols if c in df.columns]
-
-    return {
-        "symbol": symbol,
-        "count": len(df),
-        "execution_time": round(time.time() - start_time, 4),
-        "data": df[available_cols].to_dict(orient="records"),
-    }
+    execution_time = round(time.time() - start_time, 4)
+    return await render(
+        lambda: {
+            "symbol": symbol,
+            "count": len(df),
+            "execution_time": execution_time,
+            "format": format,
+            "data": frame_payload(df, HISTORY_COLUMNS, format),
+        },
+        headers,
+    )
 
 
 @app.get("/predict/{symbol:path}")
-def predict_price(symbol: str):
+async def predict_price(request: Request, symbol: str, format: str = FORMAT_QUERY):
     """
     'prediction' 테이블에서 미리 계산된 데이터를 가져옴
     """
     start_time = time.time()
+    now = datetime.now(timezone.utc)
+
+    # 지난 시각의 예측값은 응답에서 빠지므로 데이터 버전이 같아도 매시 ETag가 바뀜
+    not_modified, headers = validators(
+        request,
+        data_versions("prediction", [symbol]),
+        extra=now.strftime("%Y-%m-%dT%H"),
+    )
+    if not_modified:
+        return not_modified
 
     # DB에서 예측 결과 조회 (최근 24시간 내 생성된 데이터 중 미래값)
-    df = query_influx(symbol, "prediction", days=2)
+    df = await query_influx(symbol, "prediction", make_window("-2d"))
 
     if df is None or df.empty:
         # DB에 아직 예측값이 없을 경우 (Worker가 안 돌았거나 모델이 없을 때)
         raise HTTPException(status_code=404, detail="No prediction data found.")
 
-    now = datetime.now(timezone.utc)
     df = df[df["timestamp"] > now]
 
-    if df is None or df.empty:
+    if df.empty:
         raise HTTPException(status_code=503, detail="System outdated. Worker is down.")
 
-    cols = ["timestamp", "yhat", "yhat_lower", "yhat_upper"]
-    available_cols = [c for c in cols if c in df.columns]
+    execution_time = round(time.time() - start_time, 4)
+    return await render(
+        lambda: {
+            "symbol": symbol,
+            "source": "InfluxDB (Pre-computed)",
+            "execution_time": execution_time,
+            "format": format,
+            "forecast": frame_payload(df, FORECAST_COLUMNS, format),
+        },
+        headers,
+    )
 
-    return {
-        "symbol": symbol,
-        "source": "InfluxDB (Pre-computed)",
-        "execution_time": round(time.time() - start_time, 4),
-        "forecast": df[available_cols].to_dict(orient="records"),
-    }
 
+@app.get("/stream/{symbol:path}")
+async def stream(
+    symbol: str,
+    start: str = Query("-1d", description="스냅샷 History 시작 (-48h 또는 ISO 8601)"),
+):
+    """
+    SSE 스트림: 접속 시 snapshot(History + 예측) 1번, 이후 Worker가 만든 bars / forecast만 push
+    snapshot 조회 전에 먼저 구독하므로 그 사이에 들어온 이벤트도 빠지지 않음 (timestamp 기준 upsert)
+    """
+    start = flux_time(start, "start")
+
+    async def events():
+        queue = hub.subscribe(symbol)
+        try:
+            history, forecast = await asyncio.gather(
+                query_influx(symbol, "ohlcv", make_window(start)),
+                query_influx(symbol, "prediction", make_window("-2d")),
+            )
+            now = datetime.now(timezone.utc)
+
+            def build():
+                payload = {"type": "snapshot", "symbol": symbol}
+                payload["history"] = (
+                    frame_payload(history, HISTORY_COLUMNS)
+                    if history is not None
+                    else []
+                )
+                payload["forecast"] = (
+                    frame_payload(
+                        forecast[forecast["timestamp"] > now], FORECAST_COLUMNS
+                    )
+                    if forecast is not None
+                    else []
+                )
+                return sse_message("snapshot", payload)
+
+            yield await asyncio.to_thread(build)
+
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(), timeout=STREAM_KEEPALIVE_SEC
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"  # 프록시 유휴 타임아웃 방지
+                    continue
+                if message is None:  # 못 따라와서 hub에서 끊김
+                    break
+                yield message
+        finally:
+            hub.unsubscribe(symbol, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics")
+async def metrics():
+    return metrics_response()
 
-@app.get("/")
-def health_check():
-    return {"status": "ok", "models_loaded": list(loaded_models.keys())}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    return cache.stats()
+
+
+@app.get("/")
+async def health_check():
+    return {
+        "status": "ok",
+        "models_loaded": list(loaded_models.keys()),
+        "cache": cache.stats(),
+        "stream": hub.stats(),
+    }
 
-@app.on_event("shutdown")
-def shutdown_event():
-    client.close()
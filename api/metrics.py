@@ -0,0 +1,97 @@
+"""
+API Prometheus metrics (/metrics)
+gunicorn 워커가 여러 개이면 PROMETHEUS_MULTIPROC_DIR를 지정해 모든 워커의 값을 합쳐서 노출함
+"""
+
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_LATENCY = Histogram(
+    "api_request_duration_seconds",
+    "Time until the response body starts (whole response for JSON endpoints)",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERY_DURATION = Histogram(
+    "api_influx_query_duration_seconds",
+    "InfluxDB query duration (including CSV parsing)",
+    ["measurement"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ROWS_RETURNED = Histogram(
+    "api_influx_rows_returned",
+    "Rows returned by one InfluxDB query",
+    ["measurement"],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+)
+STORE_READS = Counter(
+    "api_store_reads_total",
+    "History reads from the local OHLCV store (miss = fell back to InfluxDB)",
+    ["measurement", "result"],
+)
+SERIALIZATION_DURATION = Histogram(
+    "api_serialization_duration_seconds",
+    "DataFrame -> payload -> JSON bytes",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+
+class MetricsMiddleware:
+    """
+    엔드포인트(라우트 템플릿)별 지연 시간 기록 (순수 ASGI middleware, 요청당 오버헤드 최소)
+    첫 body 전송 시점까지를 잼 -> SSE처럼 오래 열려 있는 응답도 연결 시간이 섞이지 않음
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = {"status": 500, "observed": False}
+
+        def observe():
+            if state["observed"]:
+                return
+            state["observed"] = True
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                state["status"],
+            ).observe(time.perf_counter() - start)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body":
+                observe()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            observe()
+
+
+def metrics_response():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
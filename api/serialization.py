@@ -0,0 +1,67 @@
+import numpy as np
+import orjson
+from fastapi.responses import JSONResponse
+
+HISTORY_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+FORECAST_COLUMNS = ["timestamp", "yhat", "yhat_lower", "yhat_upper"]
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    orjson으로 직렬화하는 응답 (numpy 배열도 그대로 직렬화)
+    dict를 그대로 return하면 FastAPI가 jsonable_encoder로 모든 값을 한 번 더 순회하므로,
+    핸들러에서 이 클래스를 직접 만들어 반환함.
+    """
+
+    def render(self, content):
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+def epoch_ms(timestamps):
+    """tz-aware datetime Series -> epoch ms (int64 ndarray)"""
+    return (
+        timestamps.dt.tz_convert(None)
+        .to_numpy()
+        .astype("datetime64[ms]")
+        .astype(np.int64)
+    )
+
+
+def rows_payload(df, columns):
+    """
+    기존 row 포맷 ([{"timestamp": ISO 문자열, ...}, ...])
+    to_dict(orient="records") 대신 컬럼 리스트를 zip해서 dict를 만듦 (Timestamp 객체 생성 없음)
+    """
+    cols = [c for c in columns if c in df.columns]
+    values = []
+    for c in cols:
+        if c == "timestamp":
+            values.append(list(df[c].dt.to_pydatetime()))  # orjson이 ISO 8601로 직렬화
+        else:
+            values.append(df[c].tolist())
+    return [dict(zip(cols, row)) for row in zip(*values)]
+
+
+def columnar_payload(df, columns):
+    """
+    컬럼 포맷 ({"timestamp": [epoch ms...], "open": [...], ...})
+    NumPy 배열을 그대로 넘기므로 행 단위 Python 객체를 만들지 않음
+    """
+    payload = {}
+    for c in columns:
+        if c not in df.columns:
+            continue
+        if c == "timestamp":
+            payload[c] = epoch_ms(df[c])
+        else:
+            # orjson은 C-contiguous 배열만 직렬화
+            payload[c] = np.ascontiguousarray(df[c].to_numpy(dtype=np.float64))
+    return payload
+
+
+def frame_payload(df, columns, fmt="rows"):
+    if fmt == "columnar":
+        return columnar_payload(df, columns)
+    return rows_payload(df, columns)
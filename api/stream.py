@@ -0,0 +1,123 @@
+import asyncio
+import socket
+
+import orjson
+
+
+def sse_message(event, payload):
+    """SSE 메시지 bytes (구독자 수와 관계없이 이벤트당 1번만 직렬화)"""
+    data = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class StreamHub:
+    """
+    프로세스 내 구독자 fan-out
+    - Worker의 EventPublisher에 TCP로 1개 연결만 유지 (run)
+      Worker replica가 여러 개면 host가 여러 주소로 풀리므로 주소마다 1개씩 연결
+      (심볼은 replica끼리 나눠 맡으므로 각 연결에서 오는 이벤트는 겹치지 않음)
+    - 이벤트 1건 -> SSE bytes 1번 생성 -> 해당 심볼의 모든 구독자 큐에 같은 객체를 넣음
+    - 큐가 가득 찬(못 따라오는) 구독자는 끊어서 메모리가 쌓이지 않게 함
+    """
+
+    def __init__(self, queue_size=64):
+        self.queue_size = queue_size
+        self._subscribers = {}  # symbol -> set(asyncio.Queue)
+        self.connections = set()  # 연결된 Worker 주소
+        self.counters = {"events": 0, "deliveries": 0, "dropped_subscribers": 0}
+
+    def subscribe(self, symbol):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(symbol, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, symbol, queue):
+        queues = self._subscribers.get(symbol)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[symbol]
+
+    def broadcast(self, symbol, message):
+        queues = self._subscribers.get(symbol)
+        if not queues:
+            return
+        for queue in list(queues):
+            try:
+                queue.put_nowait(message)
+                self.counters["deliveries"] += 1
+            except asyncio.QueueFull:
+                # None -> 구독 종료 신호 (큐를 비우고 넣음)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+                queues.discard(queue)
+                self.counters["dropped_subscribers"] += 1
+
+    def dispatch(self, event):
+        """Worker 이벤트(dict) -> 구독자"""
+        symbol = event.get("symbol")
+        if not symbol or symbol not in self._subscribers:
+            return
+        self.counters["events"] += 1
+        self.broadcast(symbol, sse_message(event.get("type", "message"), event))
+
+    async def run(self, host, port, max_backoff_sec=30.0, resolve_interval_sec=30.0):
+        """
+        host를 주기적으로 다시 풀어서 Worker 주소마다 수신 루프(follow)를 유지
+        (replica가 늘면 연결 추가, DNS에서 빠지면 연결 종료)
+        """
+        loop = asyncio.get_running_loop()
+        tasks = {}  # address -> Task
+        try:
+            while True:
+                try:
+                    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+                    addresses = {info[4][0] for info in infos}
+                except OSError as e:
+                    # 조회 실패 시에는 기존 연결을 그대로 둠 (각 연결이 알아서 재접속)
+                    print(f"[Stream] {host} 주소 조회 실패: {e}")
+                    addresses = set(tasks)
+
+                for address in addresses - tasks.keys():
+                    tasks[address] = asyncio.create_task(
+                        self.follow(address, port, max_backoff_sec)
+                    )
+                for address in tasks.keys() - addresses:
+                    tasks.pop(address).cancel()
+                await asyncio.sleep(resolve_interval_sec)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+    async def follow(self, address, port, max_backoff_sec):
+        """Worker 1개의 이벤트 수신 루프 (끊기면 backoff 후 재접속)"""
+        backoff = 1.0
+        while True:
+            writer = None
+            try:
+                reader, writer = await asyncio.open_connection(address, port)
+                self.connections.add(address)
+                backoff = 1.0
+                print(f"[Stream] Worker 이벤트 구독 시작 ({address}:{port})")
+                while line := await reader.readline():
+                    self.dispatch(orjson.loads(line))
+                print(f"[Stream] Worker 연결 종료 ({address})")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Stream] Worker 연결 실패 ({address}): {e} ({backoff:.0f}s 후 재시도)")
+            finally:
+                self.connections.discard(address)
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, max_backoff_sec)
+
+    def stats(self):
+        return {
+            **self.counters,
+            "connected": bool(self.connections),
+            "workers": sorted(self.connections),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+        }
@@ -0,0 +1,27 @@
+import os
+from pathlib import Path
+
+# Worker가 DB에 쓴 시점을 (measurement, symbol)별 파일 mtime으로 기록 (Worker / API 공용)
+# static_data 볼륨을 공유하므로 gunicorn 워커 프로세스가 여러 개여도 모두 같은 버전을 봄
+# (nginx는 /static/_versions/를 막아 둠 -> 외부에는 공개되지 않음)
+VERSIONS_DIRNAME = "_versions"
+
+
+def version_path(static_dir, measurement, symbol):
+    safe_symbol = symbol.replace("/", "_")
+    return Path(static_dir) / VERSIONS_DIRNAME / f"{measurement}_{safe_symbol}"
+
+
+def bump_version(static_dir, measurement, symbol):
+    """새 데이터가 저장됐음을 알림 (Worker 쪽 캐시 무효화 훅)"""
+    path = version_path(static_dir, measurement, symbol)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+
+
+def current_version(static_dir, measurement, symbol):
+    """마지막 저장 시각(ns). 기록이 없으면 0"""
+    try:
+        return os.stat(version_path(static_dir, measurement, symbol)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
@@ -0,0 +1,90 @@
+"""
+Worker -> API 프로세스 이벤트 fan-out (새 봉 / 새 예측)
+API 프로세스(gunicorn 워커마다 1개)가 TCP로 접속해 두면, Worker는 이벤트를 한 번 직렬화해
+접속된 모든 프로세스에 그대로 보냄. 구독자(브라우저) 단위 fan-out은 각 API 프로세스가 담당.
+형식: 한 줄에 JSON 하나 (newline-delimited JSON)
+"""
+
+import json
+import socket
+import threading
+import time
+
+
+class EventPublisher:
+    def __init__(self, host="0.0.0.0", port=8765, send_timeout_sec=1.0):
+        self.send_timeout_sec = send_timeout_sec
+        self._conns = []
+        self._lock = threading.Lock()
+        self.counters = {"published": 0, "dropped_conns": 0}
+
+        self._server = socket.create_server((host, port))
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(
+            target=self._accept_loop, name="event-publisher", daemon=True
+        )
+        self._thread.start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, addr = self._server.accept()
+            except OSError:
+                return  # close()
+            conn.settimeout(self.send_timeout_sec)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self._conns.append(conn)
+            print(f"[Events] 구독 프로세스 접속: {addr}")
+
+    def publish(self, event):
+        """event(dict) -> 접속된 모든 API 프로세스 (느리거나 끊긴 연결은 제거)"""
+        line = (json.dumps(event, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            alive = []
+            for conn in self._conns:
+                try:
+                    conn.sendall(line)
+                    alive.append(conn)
+                except OSError:
+                    conn.close()
+                    self.counters["dropped_conns"] += 1
+            self._conns = alive
+            self.counters["published"] += 1
+
+    def subscribers(self):
+        with self._lock:
+            return len(self._conns)
+
+    def close(self):
+        self._server.close()
+        with self._lock:
+            for conn in self._conns:
+                conn.close()
+            self._conns = []
+
+
+def frame_rows(df, columns):
+    """DatetimeIndex DataFrame -> [{"timestamp": ISO, ...}] (이벤트 본문용)"""
+    rows = df[columns].copy()
+    rows.insert(0, "timestamp", df.index.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return rows.to_dict(orient="records")
+
+
+def bars_event(symbol, timeframe, df, columns):
+    return {
+        "type": "bars",
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "published_at": time.time(),
+        "data": frame_rows(df, columns),
+    }
+
+
+def forecast_event(symbol, df, columns):
+    return {
+        "type": "forecast",
+        "symbol": symbol,
+        "published_at": time.time(),
+        "data": frame_rows(df, columns),
+    }
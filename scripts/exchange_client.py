@@ -0,0 +1,58 @@
+import threading
+import time
+
+import ccxt
+
+
+class RateLimiter:
+    """스레드 간 공유되는 최소 요청 간격 제한기 (여러 심볼이 같은 요청 예산을 나눠 씀)"""
+
+    def __init__(self, min_interval_sec):
+        self.min_interval_sec = min_interval_sec
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait_sec = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval_sec
+        if wait_sec > 0:
+            time.sleep(wait_sec)
+
+
+class ExchangeClient:
+    """
+    사이클 간 재사용하는 거래소 클라이언트
+    - ccxt 인스턴스(HTTP 세션, 마켓 메타데이터)를 한 번만 만들고 계속 사용
+    - ccxt 내장 rate limit은 스레드 안전하지 않으므로 끄고 RateLimiter로 대체
+    """
+
+    def __init__(self, exchange_id="binance", min_interval_ms=None):
+        self.exchange = getattr(ccxt, exchange_id)({"enableRateLimit": False})
+        interval_ms = min_interval_ms or self.exchange.rateLimit
+        self.limiter = RateLimiter(interval_ms / 1000)
+
+    def fetch_ohlcv(self, symbol, timeframe, since_ms, limit=1000):
+        self.limiter.acquire()
+        return self.exchange.fetch_ohlcv(symbol, timeframe, since=since_ms, limit=limit)
+
+    def iter_ohlcv_pages(self, symbol, timeframe, since_ms, until_ms=None, limit=1000):
+        """
+        since_ms부터 until_ms(없으면 현재)까지 limit개씩 페이지 단위로 순회
+        limit(1000)개 제한 때문에 한 번에 약 41일(1h)까지만 받을 수 있는 문제 해결
+        """
+        step_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        cursor = since_ms
+        while True:
+            page = self.fetch_ohlcv(symbol, timeframe, cursor, limit)
+            if until_ms is not None:
+                page = [row for row in page if row[0] <= until_ms]
+            if not page:
+                return
+
+            yield page
+
+            cursor = page[-1][0] + step_ms
+            if len(page) < limit or (until_ms is not None and cursor > until_ms):
+                return
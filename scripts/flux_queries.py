@@ -0,0 +1,185 @@
+"""
+여러 심볼을 한 번의 Flux 쿼리로 조회하기 위한 헬퍼 (Worker / API 공용)
+심볼 수가 늘어나도 DB 왕복 횟수는 1회로 유지됨.
+"""
+
+import asyncio
+import io
+import re
+
+import pandas as pd
+from influxdb_client import Dialect
+
+# annotation 없는 일반 CSV (pandas.read_csv로 바로 파싱 가능)
+RAW_CSV_DIALECT = Dialect(header=True, annotations=[])
+
+
+def symbol_filter(symbols):
+    """
+    ["BTC/USDT", "ETH/USDT"] -> 'r["symbol"] == "BTC/USDT" or r["symbol"] == "ETH/USDT"'
+    contains(set: ...)는 스토리지 단으로 pushdown 되지 않으므로 == 조건을 or로 연결함.
+    """
+    return " or ".join(f'r["symbol"] == "{s}"' for s in symbols)
+
+
+def last_times_query(bucket, measurement, symbols, start):
+    """심볼별 마지막 _time 1행씩 (symbol 태그로 그룹)"""
+    return f"""
+    from(bucket: "{bucket}")
+      |> range(start: {start})
+      |> filter(fn: (r) => r["_measurement"] == "{measurement}")
+      |> filter(fn: (r) => {symbol_filter(symbols)})
+      |> last()
+      |> keep(columns: ["_time", "symbol"])
+      |> group(columns: ["symbol"])
+      |> sort(columns: ["_time"], desc: false)
+      |> last(column: "_time")
+    """
+
+
+# aggregateWindow로 다운샘플링할 때 OHLCV 필드별 집계 함수 (그 외 필드는 mean)
+OHLCV_AGGREGATES = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+
+def field_filter(fields):
+    return " or ".join(f'r["_field"] == "{f}"' for f in fields)
+
+
+# 주봉은 월요일 시작 (epoch 기준 창은 목요일 시작이므로 4일 밀어줌, rollups.py와 동일)
+WINDOW_OFFSETS = {"1w": "4d"}
+
+
+def aggregate_window(every, fn):
+    # timeSrc: "_start" -> 봉 시작 시각을 타임스탬프로 사용 (캔들 관례)
+    offset = f", offset: {WINDOW_OFFSETS[every]}" if every in WINDOW_OFFSETS else ""
+    return (
+        f"aggregateWindow(every: {every}{offset}, fn: {fn}, "
+        f'createEmpty: false, timeSrc: "_start")'
+    )
+
+
+def window_query(
+    bucket, measurement, symbols, start, stop=None, fields=None, every=None, limit=None
+):
+    """
+    여러 심볼의 구간 데이터 (필드 pivot, 심볼별 테이블, 시간순 정렬)
+    - fields: 필요한 _field만 스토리지에서 읽음 (pivot 대상 축소)
+    - every: aggregateWindow로 다운샘플링 (OHLCV는 필드별로 first/max/min/last/sum)
+    - limit: 심볼별 마지막 N행만 (tail)
+    """
+    range_args = f"start: {start}" + (f", stop: {stop}" if stop else "")
+    source = f"""from(bucket: "{bucket}")
+      |> range({range_args})
+      |> filter(fn: (r) => r["_measurement"] == "{measurement}")
+      |> filter(fn: (r) => {symbol_filter(symbols)})"""
+    if fields:
+        source += f"""
+      |> filter(fn: (r) => {field_filter(fields)})"""
+
+    if every and measurement.startswith("ohlcv"):
+        # 필드마다 집계 함수가 다르므로 필드별로 집계한 뒤 합침
+        parts = ",\n      ".join(
+            f"""data
+        |> filter(fn: (r) => r["_field"] == "{f}")
+        |> {aggregate_window(every, OHLCV_AGGREGATES.get(f, "mean"))}"""
+            for f in (fields or OHLCV_AGGREGATES)
+        )
+        body = f"""data = {source}
+
+    union(tables: [
+      {parts}
+    ])"""
+    elif every:
+        body = f"""{source}
+      |> {aggregate_window(every, "mean")}"""
+    else:
+        body = source
+
+    query = f"""
+    {body}
+      |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+      |> group(columns: ["symbol"])
+      |> sort(columns: ["_time"], desc: false)"""
+    if limit:
+        query += f"""
+      |> tail(n: {int(limit)})"""
+    return query + "\n    "
+
+
+def split_by_symbol(df):
+    """
+    query_data_frame 결과를 심볼별 DataFrame으로 분리
+    ('_time' -> 'timestamp', 결과가 여러 DataFrame(list)이면 먼저 합침)
+    """
+    if isinstance(df, list):
+        df = pd.concat(df, ignore_index=True) if df else pd.DataFrame()
+    if df.empty or "symbol" not in df.columns:
+        return {}
+
+    df = df.rename(columns={"_time": "timestamp"})
+    return {
+        symbol: group.reset_index(drop=True)
+        for symbol, group in df.groupby("symbol", sort=False)
+    }
+
+
+def query_last_times(query_api, bucket, measurement, symbols, start):
+    """{symbol: 마지막 데이터 시간(UTC)} / 데이터가 없는 심볼은 포함되지 않음"""
+    tables = query_api.query(
+        query=last_times_query(bucket, measurement, symbols, start)
+    )
+    return {
+        record.values["symbol"]: record.get_time()
+        for table in tables
+        for record in table.records
+    }
+
+
+def query_window(
+    query_api, bucket, measurement, symbols, start, stop=None, **options
+):
+    """
+    {symbol: DataFrame} / 데이터가 없는 심볼은 포함되지 않음
+    options: window_query의 fields / every / limit
+    """
+    df = query_api.query_data_frame(
+        window_query(bucket, measurement, symbols, start, stop, **options)
+    )
+    return split_by_symbol(df)
+
+
+def parse_flux_csv(text):
+    """
+    annotation 없는 Flux CSV -> DataFrame
+    스키마가 다른 테이블은 빈 줄로 구분된 블록(각자 헤더 포함)으로 오므로 블록별로 읽어 합침
+    """
+    blocks = [b for b in re.split(r"\r?\n\s*\r?\n", text.strip()) if b.strip()]
+    if not blocks:
+        return pd.DataFrame()
+
+    df = pd.concat([pd.read_csv(io.StringIO(b)) for b in blocks], ignore_index=True)
+    df = df.drop(columns=[c for c in df.columns if c.startswith("Unnamed")])
+    if "_time" in df.columns:
+        df["_time"] = pd.to_datetime(df["_time"], utc=True, format="ISO8601")
+    return df
+
+
+async def query_window_async(
+    query_api, bucket, measurement, symbols, start, stop=None, **options
+):
+    """
+    query_window의 async 버전 (InfluxDBClientAsync의 query_api)
+    options: window_query의 fields / every / limit
+    CSV 파싱/분리는 CPU 작업이므로 이벤트 루프 밖(스레드)에서 수행
+    """
+    text = await query_api.query_raw(
+        window_query(bucket, measurement, symbols, start, stop, **options),
+        dialect=RAW_CSV_DIALECT,
+    )
+    return await asyncio.to_thread(lambda: split_by_symbol(parse_flux_csv(text)))
@@ -0,0 +1,271 @@
+import fcntl
+import glob
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from influxdb_client.client.write.dataframe_serializer import (
+    data_frame_to_list_of_points,
+)
+from influxdb_client.client.write_api import PointSettings
+
+
+def series_keys(lines):
+    """line protocol -> {(measurement, symbol 태그)}"""
+    keys = set()
+    for line in lines:
+        head = line.split(" ", 1)[0]  # "ohlcv,symbol=BTC/USDT"
+        measurement, _, tags = head.partition(",")
+        tag_map = dict(tag.split("=", 1) for tag in tags.split(",") if tag)
+        keys.add((measurement, tag_map.get("symbol")))
+    return keys
+
+
+SPOOL_PREFIX = "write_spool"
+
+
+def spool_owner(path):
+    """write_spool_<worker_id>.lp -> worker_id (샤딩 전 write_spool.lp는 None)"""
+    stem = os.path.basename(path)[: -len(".lp")]
+    return stem[len(SPOOL_PREFIX) + 1 :] or None
+
+
+def orphan_spools(spool_dir, own_path, live_workers):
+    """heartbeat가 살아 있는 Worker가 없는 spool 파일 (내 spool 제외)"""
+    paths = glob.glob(os.path.join(glob.escape(str(spool_dir)), f"{SPOOL_PREFIX}*.lp"))
+    return sorted(
+        path
+        for path in paths
+        if os.path.abspath(path) != os.path.abspath(own_path)
+        and spool_owner(path) not in live_workers
+    )
+
+
+@contextmanager
+def spool_lock(path):
+    """spool 파일별 프로세스 간 배타 lock (같은 state 볼륨을 쓰는 replica끼리)"""
+    directory, name = os.path.split(str(path))
+    with open(os.path.join(directory, f".{name}.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class BufferedWriter:
+    """
+    모든 심볼/measurement의 포인트를 모아서 백그라운드 스레드에서 배치로 쓰는 Writer
+    - batch_size개가 모이거나 flush_interval_sec이 지나면 flush
+    - 실패 시 지수 백오프로 재시도, 그래도 실패하면 로컬 spool 파일(line protocol)에 append
+    - spool이 남아 있으면 새 배치도 spool 뒤에 붙인 뒤 순서대로 재전송 (옛 값이 새 값을 덮지 않도록)
+    - adopt_spool: 종료된 다른 replica가 남긴 spool을 이어받아 재전송
+    - on_flush: 실제로 DB에 반영된 뒤 {(measurement, symbol)}로 호출 (캐시 무효화 등)
+    - on_send: 배치 전송(재시도 포함)마다 (소요 시간, 성공 여부)로 호출 (metrics)
+    """
+
+    def __init__(
+        self,
+        write_api,  # SYNCHRONOUS write_api
+        bucket,
+        org,
+        spool_path,
+        batch_size=5000,
+        flush_interval_sec=1.0,
+        max_retries=3,
+        backoff_sec=1.0,
+        max_backoff_sec=30.0,
+        on_flush=None,
+        on_send=None,
+    ):
+        self.write_api = write_api
+        self.bucket = bucket
+        self.org = org
+        self.spool_path = str(spool_path)
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self.max_retries = max_retries
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.on_flush = on_flush
+        self.on_send = on_send
+
+        self._buffer = []  # line protocol 문자열
+        self._cond = threading.Condition()
+        self._closed = False
+        self._replay_pending = False  # 이어받은 spool -> 새 배치가 없어도 재전송
+        self._spool_lock = threading.Lock()
+        self.counters = {
+            "queued": 0,
+            "flushed": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "adopted": 0,
+        }
+
+        self._thread = threading.Thread(
+            target=self._run, name="influx-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, record, data_frame_measurement_name, data_frame_tag_columns):
+        """write_api.write(record=DataFrame, ...)와 같은 인자로 호출. 큐에 넣고 바로 반환."""
+        lines = data_frame_to_list_of_points(
+            record,
+            PointSettings(),
+            data_frame_measurement_name=data_frame_measurement_name,
+            data_frame_tag_columns=data_frame_tag_columns,
+        )
+        with self._cond:
+            self._buffer.extend(lines)
+            self.counters["queued"] += len(lines)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def adopt_spool(self, path):
+        """
+        다른 Worker가 남긴 spool을 내 spool 앞에 붙여서 이어받음 (옛 포인트가 먼저 재전송됨)
+        반환: 이어받은 포인트 수 (다른 replica가 먼저 가져갔으면 0)
+        """
+        path = str(path)
+        first, second = sorted([path, self.spool_path])
+        with self._spool_lock, spool_lock(first), spool_lock(second):
+            if not os.path.exists(path):
+                return 0
+            with open(path, "r") as f:
+                content = f.read()
+            lines = [line for line in content.splitlines() if line]
+            if lines and not content.endswith("\n"):
+                # append 도중 종료되어 잘린 마지막 줄은 DB가 배치 전체를 거부하므로 버림
+                print(f"[Writer] 잘린 spool 줄 버림: {lines.pop()[:80]}")
+            adopted = len(lines)
+            if os.path.exists(self.spool_path):
+                with open(self.spool_path, "r") as f:
+                    lines += [line for line in f.read().splitlines() if line]
+            tmp_path = f"{self.spool_path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.spool_path)  # 이어받은 뒤에 원본 삭제 (중간에 죽어도 유실 없음)
+            os.remove(path)
+
+        with self._cond:
+            self.counters["adopted"] += adopted
+            self._replay_pending = True
+            self._cond.notify()
+        print(f"[Writer] spool 이어받음: {path} ({adopted}개 포인트)")
+        return adopted
+
+    def stats(self):
+        with self._cond:
+            return {**self.counters, "pending": len(self._buffer)}
+
+    def close(self):
+        """남은 포인트를 모두 flush하고 스레드 종료"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _take_batch(self):
+        batch = self._buffer[: self.batch_size]
+        del self._buffer[: self.batch_size]
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed
+                    or self._replay_pending
+                    or len(self._buffer) >= self.batch_size,
+                    timeout=self.flush_interval_sec,
+                )
+                batch = self._take_batch()
+                replay, self._replay_pending = self._replay_pending, False
+                closing = self._closed and not self._buffer
+
+            if batch or replay:
+                self._flush(batch)
+            if closing:
+                return
+
+    def _send(self, lines):
+        """재시도(지수 백오프) 포함 전송. 성공 여부 반환"""
+        start = time.perf_counter()
+        ok = self._send_with_retry(lines)
+        if self.on_send is not None:
+            try:
+                self.on_send(time.perf_counter() - start, ok)
+            except Exception as e:
+                print(f"[Writer] on_send 에러: {e}")
+        return ok
+
+    def _send_with_retry(self, lines):
+        delay = self.backoff_sec
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                self.write_api.write(bucket=self.bucket, org=self.org, record=lines)
+                return True
+            except Exception as e:
+                print(f"[Writer] 쓰기 실패 ({attempt}/{self.max_retries}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_backoff_sec)
+        return False
+
+    def _flush(self, lines):
+        # 다른 replica가 이 spool을 이어받는 중이면 기다림
+        with self._spool_lock, spool_lock(self.spool_path):
+            self._flush_locked(lines)
+
+    def _flush_locked(self, lines):
+        if os.path.exists(self.spool_path):
+            # 장애 복구 전: 순서 보장을 위해 spool 뒤에 붙이고 spool 전체를 재전송
+            if lines:
+                self._spool(lines)
+            self._replay_spool()
+            return
+        if not lines:
+            return
+
+        if self._send(lines):
+            with self._cond:
+                self.counters["flushed"] += len(lines)
+            self._notify(lines)
+        else:
+            self._spool(lines)
+
+    def _spool(self, lines):
+        with open(self.spool_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+        with self._cond:
+            self.counters["spooled"] += len(lines)
+        print(f"[Writer] {len(lines)}개 포인트 spool 저장: {self.spool_path}")
+
+    def _replay_spool(self):
+        """spool 파일을 배치 단위로 재전송. 중간에 실패하면 파일을 남겨두고 다음 flush 때 재시도"""
+        with open(self.spool_path, "r") as f:
+            lines = [line for line in f.read().splitlines() if line]
+
+        for i in range(0, len(lines), self.batch_size):
+            if not self._send(lines[i : i + self.batch_size]):
+                # 이미 보낸 앞부분은 다시 보내도 같은 값으로 덮어써지므로 파일은 그대로 둠
+                return
+
+        os.remove(self.spool_path)
+        with self._cond:
+            self.counters["replayed"] += len(lines)
+            self.counters["flushed"] += len(lines)
+        print(f"[Writer] spool 재전송 완료 ({len(lines)}개 포인트)")
+        self._notify(lines)
+
+    def _notify(self, lines):
+        if self.on_flush is None:
+            return
+        try:
+            self.on_flush(series_keys(lines))
+        except Exception as e:
+            print(f"[Writer] on_flush 에러: {e}")
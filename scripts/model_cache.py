@@ -0,0 +1,49 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+class ModelCache:
+    """
+    파싱된 모델 객체를 프로세스 내에 보관하는 LRU 캐시
+    - 키: 파일 경로 / 유효성: (mtime, size)가 같으면 파일을 다시 읽지 않음
+    - mtime만 바뀐 경우(touch, 같은 내용 재배포)는 내용 해시로 비교해 재파싱을 피함
+    - version: 내용 해시 앞 12자리 (예측 결과 메모의 키로 사용)
+    """
+
+    def __init__(self, loader, max_size=16):
+        self.loader = loader  # str(JSON) -> model (예: prophet.serialize.model_from_json)
+        self.max_size = max_size
+        self._entries = OrderedDict()  # path -> (stat_key, version, model)
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """(model, version) 반환. 파일이 없으면 FileNotFoundError"""
+        path = str(path)
+        st = os.stat(path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat_key:
+                self._entries.move_to_end(path)
+                return entry[2], entry[1]
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        version = hashlib.sha1(raw).hexdigest()[:12]
+
+        if entry is not None and entry[1] == version:
+            model = entry[2]  # 내용은 그대로 -> 파싱 생략
+        else:
+            model = self.loader(raw.decode("utf-8"))
+            print(f"[ModelCache] 모델 로드: {path} (version={version})")
+
+        with self._lock:
+            self._entries[path] = (stat_key, version, model)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return model, version
@@ -0,0 +1,175 @@
+"""
+Prophet 모델 재학습 (Worker의 프로세스 풀에서 실행)
+- 심볼별 최신 종가 윈도우로 drift 검사 -> 기준을 넘을 때만 재학습
+  (모델 없음 / 학습 후 경과 시간 / 새 봉에 대한 예측 오차(MAPE) / 변동성 변화)
+- 재학습은 기존 모델 설정 그대로, 기존 파라미터로 warm start (처음부터 최적화하지 않음)
+- 새 모델 JSON은 원자적으로 교체 -> 예측 쪽 ModelCache가 재시작 없이 다음 예측부터 사용
+CPU 작업이므로 수집 스레드와 GIL을 나누지 않도록 별도 프로세스에서 실행함.
+"""
+
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from static_publisher import atomic_write
+
+# 재학습 기준 기본값 (Worker에서 환경 변수로 덮어씀)
+DEFAULT_POLICY = {
+    "min_bars": 24 * 7,  # 학습에 필요한 최소 봉 수
+    "max_age_hours": 24 * 7,  # 마지막 학습 이후 이 시간이 지나면 무조건 재학습
+    "eval_bars": 24,  # 오차/변동성 비교에 쓰는 최근 봉 수
+    "mape": 0.03,  # 학습 이후 새 봉에 대한 예측 오차가 이보다 크면 재학습
+    "vol_ratio": 2.0,  # 최근 수익률 표준편차가 학습 구간의 N배(또는 1/N) 이상이면 재학습
+}
+
+
+def quiet_cmdstanpy():
+    """학습마다 찍히는 cmdstanpy INFO 로그 끄기 (핸들러가 없으면 cmdstanpy가 INFO로 다시 설정함)"""
+    logger = logging.getLogger("cmdstanpy")
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.WARNING)
+
+
+def load_model(path):
+    from prophet.serialize import model_from_json
+
+    path = Path(path)
+    if not path.exists():
+        return None
+    return model_from_json(path.read_text())
+
+
+def log_return_std(values):
+    values = np.asarray(values, dtype=np.float64)
+    if values.size < 3:
+        return None
+    return float(np.std(np.diff(np.log(values))))
+
+
+def check_drift(model, df, policy):
+    """
+    재학습 사유 (없으면 None)
+    df: 학습용 윈도우 (ds: tz-naive UTC, y: 종가), 시간순
+    """
+    if model is None:
+        return "no model"
+
+    train_end = model.history["ds"].max()
+    recent = df[df["ds"] > train_end]
+    if recent.empty:
+        return None  # 학습 이후 새 봉 없음
+
+    age_hours = (df["ds"].iloc[-1] - train_end).total_seconds() / 3600
+    if age_hours >= policy["max_age_hours"]:
+        return f"age {age_hours:.0f}h"
+
+    # 학습 이후 들어온 봉에 대한 예측 오차 (구간 추정은 필요 없으므로 샘플링 생략)
+    evaluated = recent.tail(policy["eval_bars"])
+    samples, model.uncertainty_samples = model.uncertainty_samples, 0
+    try:
+        yhat = model.predict(evaluated[["ds"]])["yhat"].to_numpy()
+    finally:
+        model.uncertainty_samples = samples  # 새 모델이 설정을 그대로 물려받도록 복원
+    y = evaluated["y"].to_numpy()
+    mape = float(np.mean(np.abs(yhat - y) / np.abs(y)))
+    if mape > policy["mape"]:
+        return f"mape {mape:.2%}"
+
+    # 변동성 변화 (학습 구간 마지막 eval_bars 봉 대비)
+    recent_std = log_return_std(df["y"].tail(policy["eval_bars"] + 1))
+    train_std = log_return_std(model.history["y"].tail(policy["eval_bars"] + 1))
+    if recent_std and train_std:
+        ratio = recent_std / train_std
+        if ratio > policy["vol_ratio"] or ratio < 1 / policy["vol_ratio"]:
+            return f"volatility x{ratio:.2f}"
+    return None
+
+
+def warm_start_params(model):
+    """기존 모델의 MAP 추정값 -> 새 학습의 초기값 (Prophet 문서의 'Updating fitted models')"""
+    params = {}
+    for name in ["k", "m", "sigma_obs"]:
+        params[name] = float(np.mean(model.params[name]))
+    for name in ["delta", "beta"]:
+        params[name] = np.mean(model.params[name], axis=0)
+    return params
+
+
+def new_model(previous=None):
+    """
+    학습 전 모델: 기존 모델이 있으면 같은 설정으로 (기본값은 모델이 아직 없을 때만)
+    growth / seasonality_mode / prior scale / interval_width / 추가 계절성 / regressor 유지
+    """
+    from prophet import Prophet
+    from prophet.diagnostics import prophet_copy
+
+    if previous is None:
+        return Prophet()
+    return prophet_copy(previous)
+
+
+def fit_model(df, previous=None):
+    if previous is not None and previous.growth == "logistic":
+        # logistic 추세는 cap / floor 컬럼이 필요 -> 기존 학습 구간의 마지막 값 사용
+        for column in ["cap", "floor"]:
+            if column in previous.history:
+                df = df.assign(**{column: previous.history[column].iloc[-1]})
+
+    if previous is not None:
+        try:
+            model = new_model(previous)
+            return model.fit(df, init=warm_start_params(previous)), True
+        except Exception as e:
+            # 계절성 설정이 바뀌어 파라미터 크기가 다르면 처음부터 학습
+            print(f"[Trainer] warm start 실패 -> 처음부터 학습: {e}")
+    return new_model(previous).fit(df), False
+
+
+def refresh_model(symbol, df, model_path, policy=None, force=False):
+    """
+    (프로세스 풀에서 실행) drift 검사 후 필요하면 재학습해서 model_path에 원자적으로 저장
+    df: timestamp(UTC) / close 컬럼
+    반환: {"symbol", "retrained", "reason", "warm_start", "bars", "seconds"}
+    """
+    from prophet.serialize import model_to_json
+
+    start = time.perf_counter()
+    quiet_cmdstanpy()
+    policy = {**DEFAULT_POLICY, **(policy or {})}
+
+    train_df = pd.DataFrame(
+        {
+            "ds": pd.to_datetime(df["timestamp"], utc=True).dt.tz_localize(None),
+            "y": df["close"].astype("float64"),
+        }
+    ).dropna()
+    result = {
+        "symbol": symbol,
+        "retrained": False,
+        "reason": None,
+        "warm_start": False,
+        "bars": len(train_df),
+    }
+
+    if len(train_df) < policy["min_bars"]:
+        result["reason"] = f"not enough bars ({len(train_df)})"
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    previous = load_model(model_path)
+    reason = "forced" if force else check_drift(previous, train_df, policy)
+    result["reason"] = reason
+    if reason is None:
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    model, warm = fit_model(train_df, previous)
+    atomic_write(Path(model_path), model_to_json(model).encode())
+
+    result.update(retrained=True, warm_start=warm)
+    result["seconds"] = time.perf_counter() - start
+    return result
@@ -0,0 +1,175 @@
+"""
+로컬 OHLCV 저장소 (Worker가 쓰고 API가 mmap으로 읽는 InfluxDB 앞단의 읽기 계층)
+- (measurement, symbol)마다 고정 길이 레코드 파일 1개
+  헤더(16B) + 레코드 [ts(ms), open, high, low, close, volume] * N
+  ts 오름차순, 새 봉은 파일 끝에 append, 같은 ts의 봉(아직 열린 봉)은 제자리에서 덮어씀
+- 헤더의 since: 이 시각 이후 데이터는 InfluxDB와 같음을 보장 (Worker가 DB에서 재생성할 때 기록)
+  -> 요청 구간이 since 이후면 파일만으로 응답, 아니면 None (InfluxDB로 조회)
+- 읽기: 파일을 mmap한 뒤 ts 컬럼을 이진 탐색해서 구간만 복사 (네트워크 / CSV 파싱 없음)
+InfluxDB가 원본이며, 이 파일은 언제 지워도 Worker의 다음 재생성 때 다시 만들어짐.
+(제자리 덮어쓰기 중에 읽으면 그 봉 하나가 섞인 값일 수 있으나 다음 조회에서 바로 맞춰짐)
+"""
+
+import fcntl
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ["open", "high", "low", "close", "volume"]
+RECORD_DTYPE = np.dtype([("ts", "<i8")] + [(f, "<f8") for f in FIELDS])
+MAGIC = b"OHLCV1\0\0"
+HEADER_SIZE = 16  # MAGIC + since(ms, int64)
+LOCK_NAME = ".lock"
+
+
+def to_records(df):
+    """DatetimeIndex(UTC) + OHLCV 컬럼 DataFrame -> ts 오름차순 레코드 배열"""
+    records = np.empty(len(df), dtype=RECORD_DTYPE)
+    records["ts"] = df.index.tz_convert(None).to_numpy().astype("datetime64[ms]")
+    for f in FIELDS:
+        records[f] = df[f].to_numpy(dtype=np.float64)
+    return np.sort(records, order="ts")
+
+
+def to_ms(ts):
+    return int(pd.Timestamp(ts).value // 1_000_000)
+
+
+class OHLCVStore:
+    def __init__(self, root):
+        self.root = Path(root)
+        self._maps = {}  # path -> (inode, size, (since, memmap))  읽기 쪽 mmap 재사용
+        self._lock = threading.Lock()
+
+    def path(self, measurement, symbol):
+        safe_symbol = symbol.replace("/", "_")
+        return self.root / measurement / f"{safe_symbol}.bin"
+
+    @contextmanager
+    def _write_lock(self, path):
+        """같은 measurement 파일을 쓰는 Worker 스레드 / replica 간 배타 잠금"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(path.parent / LOCK_NAME, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # 쓰기 (Worker)
+    def replace(self, measurement, symbol, df, since):
+        """DB에서 다시 읽은 구간(since 이후 전체)으로 파일 교체 (원자적, 오래된 봉도 여기서 정리됨)"""
+        path = self.path(measurement, symbol)
+        with self._write_lock(path):
+            self._rewrite(path, to_ms(since), to_records(df))
+
+    def upsert(self, measurement, symbol, df):
+        """
+        새로 저장한 봉 반영: 마지막 봉 이후는 append, 이미 있는 ts는 제자리 덮어쓰기
+        중간에 없던 봉이 끼어드는 경우에만 파일 전체를 다시 씀
+        파일이 없으면(아직 DB에서 재생성 전) 아무것도 하지 않음 -> False
+        since 이전 봉(backfill 등)은 버림
+        """
+        path = self.path(measurement, symbol)
+        with self._write_lock(path):
+            try:
+                f = open(path, "r+b")
+            except FileNotFoundError:
+                return False
+            with f:
+                header = f.read(HEADER_SIZE)
+                since_ms = np.frombuffer(header, np.int64, 1, len(MAGIC))[0]
+                records = to_records(df)
+                records = records[records["ts"] >= since_ms]  # since 이전은 보장 범위 밖
+                existing = np.fromfile(f, dtype=RECORD_DTYPE)
+                last_ts = existing["ts"][-1] if len(existing) else np.iinfo("i8").min
+                old = records[records["ts"] <= last_ts]
+                pos = np.searchsorted(existing["ts"], old["ts"])
+                if len(old) and not np.array_equal(existing["ts"][pos], old["ts"]):
+                    # 중간 삽입 -> 병합해서 다시 씀 (backfill 등 드문 경우)
+                    merged = np.concatenate(
+                        [existing[~np.isin(existing["ts"], records["ts"])], records]
+                    )
+                    merged = np.sort(merged, order="ts")
+                    self._rewrite(path, since_ms, merged)
+                    return True
+
+                for i, record in zip(pos, old):
+                    f.seek(HEADER_SIZE + int(i) * RECORD_DTYPE.itemsize)
+                    f.write(record.tobytes())
+                new = records[records["ts"] > last_ts]
+                if len(new):
+                    f.seek(0, os.SEEK_END)
+                    f.write(new.tobytes())
+        return True
+
+    def discard(self, measurement, symbol):
+        """파일 삭제 (쓰기 실패 등으로 내용을 믿을 수 없을 때 -> 재생성 전까지 InfluxDB로 조회)"""
+        path = self.path(measurement, symbol)
+        with self._write_lock(path):
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _rewrite(path, since_ms, records):
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC + np.int64(since_ms).tobytes())
+            f.write(records.tobytes())
+        os.replace(tmp_path, path)
+
+    # 읽기 (API)
+    def _mapped(self, path):
+        """파일이 교체(inode)되거나 커졌을 때만 다시 mmap (제자리 덮어쓰기는 mmap에 바로 보임)"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        cached = self._maps.get(path)
+        if cached is not None and cached[:2] == (st.st_ino, st.st_size):
+            return cached[2]
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            header = np.fromfile(f, dtype=np.int64, count=1)
+        count = (st.st_size - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        records = (
+            np.memmap(path, RECORD_DTYPE, "r", offset=HEADER_SIZE, shape=(count,))
+            if count > 0
+            else np.empty(0, dtype=RECORD_DTYPE)
+        )
+        mapped = (int(header[0]), records)
+        self._maps[path] = (st.st_ino, st.st_size, mapped)
+        return mapped
+
+    def read(self, measurement, symbol, start, stop=None, fields=None, limit=None):
+        """
+        [start, stop) 구간 (limit: 마지막 N개) -> timestamp + 필드 DataFrame
+        파일이 없거나 구간이 since 이전부터면 None (InfluxDB로 조회해야 함)
+        """
+        mapped = self._mapped(self.path(measurement, symbol))
+        if mapped is None:
+            return None
+        since_ms, records = mapped
+
+        ts = records["ts"]
+        start_ms, stop_ms = to_ms(start), to_ms(stop) if stop is not None else None
+        begin = np.searchsorted(ts, max(start_ms, since_ms), "left")
+        end = np.searchsorted(ts, stop_ms, "left") if stop_ms is not None else len(ts)
+        if start_ms < since_ms:
+            # since 이전 데이터는 모름 -> limit개가 since 이후로 다 채워질 때만 응답 가능
+            if not limit or end - begin < limit:
+                return None
+        if limit:
+            begin = max(begin, end - limit)
+
+        window = records[begin:end]
+        timestamps = pd.DatetimeIndex(window["ts"].astype("datetime64[ms]"))
+        columns = {"timestamp": timestamps.tz_localize("UTC")}
+        for f in fields or FIELDS:
+            columns[f] = np.array(window[f])  # mmap과 분리 (파일이 교체돼도 안전)
+        return pd.DataFrame(columns, copy=False)
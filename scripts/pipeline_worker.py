@@ -5,9 +5,53 @@ from influxdb_client.client.write_api import SYNCHRONOUS
 from prophet.serialize import model_from_json
 import os
 import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import json
+import argparse
+import multiprocessing
+import signal
+import socket
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from data_versions import bump_version
+from event_bus import EventPublisher, bars_event, forecast_event
+from exchange_client import ExchangeClient
+from forecasting import ForecastCache
+from flux_queries import query_last_times, query_window
+from influx_writer import BufferedWriter, orphan_spools
+from model_cache import ModelCache
+from model_trainer import refresh_model
+from ohlcv_store import OHLCVStore
+from rollups import (
+    ROLLUP_LOOKBACK_DAYS,
+    bucket_starts,
+    rollup_changed,
+    rollup_measurement,
+)
+from scheduler import Scheduler
+from static_publisher import StaticPublisher
+from symbol_universe import ShardMembership, SymbolUniverse
+from worker_metrics import (
+    ALL_SYMBOLS,
+    record_cycle_lag,
+    record_error,
+    record_stage,
+    record_write,
+    record_write_stats,
+    stage_timer,
+    start_metrics_server,
+)
 
 INFLUXDB_URL = os.getenv("INFLUXDB_URL")
 INFLUXDB_TOKEN = os.getenv("INFLUXDB_TOKEN")
@@ -17,43 +61,139 @@ INFLUXDB_BUCKET = os.getenv("INFLUXDB_BUCKET")
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODELS_DIR = BASE_DIR / "models"
 STATIC_DIR = BASE_DIR / "static_data"
+STATE_DIR = BASE_DIR / "state"  # 워커 내부 상태 (spool 등)
 os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs(STATIC_DIR, exist_ok=True)
+os.makedirs(STATE_DIR, exist_ok=True)
+
+# static_data 파일은 모두 이 publisher로 발행 (원자적 교체 + .gz + manifest.json)
+static_publisher = StaticPublisher(STATIC_DIR)
 
-# 수집 대상 및 설정
-TARGET_COINS = ["BTC/USDT", "ETH/USDT", "XRP/USDT", "SOL/USDT", "DOGE/USDT"]
+# API가 mmap으로 읽는 로컬 OHLCV 저장소 (InfluxDB에 쓰는 봉/롤업을 같이 씀, 비어 있으면 사용 안 함)
+# DB에서 History/롤업을 재생성할 때 파일을 통째로 교체하고, 이후에는 바뀐 봉만 append/덮어쓰기
+OHLCV_STORE_DIR = os.getenv("OHLCV_STORE_DIR", str(BASE_DIR / "ohlcv_store"))
+local_store = OHLCVStore(OHLCV_STORE_DIR) if OHLCV_STORE_DIR else None
+
+# 수집 대상 및 설정 (심볼 목록은 admin과 같은 설정 파일, 바뀌면 다음 수집 사이클부터 반영)
+SYMBOLS_FILE = os.getenv("SYMBOLS_FILE", str(BASE_DIR / "config" / "symbols.json"))
+symbol_universe = SymbolUniverse(SYMBOLS_FILE)
+TARGET_COINS = symbol_universe.symbols
 TIMEFRAME = "1h"
 LOOKBACK_DAYS = 30  # 과거 30일치 데이터 유지
 
+# 동시 실행 설정
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))  # 동시에 처리할 심볼 수
+SYMBOL_TIMEOUT_SEC = int(os.getenv("SYMBOL_TIMEOUT_SEC", "45"))  # 심볼당 최대 대기 시간
 
-def get_last_timestamp(query_api, symbol):
-    """
-    InfluxDB에서 해당 코인의 가장 마지막 데이터 시간(Timestamp)을 조회
+# 거래소 설정 (요청 간격은 모든 심볼이 공유, 기본값은 ccxt의 rateLimit)
+EXCHANGE_MIN_INTERVAL_MS = int(os.getenv("EXCHANGE_MIN_INTERVAL_MS", "0")) or None
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "3"))
+
+# DB 쓰기 설정 (배치 + 장애 시 로컬 spool)
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", "5000"))
+WRITE_FLUSH_INTERVAL_SEC = float(os.getenv("WRITE_FLUSH_INTERVAL_SEC", "1"))
+WRITE_SPOOL_PATH = STATE_DIR / "write_spool.lp"
+
+# Worker replica 간 심볼 분배 (SHARD_DIR: 모든 replica가 공유하는 디렉토리, 비어 있으면 전체 담당)
+SHARD_DIR = os.getenv("SHARD_DIR", "")
+WORKER_ID = os.getenv("WORKER_ID") or socket.gethostname()
+SHARD_TTL_SEC = int(os.getenv("SHARD_TTL_SEC", "30"))
+SHARD_HEARTBEAT_SEC = int(os.getenv("SHARD_HEARTBEAT_SEC", "10"))
+if SHARD_DIR:
+    # state 볼륨을 replica들이 같이 쓰므로 spool은 Worker별로 분리
+    # (WORKER_ID는 컨테이너가 새로 만들어지면 바뀜 -> 주인이 없는 spool은 adopt_orphan_spools)
+    WRITE_SPOOL_PATH = STATE_DIR / f"write_spool_{WORKER_ID}.lp"
+shard = None
+active_symbols = []  # 이 Worker가 담당하는 심볼 (refresh_assignment가 갱신)
+
+# API 프로세스로 새 봉/예측을 push하는 포트 (0이면 사용 안 함)
+EVENTS_PORT = int(os.getenv("EVENTS_PORT", "8765"))
+events = None
+
+# Prometheus metrics 포트 (0이면 사용 안 함)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+# 스케줄 설정
+TIMEFRAME_SEC = ccxt.Exchange.parse_timeframe(TIMEFRAME)  # 1h -> 3600
+INGEST_INTERVAL_SEC = int(os.getenv("INGEST_INTERVAL_SEC", "60"))  # 수집 주기
+# 봉 마감 직후 거래소에 확정 봉이 반영될 때까지의 여유
+CANDLE_CLOSE_DELAY_SEC = int(os.getenv("CANDLE_CLOSE_DELAY_SEC", "5"))
+
+# History 스냅샷용 OHLCV 윈도우 (symbol -> DataFrame, 최근 LOOKBACK_DAYS)
+# 시작 시 DB에서 한 번 전체 생성한 뒤로는 새로 가져온 봉만 병합함
+HISTORY_COLUMNS = ["open", "high", "low", "close", "volume"]
+history_windows = {}
+history_rebuild_pending = set()  # 다음 수집 때 DB에서 전체 재생성할 심볼
+
+# 상위 타임프레임 롤업 ((symbol, tf) -> DataFrame)
+# 시작 시 DB에서 1h를 집계해 채우고, 이후에는 바뀐 1h 봉이 속한 상위 봉만 다시 집계
+ROLLUP_TIMEFRAMES = [
+    tf
+    for tf in os.getenv("ROLLUP_TIMEFRAMES", "4h,1d,1w").split(",")
+    if tf in ROLLUP_LOOKBACK_DAYS
+]
+rollup_windows = {}
+
+# 심볼별 최근 저장 봉 (변경 감지용, symbol -> DataFrame)
+# 거래소에서 다시 받은 봉 중 새 봉/값이 바뀐 봉만 DB에 씀
+TAIL_BARS = 48
+recent_tails = {}
+
+# 파싱된 모델 캐시 (파일이 바뀌었을 때만 다시 로드)
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", "16"))
+model_cache = ModelCache(model_from_json, max_size=MODEL_CACHE_SIZE)
+
+# 심볼별 마지막 예측 키 (모델 version, 예측 시작 시각) -> 같으면 재계산/재저장 생략
+last_forecast_keys = {}
+
+# 예측 구간 계산 방식 (full: Prophet 기본 1000회 시뮬레이션, 기본값 / 선택: sampled는
+# FORECAST_SAMPLES회, analytic은 시뮬레이션 없이 분산 식으로 계산) + 모델별로
+# FORECAST_CACHE_HOURS만큼 미리 예측해 두고 다음 정시부터는 겹치는 구간을 잘라서 사용
+# 기본값은 Prophet 그대로인 full. 심볼이 많은 배포는 FORECAST_MODE=analytic 권장
+# (선형 추세 모델만 지원, 그 외는 sampled로 대체 / 비교는 tests/bench_forecast.py 참고)
+FORECAST_MODE = os.getenv("FORECAST_MODE", "full")
+FORECAST_SAMPLES = int(os.getenv("FORECAST_SAMPLES", "200"))
+FORECAST_CACHE_HOURS = int(os.getenv("FORECAST_CACHE_HOURS", "72"))
+forecast_cache = ForecastCache(
+    FORECAST_MODE, FORECAST_SAMPLES, cache_hours=FORECAST_CACHE_HOURS
+)
+
+# 모델 재학습 (프로세스 풀, 0이면 사용 안 함)
+# 매 TRAIN_INTERVAL_SEC마다 drift를 검사하고 기준을 넘은 심볼만 재학습해서 models/에 교체
+TRAIN_PROCESSES = int(os.getenv("TRAIN_PROCESSES", "2"))
+TRAIN_INTERVAL_SEC = int(os.getenv("TRAIN_INTERVAL_SEC", "3600"))
+TRAIN_OFFSET_SEC = int(os.getenv("TRAIN_OFFSET_SEC", "1800"))  # 예측(정시)과 겹치지 않게
+TRAIN_LOOKBACK_DAYS = int(os.getenv("TRAIN_LOOKBACK_DAYS", "90"))
+TRAIN_POLICY = {
+    "max_age_hours": int(os.getenv("TRAIN_MAX_AGE_HOURS", "168")),
+    "mape": float(os.getenv("TRAIN_MAPE_THRESHOLD", "0.03")),
+    "vol_ratio": float(os.getenv("TRAIN_VOL_RATIO", "2.0")),
+}
+trainer = None
+
+
+def get_last_timestamps(query_api, symbols):
     """
-    query = f"""
-    from(bucket: "{INFLUXDB_BUCKET}")
-      |> range(start: -{LOOKBACK_DAYS}d)
-      |> filter(fn: (r) => r["_measurement"] == "ohlcv")
-      |> filter(fn: (r) => r["symbol"] == "{symbol}")
-      |> last(column: "_time")
+    InfluxDB에서 여러 코인의 가장 마지막 데이터 시간(Timestamp)을 한 번에 조회
+    {symbol: last_time} / 데이터가 없는 심볼은 빠짐
     """
     try:
-        result = query_api.query(query=query)
-        if len(result) > 0 and len(result[0].records) > 0:
-            last_time = result[0].records[0].get_time()
-            # InfluxDB 시간은 UTC timezone이 포함됨.
-            return last_time
+        # InfluxDB 시간은 UTC timezone이 포함됨.
+        with stage_timer(ALL_SYMBOLS, "last_times_query"):
+            return query_last_times(
+                query_api, INFLUXDB_BUCKET, "ohlcv", symbols, f"-{LOOKBACK_DAYS}d"
+            )
     except Exception as e:
-        print(f"[{symbol}] DB 조회 중 에러 (아마 데이터 없음): {e}")
+        print(f"[{', '.join(symbols)}] DB 조회 중 에러 (아마 데이터 없음): {e}")
 
-    return None
+    return {}
 
 
-def save_history_to_json(df, symbol):
+def save_history_to_json(df, symbol, timeframe=TIMEFRAME):
     """
-    과거 데이터(1h) 정적 파일 생성
-    TODO: 지금은 단순하게 1시간 봉에 대해서만 정적 파일을 생성하고 있는데, (predict도 마찬가지)
-    추후에 확장할 것.
+    과거 데이터 정적 파일 생성 (.json + 같은 내용의 .arrow)
+    기본(1h): history_<symbol>.json / 상위 타임프레임: history_<symbol>_<tf>.json
+    TODO: predict는 아직 1시간 봉에 대해서만 생성
     """
     try:
         export_df = df.copy()
@@ -67,54 +207,158 @@ def save_history_to_json(df, symbol):
                 ["timestamp", "open", "high", "low", "close", "volume"]
             ].to_dict(orient="records"),
             "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-            "type": "history_1h",
+            "type": f"history_{timeframe}",
         }
 
         safe_symbol = symbol.replace("/", "_")
-        file_path = STATIC_DIR / f"history_{safe_symbol}.json"
-
-        with open(file_path, "w") as f:
-            json.dump(json_output, f)  # indet=None로 용량 절약
+        suffix = "" if timeframe == TIMEFRAME else f"_{timeframe}"
+        file_path = static_publisher.publish(
+            f"history_{safe_symbol}{suffix}.json", json_output
+        )
+        # 같은 내용의 Arrow 스냅샷 (admin 등 pandas 클라이언트용)
+        static_publisher.publish_frame(
+            f"history_{safe_symbol}{suffix}.arrow",
+            df[HISTORY_COLUMNS],
+            {
+                "symbol": symbol,
+                "updated_at": json_output["updated_at"],
+                "type": json_output["type"],
+            },
+        )
 
         print(f"[{symbol}] 정적 파일 생성 완료: {file_path}")
     except Exception as e:
         print(f"[{symbol}] 정적 파일 생성 실패: {e}")
 
 
-def fetch_and_save(write_api, symbol, since_ts):
+def write_local_store(measurement, symbol, df, since=None):
     """
-    ccxt로 데이터 가져와서 InfluxDB에 저장
+    로컬 OHLCV 저장소에 반영 (since가 있으면 DB에서 재생성한 since 이후 구간으로 파일 교체)
+    API는 이 파일을 DB보다 먼저 읽으므로 바뀌면 데이터 버전도 올림
+    (DB flush를 기다리면 InfluxDB 장애 중에는 새 봉이 있어도 계속 304가 나감)
+    실패하면 다음 수집 때 DB에서 다시 재생성 (그 전까지 API는 InfluxDB로 조회)
     """
-    exchange = ccxt.binance()
+    if local_store is None:
+        return
+    try:
+        if since is None:
+            changed = local_store.upsert(measurement, symbol, df)
+        else:
+            local_store.replace(measurement, symbol, df, since)
+            changed = True
+        if changed:
+            bump_version(STATIC_DIR, measurement, symbol)
+    except Exception as e:
+        print(f"[{symbol}] 로컬 저장소 쓰기 실패 ({measurement}): {e}")
+        local_store.discard(measurement, symbol)
+        history_rebuild_pending.add(symbol)
 
-    # since_ts가 datetime 객체라면 밀리초(int)로 변환 필요
-    if isinstance(since_ts, datetime):
-        since_ms = int(since_ts.timestamp() * 1000)
-    else:
-        since_ms = int(since_ts)  # 이미 int면 그대로
 
+def flux_start(since):
+    return since.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def ohlcv_to_frame(ohlcv, symbol):
+    """ccxt OHLCV 리스트 -> InfluxDB 저장용 DataFrame (index: UTC timestamp, tag: symbol)"""
+    df = pd.DataFrame(
+        ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
+    )
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms").dt.tz_localize("UTC")
+    df.set_index("timestamp", inplace=True)
+
+    # 태그 추가
+    df["symbol"] = symbol
+    return df
+
+
+def to_ms(ts):
+    # ts가 datetime 객체라면 밀리초(int)로 변환 필요
+    if isinstance(ts, datetime):
+        return int(ts.timestamp() * 1000)
+    return int(ts)  # 이미 int면 그대로
+
+
+def select_changed_bars(symbol, df):
+    """
+    가져온 봉 중 새 봉 / 값이 바뀐 봉(아직 열린 봉)만 골라내고 tail 갱신
+    tail이 없으면(신규 심볼, History 재생성 실패) 전부 변경으로 간주
+    """
+    tail = recent_tails.get(symbol)
+    if tail is None:
+        tail = empty_history_window()
+
+    # 새 봉은 tail에 없어서 NaN이므로 != 비교에서 True
+    prev = tail.reindex(df.index)
+    changed = df[(df[HISTORY_COLUMNS] != prev).any(axis=1)]
+
+    if not changed.empty:
+        merged = pd.concat(
+            [tail[~tail.index.isin(changed.index)], changed[HISTORY_COLUMNS]]
+        )
+        recent_tails[symbol] = merged.sort_index().tail(TAIL_BARS)
+    return changed
+
+
+def fetch_and_save(writer, exchange, symbol, since_ts):
+    """
+    ccxt로 데이터 가져와서 InfluxDB에 저장
+    공백이 1000봉(약 41일)을 넘어도 페이지 단위로 끝까지 가져옴
+    이미 저장된 값과 같은 봉은 다시 쓰지 않음 -> 변경된 봉 DataFrame 반환 (없으면 None)
+    """
     try:
         # 데이터 가져오기
-        ohlcv = exchange.fetch_ohlcv(
-            symbol, TIMEFRAME, since=since_ms, limit=1000
-        )  # 약 41일 치
+        ohlcv = []
+        with stage_timer(symbol, "fetch"):
+            for page in exchange.iter_ohlcv_pages(symbol, TIMEFRAME, to_ms(since_ts)):
+                ohlcv.extend(page)
 
         if not ohlcv:
             print(f"[{symbol}] 새로운 데이터 없음.")
-            return
+            return None
 
-        df = pd.DataFrame(
-            ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
+        df = select_changed_bars(symbol, ohlcv_to_frame(ohlcv, symbol))
+        if df.empty:
+            print(f"[{symbol}] 변경된 봉 없음 ({len(ohlcv)}개 확인)")
+            return None
+
+        # 저장
+        writer.write(
+            record=df,
+            data_frame_measurement_name="ohlcv",
+            data_frame_tag_columns=["symbol"],
         )
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms").dt.tz_localize(
-            "UTC"
+        print(
+            f"[{symbol}] {len(df)}/{len(ohlcv)}개 봉 저장 완료 (Last: {df.index[-1]})"
         )
-        df.set_index("timestamp", inplace=True)
 
-        # 태그 추가
-        df["symbol"] = symbol
+        return df
 
-        # 저장
+    except Exception as e:
+        print(f"[{symbol}] 수집 실패: {e}")
+        return None
+
+
+def backfill_checkpoint_path(symbol):
+    return STATE_DIR / f"backfill_{symbol.replace('/', '_')}.json"
+
+
+def backfill_symbol(exchange, write_api, symbol, since_ms, until_ms, fresh=False):
+    """
+    긴 구간을 페이지 단위로 수집/저장 (신규 심볼 시딩, 긴 lookback 용)
+    페이지를 DB에 동기로 쓴 뒤 체크포인트를 남기므로, 중간에 죽어도 마지막 페이지 다음부터 재개함.
+    (체크포인트가 있으면 인자로 받은 구간 대신 체크포인트의 구간을 이어서 진행)
+    """
+    checkpoint = backfill_checkpoint_path(symbol)
+    if checkpoint.exists() and not fresh:
+        with open(checkpoint, "r") as f:
+            state = json.load(f)
+        since_ms, until_ms = state["cursor"], state["until"]
+        print(f"[{symbol}] Backfill 재개: {pd.to_datetime(since_ms, unit='ms')}부터")
+
+    step_ms = TIMEFRAME_SEC * 1000
+    total = 0
+    for page in exchange.iter_ohlcv_pages(symbol, TIMEFRAME, since_ms, until_ms):
+        df = ohlcv_to_frame(page, symbol)
         write_api.write(
             bucket=INFLUXDB_BUCKET,
             org=INFLUXDB_ORG,
@@ -122,35 +366,80 @@ def fetch_and_save(write_api, symbol, since_ts):
             data_frame_measurement_name="ohlcv",
             data_frame_tag_columns=["symbol"],
         )
-        print(f"[{symbol}] {len(df)}개 봉 저장 완료 (Last: {df.index[-1]})")
+        # Worker의 로컬 저장소가 있으면 빈 구간을 메운 봉도 반영 (since 이전 봉은 무시됨)
+        write_local_store("ohlcv", symbol, df)
+        total += len(page)
 
-        # TODO: SSG 파일 생성을 DB 조회 후 덮어쓰기로 구현?
+        # 체크포인트 (임시 파일에 쓴 뒤 교체 -> 쓰다 죽어도 깨진 파일이 남지 않음)
+        tmp_path = checkpoint.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"cursor": page[-1][0] + step_ms, "until": until_ms}, f)
+        os.replace(tmp_path, checkpoint)
+
+    checkpoint.unlink(missing_ok=True)
+    print(f"[{symbol}] Backfill 완료: {total}개 봉")
+    return total
 
-    except Exception as e:
-        print(f"[{symbol}] 수집 실패: {e}")
 
+def run_backfill(symbols, since_ms, until_ms, fresh=False):
+    """여러 심볼 Backfill을 동시에 실행 (거래소 요청 간격은 모든 심볼이 공유)"""
+    print(f"[Backfill] {symbols} / Concurrency: {BACKFILL_CONCURRENCY}")
 
-def run_prediction_and_save(write_api, symbol):
+    client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    write_api = client.write_api(write_options=SYNCHRONOUS)
+    exchange = ExchangeClient(min_interval_ms=EXCHANGE_MIN_INTERVAL_MS)
+
+    with ThreadPoolExecutor(max_workers=BACKFILL_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(
+                backfill_symbol, exchange, write_api, symbol, since_ms, until_ms, fresh
+            ): symbol
+            for symbol in symbols
+        }
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                # 체크포인트가 남아 있으므로 다시 실행하면 이어서 진행
+                print(f"[{symbol}] Backfill 중단: {e}")
+
+    client.close()
+
+
+def run_prediction_and_save(writer, symbol):
     """모델 로드 -> 예측 -> 저장"""
     # 모델 로드
-    model_file = MODELS_DIR / f"model_{symbol.replace('/', '_')}.json"
+    model_file = model_path(symbol)
     if not model_file.exists():
         print(f"[{symbol}] 모델 없음")
         return
 
     try:
-        with open(model_file, "r") as fin:
-            model = model_from_json(fin.read())
+        with stage_timer(symbol, "model_load"):
+            model, model_version = model_cache.get(model_file)
 
-        # 예측 (현재 시점부터 24시간)
+        # 예측 (다음 정시부터 24시간)
         now = datetime.now(timezone.utc)
-        # .replace(minute=0, second=0, microsecond=0) => UTC 통일
-        future = pd.DataFrame({"ds": pd.date_range(start=now, periods=24, freq="h")})
-        future["ds"] = future["ds"].dt.tz_localize(None)  # prophet은 tz-naive
+        horizon_start = now.replace(minute=0, second=0, microsecond=0) + timedelta(
+            hours=1
+        )
+        forecast_key = (model_version, horizon_start)
+        if last_forecast_keys.get(symbol) == forecast_key:
+            print(f"[{symbol}] 모델/예측 구간 변화 없음 -> 예측 생략")
+            return
 
-        # As-Is: 여기서는 과거 데이터 없이 모델이 기억하는 패턴으로만 예측
-        # To-Do: Training Worker 구축
-        forecast = model.predict(future)
+        # 과거 데이터 없이 모델이 기억하는 패턴으로 예측
+        # (모델은 run_training이 drift를 보고 최신 봉으로 재학습해서 교체함)
+        # 모델이 그대로면 이전에 미리 예측해 둔 구간에서 잘라옴
+        with stage_timer(symbol, "predict"):
+            forecast = forecast_cache.get(
+                symbol,
+                model,
+                model_version,
+                horizon_start.replace(tzinfo=None),  # prophet은 tz-naive
+                24,
+            )
 
         # 필요한 데이터만 추출
         next_24h = forecast[forecast["ds"] > now.replace(tzinfo=None)].head(24).copy()
@@ -181,12 +470,11 @@ def run_prediction_and_save(write_api, symbol):
             "forecast": export_data.to_dict(orient="records"),
         }
 
-        # 파일 저장 (덮어쓰기)
+        # 파일 저장 (원자적 교체)
         safe_symbol = symbol.replace("/", "_")
-        file_path = STATIC_DIR / f"prediction_{safe_symbol}.json"
-
-        with open(file_path, "w") as f:
-            json.dump(json_output, f, indent=2)
+        file_path = static_publisher.publish(
+            f"prediction_{safe_symbol}.json", json_output
+        )
 
         print(f"[{symbol}] SSG 파일 생성 완료: {file_path}")
 
@@ -199,74 +487,605 @@ def run_prediction_and_save(write_api, symbol):
         next_24h.set_index("timestamp", inplace=True)  # InfluxDB는 index가 timestamp
         next_24h["symbol"] = symbol
 
-        write_api.write(
-            bucket=INFLUXDB_BUCKET,
-            org=INFLUXDB_ORG,
+        static_publisher.publish_frame(
+            f"prediction_{safe_symbol}.arrow",
+            next_24h[["yhat", "yhat_lower", "yhat_upper"]].rename(
+                columns={
+                    "yhat": "price",
+                    "yhat_lower": "lower_bound",
+                    "yhat_upper": "upper_bound",
+                }
+            ),
+            {"symbol": symbol, "updated_at": json_output["updated_at"]},
+        )
+
+        writer.write(
             record=next_24h,
             data_frame_measurement_name="prediction",
             data_frame_tag_columns=["symbol"],
         )
         print(f"[{symbol}] {len(next_24h)}개 예측 저장 완료")
+        last_forecast_keys[symbol] = forecast_key
+        publish_event(
+            forecast_event(symbol, next_24h, ["yhat", "yhat_lower", "yhat_upper"])
+        )
 
     except Exception as e:
         print(f"[{symbol}] 예측 에러: {e}")
+        record_error(symbol, "predict_job")
+
+
+def model_path(symbol):
+    return MODELS_DIR / f"model_{symbol.replace('/', '_')}.json"
 
 
-def update_full_history_file(query_api, symbol):
-    """DB에서 최근 30일치 데이터를 긁어와서 history json 파일 갱신"""
-    query = f"""
-    from(bucket: "{INFLUXDB_BUCKET}")
-      |> range(start: -30d)
-      |> filter(fn: (r) => r["_measurement"] == "ohlcv")
-      |> filter(fn: (r) => r["symbol"] == "{symbol}")
-      |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-      |> sort(columns: ["_time"], desc: false)
+def create_trainer():
+    # Worker는 스레드(수집, writer, publisher)가 도는 중이므로 fork 대신 spawn
+    return ProcessPoolExecutor(
+        max_workers=TRAIN_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def load_training_frames(query_api, symbols):
+    """전체 심볼의 학습 윈도우(종가)를 한 번의 쿼리로 조회 -> {symbol: DataFrame}"""
+    with stage_timer(ALL_SYMBOLS, "train_query"):
+        return query_window(
+            query_api,
+            INFLUXDB_BUCKET,
+            "ohlcv",
+            symbols,
+            f"-{TRAIN_LOOKBACK_DAYS}d",
+            fields=["close"],
+        )
+
+
+def on_trained(symbol, round_state, future):
+    """재학습 결과 처리 (풀의 관리 스레드에서 호출)"""
+    try:
+        result = future.result()
+    except Exception as e:
+        print(f"[{symbol}] 재학습 에러: {e}")
+        record_error(symbol, "train")
+    else:
+        record_stage(symbol, "train", result["seconds"])
+        if result["retrained"]:
+            mode = "warm start" if result["warm_start"] else "cold start"
+            print(
+                f"[{symbol}] 모델 교체 ({result['reason']}, {mode}, "
+                f"{result['bars']}봉, {result['seconds']:.1f}s)"
+            )
+        else:
+            print(f"[{symbol}] 재학습 생략 ({result['reason'] or 'drift 없음'})")
+
+    with round_state["lock"]:
+        round_state["pending"] -= 1
+        if round_state["pending"] == 0:
+            elapsed = time.perf_counter() - round_state["start"]
+            record_stage(ALL_SYMBOLS, "train_round", elapsed)
+            print(f"[Trainer] 재학습 라운드 완료 ({elapsed:.1f}s)")
+
+
+def run_training(query_api, training, symbols=None, force=False):
+    """
+    재학습 작업 1회
+    학습 데이터는 담당 심볼 전체를 한 번에 읽고, drift 검사/학습은 심볼별로 프로세스 풀에 제출함.
+    결과는 기다리지 않으므로 스케줄러(수집/예측)를 막지 않음.
+    - training: symbol -> Future. 이전 라운드가 남아 있으면 이번 라운드는 건너뜀
     """
+    global trainer
+    if any(not future.done() for future in training.values()):
+        print("[Trainer] 이전 재학습이 아직 실행 중 -> 이번 라운드 건너뜀")
+        return
+
+    symbols = symbols or active_symbols
+    if not symbols:
+        return
+
     try:
-        df = query_api.query_data_frame(query)
-        if not df.empty:
-            df.rename(columns={"_time": "timestamp"}, inplace=True)  # UTC Aware
-            df.set_index("timestamp", inplace=True)
+        frames = load_training_frames(query_api, symbols)
+    except Exception as e:
+        print(f"[Trainer] 학습 데이터 조회 실패: {e}")
+        return
+    if not frames:
+        return
+
+    round_state = {
+        "lock": threading.Lock(),
+        "pending": len(frames),
+        "start": time.perf_counter(),
+    }
+    for symbol, df in frames.items():
+        args = (symbol, df[["timestamp", "close"]], str(model_path(symbol)))
+        try:
+            future = trainer.submit(refresh_model, *args, TRAIN_POLICY, force)
+        except BrokenProcessPool:
+            # 학습 프로세스가 비정상 종료됨 -> 풀을 새로 만들어서 다시 제출
+            print("[Trainer] 프로세스 풀 재생성")
+            trainer = create_trainer()
+            future = trainer.submit(refresh_model, *args, TRAIN_POLICY, force)
+        training[symbol] = future
+        future.add_done_callback(partial(on_trained, symbol, round_state))
+
+
+def run_train_command(symbols, force):
+    """재학습 1라운드를 바로 실행하고 끝날 때까지 대기 (수동 실행 / 심볼별 소요 시간 확인용)"""
+    global trainer
+    client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
+    trainer = create_trainer()
+    training = {}
+    try:
+        run_training(client.query_api(), training, symbols, force)
+        wait(list(training.values()))
+    finally:
+        trainer.shutdown()
+        client.close()
+
+
+def empty_history_window():
+    return pd.DataFrame(
+        columns=HISTORY_COLUMNS,
+        index=pd.DatetimeIndex([], tz="UTC", name="timestamp"),
+        dtype=float,
+    )
+
+
+def rebuild_history(query_api, symbols):
+    """
+    DB에서 최근 30일치 데이터를 한 번에 긁어와서 심볼별 history 윈도우/json 파일 전체 재생성
+    (시작 시 또는 재생성 요청 시에만 호출)
+    """
+    # 로컬 저장소는 since 이후 구간만 보장 -> 상대 시간 대신 같은 시각으로 조회
+    since = pd.Timestamp.now(tz="UTC").floor("s") - pd.Timedelta(days=LOOKBACK_DAYS)
+    try:
+        with stage_timer(ALL_SYMBOLS, "history_query"):
+            frames = query_window(
+                query_api, INFLUXDB_BUCKET, "ohlcv", symbols, flux_start(since)
+            )
+    except Exception as e:
+        print(f"[{', '.join(symbols)}] History 갱신 중 에러: {e}")
+        return
+
+    for symbol in symbols:
+        df = frames.get(symbol)
+        if df is None:
+            # 아직 데이터가 없는 신규 심볼 -> 빈 윈도우에서 시작 (수집분이 병합됨)
+            history_windows[symbol] = empty_history_window()
+        else:
+            df.set_index("timestamp", inplace=True)  # UTC Aware
+            history_windows[symbol] = df[HISTORY_COLUMNS]
+            # 변경 감지 기준 = DB에 저장된 최근 봉
+            recent_tails[symbol] = df[HISTORY_COLUMNS].tail(TAIL_BARS)
             save_history_to_json(df, symbol)
+        history_rebuild_pending.discard(symbol)
+        write_local_store("ohlcv", symbol, history_windows[symbol], since)
+
+
+def merge_history(symbol, new_df):
+    """
+    방금 가져온 봉을 메모리 윈도우에 병합 (같은 시간은 새 값으로 교체)
+    LOOKBACK_DAYS 밖으로 밀려난 봉은 버리고, 내용이 바뀐 경우에만 json 파일을 다시 씀.
+    """
+    window = history_windows[symbol]
+    new_rows = new_df[HISTORY_COLUMNS]
+
+    merged = pd.concat([window[~window.index.isin(new_rows.index)], new_rows])
+    merged.sort_index(inplace=True)
+    cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=LOOKBACK_DAYS)
+    merged = merged[merged.index >= cutoff]
+
+    if merged.equals(window):
+        return False
+
+    history_windows[symbol] = merged
+    save_history_to_json(merged, symbol)
+    return True
+
+
+def rebuild_rollups(query_api, writer, symbols):
+    """
+    DB의 1h 데이터를 서버에서 집계(aggregateWindow)해 롤업 윈도우를 다시 채우고 측정값/json 갱신
+    (시작 시 또는 재생성 요청 시에만 호출, 타임프레임마다 전체 심볼 1번의 쿼리)
+    """
+    now = pd.Timestamp.now(tz="UTC").floor("s")
+    for tf in ROLLUP_TIMEFRAMES:
+        # 봉 경계로 내림: aggregateWindow는 첫 창을 range 시작에서 자르므로
+        # 정렬되지 않은 since면 첫 봉이 어중간한 시각의 부분 봉이 됨
+        lookback = pd.DatetimeIndex([now - pd.Timedelta(days=ROLLUP_LOOKBACK_DAYS[tf])])
+        since = bucket_starts(lookback, tf)[0]
+        try:
+            frames = query_window(
+                query_api,
+                INFLUXDB_BUCKET,
+                "ohlcv",
+                symbols,
+                flux_start(since),
+                every=tf,
+            )
+        except Exception as e:
+            print(f"[{', '.join(symbols)}] {tf} 롤업 재생성 중 에러: {e}")
+            continue
+
+        for symbol in symbols:
+            df = frames.get(symbol)
+            if df is None:
+                rollup_windows[(symbol, tf)] = empty_history_window()
+            else:
+                df.set_index("timestamp", inplace=True)
+                bars = df[HISTORY_COLUMNS].copy()
+                rollup_windows[(symbol, tf)] = bars
+                write_rollup(writer, symbol, tf, bars)
+                save_history_to_json(bars, symbol, tf)
+            write_local_store(
+                rollup_measurement(tf), symbol, rollup_windows[(symbol, tf)], since
+            )
+
+
+def write_rollup(writer, symbol, timeframe, bars):
+    record = bars.copy()
+    record["symbol"] = symbol
+    writer.write(
+        record=record,
+        data_frame_measurement_name=rollup_measurement(timeframe),
+        data_frame_tag_columns=["symbol"],
+    )
+
+
+def update_rollups(writer, symbol, changed):
+    """바뀐 1h 봉이 속한 상위 봉만 다시 집계해서 저장/게시"""
+    hourly = history_windows[symbol]
+    for tf in ROLLUP_TIMEFRAMES:
+        window = rollup_windows.get((symbol, tf))
+        if window is None:
+            continue  # 재생성 실패 -> 다음 재생성 때 채워짐
+
+        bars = rollup_changed(hourly, changed.index, tf)
+        if bars.empty:
+            continue
+
+        merged = pd.concat([window[~window.index.isin(bars.index)], bars])
+        merged.sort_index(inplace=True)
+        cutoff = pd.Timestamp.now(tz="UTC") - pd.Timedelta(
+            days=ROLLUP_LOOKBACK_DAYS[tf]
+        )
+        rollup_windows[(symbol, tf)] = merged[merged.index >= cutoff]
+
+        write_rollup(writer, symbol, tf, bars)
+        write_local_store(rollup_measurement(tf), symbol, bars)
+        save_history_to_json(rollup_windows[(symbol, tf)], symbol, tf)
+
+
+def request_history_rebuild(signum=None, frame=None):
+    """전체 심볼의 History를 다음 수집 때 DB에서 재생성 (SIGHUP으로 요청 가능)"""
+    print("[History] 전체 재생성 요청됨")
+    history_rebuild_pending.update(TARGET_COINS)
+
+
+def ingest_symbol(writer, exchange, last_times, symbol):
+    """
+    심볼 하나에 대한 수집 -> History 갱신
+    History는 메모리 윈도우에 증분 병합하며, DB 전체 조회는 시작 시/요청 시에만 수행.
+    """
+    # 시작 시간 결정 (Since)
+    last_time = last_times.get(symbol)
+    if last_time:
+        # 마지막 데이터가 있으면, 그 시간부터 다시 가져옴 (덮어쓰기 업데이트)
+        since = last_time
+    else:
+        # 데이터가 아예 없으면 30일 전부터
+        since = datetime.now(timezone.utc) - timedelta(days=LOOKBACK_DAYS)
+        print(f"[{symbol}] 초기 데이터 수집 시작 (30일 전부터)")
+
+    # 수집
+    df = fetch_and_save(writer, exchange, symbol, since)
+    if df is not None:
+        publish_event(bars_event(symbol, TIMEFRAME, df, HISTORY_COLUMNS))
+
+    # History / 롤업 / 로컬 저장소 갱신 (윈도우가 없으면 = 재생성 실패, 다음 사이클에 다시 재생성)
+    if df is not None and symbol in history_windows:
+        write_local_store("ohlcv", symbol, df)
+        merge_history(symbol, df)
+        update_rollups(writer, symbol, df)
+
+
+def forget_symbol(symbol):
+    """다른 Worker로 넘어간 심볼의 메모리 상태 삭제 (다시 맡게 되면 DB에서 재생성)"""
+    history_windows.pop(symbol, None)
+    recent_tails.pop(symbol, None)
+    last_forecast_keys.pop(symbol, None)
+    history_rebuild_pending.discard(symbol)
+    for tf in ROLLUP_TIMEFRAMES:
+        rollup_windows.pop((symbol, tf), None)
+
+
+def refresh_assignment():
+    """
+    설정 파일 변경 / replica 증감을 반영해서 이 Worker의 담당 심볼 갱신
+    새로 맡은 심볼은 윈도우가 없으므로 이번 수집에서 DB로부터 재생성됨
+    """
+    global TARGET_COINS, active_symbols
+    if symbol_universe.reload():
+        TARGET_COINS = symbol_universe.symbols
+        print(f"[Symbols] 심볼 목록 변경: {len(TARGET_COINS)}개")
+
+    owned = TARGET_COINS if shard is None else shard.assign(TARGET_COINS)
+    released = [s for s in active_symbols if s not in owned]
+    acquired = [s for s in owned if s not in active_symbols]
+    for symbol in released:
+        forget_symbol(symbol)
+    if shard is not None and (released or acquired):
+        print(
+            f"[Shard] {WORKER_ID}: {len(owned)}/{len(TARGET_COINS)}개 담당 "
+            f"(+{len(acquired)} -{len(released)}, Workers: {len(shard.members())})"
+        )
+    active_symbols = list(owned)
+    return active_symbols
+
+
+def adopt_orphan_spools(writer):
+    """
+    heartbeat가 살아 있는 주인이 없는 spool(재생성 / 축소된 replica, 샤딩 전 write_spool.lp)을
+    이어받아 재전송 -> DB 장애 중에 쌓인 포인트가 WORKER_ID가 바뀌어도 유실되지 않음
+    (재시작이 ttl 안에 끝나면 이전 주인이 아직 살아 있어 보이므로 매 수집 사이클 확인)
+    """
+    live = shard.members() if shard is not None else []
+    for path in orphan_spools(STATE_DIR, writer.spool_path, live):
+        try:
+            writer.adopt_spool(path)
+        except OSError as e:
+            print(f"[Writer] spool 이어받기 실패 ({path}): {e}")
+
+
+def run_ingest(executor, in_flight, query_api, writer, exchange):
+    """
+    수집 작업 1회 (이 Worker가 담당하는 심볼만)
+    DB 조회(마지막 시간, History 재생성)는 전체 심볼을 한 번의 쿼리로 처리하고,
+    거래소 수집/병합만 심볼별로 병렬 실행함.
+    """
+    symbols = refresh_assignment()
+    adopt_orphan_spools(writer)
+    if not symbols:
+        print("[Shard] 담당 심볼 없음")
+        return
+
+    last_times = get_last_timestamps(query_api, symbols)
+
+    stale = [
+        symbol
+        for symbol in symbols
+        if symbol not in history_windows or symbol in history_rebuild_pending
+    ]
+    stale_rollups = [
+        symbol
+        for symbol in symbols
+        if symbol in stale
+        or any((symbol, tf) not in rollup_windows for tf in ROLLUP_TIMEFRAMES)
+    ]
+    # 이번 사이클에 발행한 파일은 끝날 때 manifest에 한 번에 반영
+    with static_publisher.batch():
+        if stale:
+            rebuild_history(query_api, stale)
+        if stale_rollups:
+            rebuild_rollups(query_api, writer, stale_rollups)
+
+        run_cycle(
+            executor,
+            in_flight,
+            partial(ingest_symbol, writer, exchange, last_times),
+            symbols,
+        )
+    record_cycle_lag("ingest", INGEST_INTERVAL_SEC, CANDLE_CLOSE_DELAY_SEC)
+    stats = writer.stats()
+    record_write_stats(stats)
+    print(f"[Writer] {stats}")
+
+
+def run_predict(executor, in_flight, writer):
+    """예측 작업 1회 (봉 마감마다)"""
+    with static_publisher.batch():
+        run_cycle(
+            executor,
+            in_flight,
+            partial(run_prediction_and_save, writer),
+            active_symbols,
+        )
+    record_cycle_lag("predict", TIMEFRAME_SEC, CANDLE_CLOSE_DELAY_SEC)
+    print(f"[Forecast] {forecast_cache.stats()}")
+
+
+def run_cycle(executor, in_flight, task, symbols):
+    """
+    심볼별 작업(task(symbol))을 스레드 풀에 병렬로 제출하고 완료를 기다림.
+    - in_flight: symbol -> Future. 수집/예측 작업이 공유하므로, 이전 작업이 아직
+      돌고 있는 심볼은 중복 제출하지 않음. (심볼 내 단계 순서 보장)
+    - 실행 시작 후 SYMBOL_TIMEOUT_SEC를 넘긴 심볼은 기다리지 않고 사이클을 끝냄.
+      (스레드는 강제 종료할 수 없으므로, 끝날 때까지 해당 심볼만 다음 사이클에서 건너뜀)
+    """
+    started_at = {}  # symbol -> 실제 실행 시작 시각 (큐 대기 시간은 타임아웃에서 제외)
+
+    def _run(symbol):
+        started_at[symbol] = time.monotonic()
+        task(symbol)
+
+    pending = {}
+    for symbol in symbols:
+        prev = in_flight.get(symbol)
+        if prev is not None and not prev.done():
+            print(f"[{symbol}] 이전 사이클 작업이 아직 실행 중 -> 이번 사이클 건너뜀")
+            continue
+        future = executor.submit(_run, symbol)
+        in_flight[symbol] = future
+        pending[future] = symbol
+
+    while pending:
+        done, _ = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+        for future in done:
+            symbol = pending.pop(future)
+            if not future.cancelled() and future.exception() is not None:
+                print(f"[{symbol}] 처리 중 에러: {future.exception()}")
+                record_error(symbol, "task")
+
+        now = time.monotonic()
+        for future, symbol in list(pending.items()):
+            start = started_at.get(symbol)
+            if start is not None and now - start > SYMBOL_TIMEOUT_SEC:
+                print(f"[{symbol}] 타임아웃 ({SYMBOL_TIMEOUT_SEC}s) -> 기다리지 않고 진행")
+                record_error(symbol, "timeout")
+                del pending[future]
+
+        # 남은 작업이 전부 큐 대기 중인데 모든 스레드가 멈춘 심볼에 잡혀 있으면
+        # 영원히 시작되지 못하므로 이번 사이클에서는 취소
+        if pending and not any(f.running() for f in pending):
+            busy = sum(1 for f in in_flight.values() if f.running())
+            if busy >= WORKER_CONCURRENCY:
+                for future, symbol in pending.items():
+                    future.cancel()
+                    print(f"[{symbol}] 실행 슬롯 없음 -> 이번 사이클 취소")
+                pending.clear()
+
+
+def publish_event(event):
+    """접속된 API 프로세스로 이벤트 전송 (backfill 등 publisher가 없으면 무시)"""
+    if events is None:
+        return
+    try:
+        events.publish(event)
     except Exception as e:
-        print(f"[{symbol}] History 갱신 중 에러: {e}")
+        print(f"[Events] 전송 실패: {e}")
+
+
+def notify_data_changed(series):
+    """
+    DB 반영이 끝난 (measurement, symbol)의 데이터 버전을 올림
+    API는 이 버전이 바뀌면 캐시를 버리고 다시 조회함
+    """
+    for measurement, symbol in series:
+        if symbol:
+            bump_version(STATIC_DIR, measurement, symbol)
 
 
 def run_worker():
-    print(f"[Pipeline Worker] Started. Target: {TARGET_COINS}, Timeframe: {TIMEFRAME}")
+    global events, trainer, shard
+    print(
+        f"[Pipeline Worker] Started. Target: {TARGET_COINS}, Timeframe: {TIMEFRAME}, "
+        f"Concurrency: {WORKER_CONCURRENCY}, Forecast: {FORECAST_MODE}"
+    )
 
     client = InfluxDBClient(url=INFLUXDB_URL, token=INFLUXDB_TOKEN, org=INFLUXDB_ORG)
     write_api = client.write_api(write_options=SYNCHRONOUS)
     query_api = client.query_api()
 
-    while True:
-        print(f"\n[Cycle] 작업 시작: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    # 모든 쓰기는 배치 Writer를 거침 (flush/재시도/spool은 백그라운드 스레드에서)
+    writer = BufferedWriter(
+        write_api,
+        INFLUXDB_BUCKET,
+        INFLUXDB_ORG,
+        WRITE_SPOOL_PATH,
+        batch_size=WRITE_BATCH_SIZE,
+        flush_interval_sec=WRITE_FLUSH_INTERVAL_SEC,
+        on_flush=notify_data_changed,
+        on_send=record_write,
+    )
 
-        for symbol in TARGET_COINS:
-            # DB에서 마지막 데이터 시간 확인
-            last_time = get_last_timestamp(query_api, symbol)
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+        print(f"[Metrics] 포트 {METRICS_PORT}에서 /metrics 노출")
 
-            # 시작 시간 결정 (Since)
-            if last_time:
-                # 마지막 데이터가 있으면, 그 시간부터 다시 가져옴 (덮어쓰기 업데이트)
-                since = last_time
-            else:
-                # 데이터가 아예 없으면 30일 전부터
-                since = datetime.now(timezone.utc) - timedelta(days=LOOKBACK_DAYS)
-                print(f"[{symbol}] 초기 데이터 수집 시작 (30일 전부터)")
+    # 여러 replica로 실행할 때 심볼 분배 (heartbeat는 별도 스레드)
+    if SHARD_DIR:
+        shard = ShardMembership(
+            SHARD_DIR, WORKER_ID, SHARD_TTL_SEC, SHARD_HEARTBEAT_SEC
+        )
+        shard.start()
+        print(f"[Shard] {WORKER_ID}: {SHARD_DIR}의 Worker들과 심볼 분배")
+
+    # 새 봉/예측 push (API 프로세스들이 접속해서 구독)
+    if EVENTS_PORT:
+        events = EventPublisher(port=EVENTS_PORT)
+        print(f"[Events] 포트 {events.port}에서 구독 대기")
+
+    # 거래소 클라이언트는 한 번만 만들어 모든 사이클/심볼이 공유
+    exchange = ExchangeClient(min_interval_ms=EXCHANGE_MIN_INTERVAL_MS)
+
+    # 사이클이 끝나도 멈춘 작업이 남아 있을 수 있으므로 with 블록(종료 시 join) 대신 계속 재사용
+    executor = ThreadPoolExecutor(
+        max_workers=WORKER_CONCURRENCY, thread_name_prefix="symbol"
+    )
+    in_flight = {}
+
+    signal.signal(signal.SIGHUP, request_history_rebuild)
+    # docker stop(SIGTERM) 시에도 버퍼에 남은 포인트를 flush하고 종료
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # 모델 재학습 프로세스 풀 (drift가 있는 심볼만 재학습, 결과는 ModelCache가 자동 반영)
+    training = {}
+    if TRAIN_PROCESSES:
+        trainer = create_trainer()
+
+    scheduler = Scheduler()
+    # 수집: 매 분 정각 (+ 여유) / 같은 시각이면 수집이 먼저 실행됨
+    scheduler.add_job(
+        "ingest",
+        partial(run_ingest, executor, in_flight, query_api, writer, exchange),
+        interval_sec=INGEST_INTERVAL_SEC,
+        offset_sec=CANDLE_CLOSE_DELAY_SEC,
+    )
+    # 예측: 봉 마감마다 한 번 (1h -> 매 정시 + 여유)
+    scheduler.add_job(
+        "predict",
+        partial(run_predict, executor, in_flight, writer),
+        interval_sec=TIMEFRAME_SEC,
+        offset_sec=CANDLE_CLOSE_DELAY_SEC,
+    )
+    if trainer is not None:
+        # 재학습: 매시 30분 (정시의 수집/예측과 겹치지 않게), 시작 시에는 바로 drift 검사
+        scheduler.add_job(
+            "train",
+            partial(run_training, query_api, training),
+            interval_sec=TRAIN_INTERVAL_SEC,
+            offset_sec=TRAIN_OFFSET_SEC,
+        )
+    try:
+        scheduler.run_forever()
+    finally:
+        if shard is not None:
+            shard.leave()  # 남은 Worker가 ttl을 기다리지 않고 바로 넘겨받음
+        if trainer is not None:
+            trainer.shutdown(wait=False, cancel_futures=True)
+        print("[Writer] 종료 전 flush...")
+        writer.close()
+        client.close()
+        if events is not None:
+            events.close()
 
-            # 수집
-            fetch_and_save(write_api, symbol, since)
 
-            # History 파일 갱신
-            update_full_history_file(query_api, symbol)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Coin pipeline worker")
+    sub = parser.add_subparsers(dest="command")
 
-            # 예측
-            run_prediction_and_save(write_api, symbol)
+    backfill = sub.add_parser("backfill", help="긴 구간 OHLCV 수집 (중단 시 재개 가능)")
+    backfill.add_argument("--days", type=int, default=LOOKBACK_DAYS)
+    backfill.add_argument("--symbols", nargs="+", default=TARGET_COINS)
+    backfill.add_argument(
+        "--fresh", action="store_true", help="남아 있는 체크포인트를 무시하고 새로 시작"
+    )
 
-        print("1분 대기 중...")
-        time.sleep(60)  # 1분마다 반복
+    train = sub.add_parser("train", help="drift 검사 후 모델 재학습 1회 (소요 시간 출력)")
+    train.add_argument("--symbols", nargs="+", default=TARGET_COINS)
+    train.add_argument("--force", action="store_true", help="drift와 상관없이 재학습")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    run_worker()
+    args = parse_args()
+    if args.command == "backfill":
+        now = datetime.now(timezone.utc)
+        run_backfill(
+            args.symbols,
+            to_ms(now - timedelta(days=args.days)),
+            to_ms(now),
+            fresh=args.fresh,
+        )
+    elif args.command == "train":
+        run_train_command(args.symbols, args.force)
+    else:
+        run_worker()
@@ -0,0 +1,48 @@
+import pandas as pd
+
+# 상위 타임프레임 -> 기본 보관 기간(일)
+ROLLUP_LOOKBACK_DAYS = {"4h": 180, "1d": 365, "1w": 730}
+
+# 주봉은 월요일 00:00 UTC 시작 (거래소 주봉과 동일)
+# epoch(1970-01-01)은 목요일이므로 4일 밀어서 맞춤
+WEEK_OFFSET = pd.Timedelta(days=4)
+
+
+def rollup_measurement(timeframe):
+    return f"ohlcv_{timeframe}"
+
+
+def bucket_starts(index, timeframe):
+    """1h 봉 시각 -> 해당 봉이 속한 상위 타임프레임 봉의 시작 시각"""
+    if timeframe == "1w":
+        return (index - WEEK_OFFSET).floor("7D") + WEEK_OFFSET
+    return index.floor(pd.Timedelta(timeframe))
+
+
+def aggregate_ohlcv(df, timeframe):
+    """1h OHLCV -> 상위 타임프레임 OHLCV (open=first, high=max, low=min, close=last, volume=sum)"""
+    bars = df.groupby(bucket_starts(df.index, timeframe)).agg(
+        open=("open", "first"),
+        high=("high", "max"),
+        low=("low", "min"),
+        close=("close", "last"),
+        volume=("volume", "sum"),
+    )
+    bars.index.name = "timestamp"
+    return bars
+
+
+def rollup_changed(hourly, changed_index, timeframe):
+    """
+    바뀐 1h 봉이 속한 상위 봉만 다시 집계
+    윈도우 시작보다 먼저 시작한(일부가 잘린) 상위 봉은 다시 계산하지 않음 (저장된 값 유지)
+    """
+    if hourly.empty:
+        return hourly
+    buckets = bucket_starts(changed_index, timeframe).unique()
+    buckets = buckets[buckets >= hourly.index.min()]
+    if buckets.empty:
+        return hourly.iloc[0:0]
+
+    src = hourly[bucket_starts(hourly.index, timeframe).isin(buckets)]
+    return aggregate_ohlcv(src, timeframe)
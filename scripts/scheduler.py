@@ -0,0 +1,69 @@
+import time
+from datetime import datetime
+
+
+def next_aligned(now, interval_sec, offset_sec=0):
+    """
+    now 이후 처음 오는 (interval 경계 + offset) 시각 (epoch 초)
+    예) interval=3600, offset=15 -> 매 정시 15초
+    """
+    base = (now - offset_sec) // interval_sec * interval_sec + offset_sec
+    return base + interval_sec
+
+
+class Job:
+    """일정 주기로 실행되는 작업. 실행 시각은 epoch 기준 interval 경계에 정렬됨."""
+
+    def __init__(self, name, func, interval_sec, offset_sec=0, run_on_start=True):
+        self.name = name
+        self.func = func
+        self.interval_sec = interval_sec
+        self.offset_sec = offset_sec
+        if run_on_start:
+            self.next_run = time.time()
+        else:
+            self.next_run = next_aligned(time.time(), interval_sec, offset_sec)
+
+    def reschedule(self):
+        # 실행이 길어져 놓친 슬롯은 몰아서 실행하지 않고 다음 경계로 건너뜀
+        self.next_run = next_aligned(time.time(), self.interval_sec, self.offset_sec)
+
+
+class Scheduler:
+    """
+    작업별 주기를 가진 단일 스레드 스케줄러.
+    sleep(고정 간격)과 달리 작업 실행 시간만큼 밀리지 않음.
+    같은 시각에 도래한 작업은 등록 순서대로 실행됨. (예: 수집 -> 예측)
+    """
+
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, name, func, interval_sec, offset_sec=0, run_on_start=True):
+        job = Job(name, func, interval_sec, offset_sec, run_on_start)
+        self.jobs.append(job)
+        return job
+
+    def run_pending(self):
+        now = time.time()
+        for job in self.jobs:
+            if job.next_run > now:
+                continue
+
+            print(
+                f"\n[Scheduler] {job.name} 시작: "
+                f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            )
+            start = time.monotonic()
+            try:
+                job.func()
+            except Exception as e:
+                print(f"[Scheduler] {job.name} 에러: {e}")
+            print(f"[Scheduler] {job.name} 완료 ({time.monotonic() - start:.1f}s)")
+            job.reschedule()
+
+    def run_forever(self):
+        while True:
+            self.run_pending()
+            wake_at = min(job.next_run for job in self.jobs)
+            time.sleep(max(0.0, wake_at - time.time()))
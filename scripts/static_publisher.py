@@ -0,0 +1,157 @@
+"""
+static_data(SSG) 파일 발행
+- 임시 파일에 쓰고 fsync 후 rename -> nginx가 쓰는 도중의 파일을 서빙하지 않음
+- .gz (brotli 모듈이 있으면 .br도) 를 미리 만들어 둠 -> nginx gzip_static으로 압축 없이 바로 서빙
+- manifest.json: 파일별 sha256 / 크기 / 갱신 시각 -> 클라이언트는 이것만 보고 바뀐 파일만 받음
+  (Worker replica 여러 개가 같은 디렉토리에 발행하므로 파일 lock 안에서 읽고-고쳐-씀)
+  manifest는 전체 심볼 수만큼 커지므로 수집 사이클 안의 발행은 batch()로 모아서 한 번만 갱신
+- 같은 스냅샷을 Arrow IPC(.arrow)로도 발행 -> 클라이언트는 JSON 파싱 없이 타입 있는 컬럼을 그대로 읽음
+"""
+
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pyarrow as pa
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_LOCK_NAME = ".manifest.lock"  # nginx는 .으로 시작하는 파일을 서빙하지 않음
+
+
+def encode_json(payload):
+    """공백 없는 JSON (모든 정적 파일 공통)"""
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def encode_arrow(df, metadata=None):
+    """
+    DatetimeIndex DataFrame -> Arrow IPC file bytes
+    timestamp(UTC) + float64 컬럼, 압축 없음 (읽는 쪽에서 mmap / zero-copy로 바로 사용)
+    symbol / updated_at 등은 schema metadata에 넣음
+    """
+    frame = df.astype("float64").rename_axis("timestamp").reset_index()
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata(
+            {k: str(v) for k, v in metadata.items()}
+        )
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def atomic_write(path, data):
+    """같은 디렉토리의 임시 파일에 쓰고 fsync -> rename (읽는 쪽은 항상 이전 또는 새 파일 전체를 봄)"""
+    tmp_name = f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp_path = path.with_name(tmp_name)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """프로세스 간 배타 lock (같은 볼륨을 쓰는 다른 Worker replica와 직렬화)"""
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class StaticPublisher:
+    def __init__(self, static_dir, gzip_level=9, brotli_quality=5):
+        self.static_dir = static_dir
+        self.gzip_level = gzip_level
+        # brotli 기본값(11)은 100KB JSON 하나에 수백 ms -> 매 수집 사이클 발행에는 5 정도가 적당
+        self.brotli_quality = brotli_quality
+        self._lock = threading.Lock()  # manifest는 여러 심볼 스레드가 함께 갱신
+        self._batches = 0  # 열려 있는 batch() 수
+        self._pending = {}  # batch 중 발행된 name -> manifest entry
+
+    def _load_manifest(self):
+        try:
+            with open(self.static_dir / MANIFEST_NAME, "r") as f:
+                return json.load(f).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def publish(self, name, payload):
+        """payload(dict) -> name(.json) + 압축본 + manifest 갱신. 파일 경로 반환"""
+        return self.publish_bytes(name, encode_json(payload))
+
+    def publish_frame(self, name, df, metadata=None):
+        """DataFrame -> name(.arrow) + 압축본 + manifest 갱신"""
+        return self.publish_bytes(name, encode_arrow(df, metadata))
+
+    def publish_bytes(self, name, data):
+        path = self.static_dir / name
+
+        # 압축본을 먼저 교체 (본 파일이 바뀐 시점에는 압축본도 이미 새 내용)
+        gz_data = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+        atomic_write(path.with_name(name + ".gz"), gz_data)
+        entry = {
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "bytes": len(data),
+            "gzip_bytes": len(gz_data),
+            "updated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        if brotli is not None:
+            br_data = brotli.compress(data, quality=self.brotli_quality)
+            atomic_write(path.with_name(name + ".br"), br_data)
+            entry["br_bytes"] = len(br_data)
+        atomic_write(path, data)
+
+        with self._lock:
+            if self._batches:
+                self._pending[name] = entry
+                return path
+        self._update_manifest({name: entry})
+        return path
+
+    @contextmanager
+    def batch(self):
+        """
+        블록 안의 발행은 manifest를 끝날 때 한 번만 갱신
+        (발행마다 전체 manifest를 읽고 쓰면 replica당 비용이 전체 심볼 수에 비례해서 늘어남)
+        파일 자체는 바로 교체되고, manifest의 sha256 / updated_at만 블록이 끝날 때 반영됨
+        """
+        with self._lock:
+            self._batches += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batches -= 1
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._update_manifest(pending)
+
+    def _update_manifest(self, entries):
+        # 다른 replica가 방금 갱신했을 수 있으므로 매번 디스크에서 다시 읽음
+        with self._lock, file_lock(self.static_dir / MANIFEST_LOCK_NAME):
+            manifest = self._load_manifest()
+            manifest.update(entries)
+            atomic_write(
+                self.static_dir / MANIFEST_NAME,
+                encode_json({"files": dict(sorted(manifest.items()))}),
+            )
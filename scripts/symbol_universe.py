@@ -0,0 +1,123 @@
+"""
+수집 대상 심볼 목록 + Worker replica 간 심볼 분배
+- 심볼 목록: config/symbols.json (Worker / admin 공용, 파일이 바뀌면 재시작 없이 반영)
+- 분배: 공유 볼륨(SHARD_DIR)의 replica별 heartbeat 파일로 살아 있는 Worker 목록을 만들고
+  rendezvous hashing으로 심볼마다 담당 Worker 1개를 정함
+  -> 모든 Worker가 따로 계산해도 같은 결과, replica가 늘거나 죽으면 그 Worker 몫만 이동
+heartbeat가 SHARD_TTL_SEC 동안 갱신되지 않은 Worker는 죽은 것으로 보고 심볼을 넘겨받음.
+(목록이 바뀌는 순간 한 heartbeat 주기 동안은 두 Worker가 같은 심볼을 처리할 수 있으나,
+같은 봉/예측을 같은 값으로 다시 쓰는 것이므로 결과는 같음)
+"""
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+
+def load_symbols(path):
+    """{"symbols": ["BTC/USDT", ...]} -> 중복 제거된 목록 (순서 유지)"""
+    with open(path, "r") as f:
+        symbols = json.load(f)["symbols"]
+    if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+        raise ValueError(f"symbols must be a list of strings: {path}")
+    return list(dict.fromkeys(s.strip() for s in symbols if s.strip()))
+
+
+class SymbolUniverse:
+    """설정 파일의 심볼 목록 (mtime이 바뀌면 다시 읽고, 읽기에 실패하면 이전 목록 유지)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._mtime = self.path.stat().st_mtime_ns
+        self.symbols = load_symbols(self.path)
+
+    def reload(self):
+        """목록이 바뀌었으면 True"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            if mtime == self._mtime:
+                return False
+            symbols = load_symbols(self.path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Symbols] 설정 파일 읽기 실패 -> 이전 목록 유지: {e}")
+            return False
+
+        self._mtime = mtime
+        if symbols == self.symbols:
+            return False
+        self.symbols = symbols
+        return True
+
+
+def shard_score(worker_id, symbol):
+    return hashlib.sha1(f"{worker_id}|{symbol}".encode()).digest()
+
+
+def owner_of(symbol, members):
+    """rendezvous hashing: (worker, symbol) 해시가 가장 큰 Worker가 담당"""
+    return max(members, key=lambda worker_id: shard_score(worker_id, symbol))
+
+
+class ShardMembership:
+    """
+    SHARD_DIR/<worker_id>.json heartbeat로 살아 있는 Worker 목록 관리
+    heartbeat는 별도 스레드에서 갱신 -> 수집 사이클이 길어져도 죽은 것으로 보이지 않음
+    """
+
+    def __init__(self, shard_dir, worker_id=None, ttl_sec=30, heartbeat_sec=10):
+        self.shard_dir = Path(shard_dir)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.worker_id = worker_id or socket.gethostname()
+        self.ttl_sec = ttl_sec
+        self.heartbeat_sec = heartbeat_sec
+        self._path = self.shard_dir / f"{self.worker_id}.json"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def heartbeat(self):
+        tmp_path = self._path.with_name(f".{self._path.name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"worker_id": self.worker_id, "pid": os.getpid()}, f)
+        os.replace(tmp_path, self._path)  # mtime = 마지막 heartbeat 시각
+
+    def start(self):
+        self.heartbeat()
+        self._thread = threading.Thread(
+            target=self._run, name="shard-heartbeat", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.heartbeat_sec):
+            try:
+                self.heartbeat()
+            except OSError as e:
+                print(f"[Shard] heartbeat 실패: {e}")
+
+    def members(self):
+        """heartbeat가 ttl 안에 갱신된 Worker 목록 (자기 자신은 항상 포함)"""
+        now = time.time()
+        alive = {self.worker_id}
+        for path in self.shard_dir.glob("*.json"):
+            try:
+                if now - path.stat().st_mtime <= self.ttl_sec:
+                    alive.add(path.stem)
+            except FileNotFoundError:
+                continue  # 그 사이 종료(leave)한 Worker
+        return sorted(alive)
+
+    def assign(self, symbols):
+        """이 Worker가 담당할 심볼 (설정 파일 순서 유지)"""
+        members = self.members()
+        return [s for s in symbols if owner_of(s, members) == self.worker_id]
+
+    def leave(self):
+        """정상 종료 시 heartbeat 파일 삭제 -> 다른 Worker가 ttl을 기다리지 않고 바로 넘겨받음"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_sec)
+        self._path.unlink(missing_ok=True)
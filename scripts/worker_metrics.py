@@ -0,0 +1,73 @@
+"""
+Worker Prometheus metrics (METRICS_PORT의 /metrics로 노출)
+- worker_stage_duration_seconds{symbol, stage}: fetch / history_query / model_load / predict / write
+  / train(심볼별 drift 검사 + 재학습) / train_round(재학습 라운드 전체 wall-clock)
+- worker_cycle_lag_seconds{job}: 봉 마감(스케줄 경계) 후 작업이 끝나기까지 걸린 시간
+- worker_errors_total{symbol, stage}
+"""
+
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+ALL_SYMBOLS = "all"  # 전체 심볼을 한 번에 처리하는 단계(배치 쿼리, 쓰기)의 symbol 라벨
+
+STAGE_DURATION = Histogram(
+    "worker_stage_duration_seconds",
+    "Duration of a worker stage",
+    ["symbol", "stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+CYCLE_LAG = Gauge(
+    "worker_cycle_lag_seconds",
+    "Seconds between the scheduled boundary (candle close) and job completion",
+    ["job"],
+)
+ERRORS = Counter("worker_errors_total", "Worker errors", ["symbol", "stage"])
+WRITE_POINTS = Gauge("worker_write_points", "BufferedWriter point counters", ["state"])
+
+
+def start_metrics_server(port):
+    start_http_server(port)
+
+
+@contextmanager
+def stage_timer(symbol, stage):
+    """with 블록 소요 시간 기록 (예외가 나면 에러도 세고 그대로 다시 발생)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(symbol, stage).inc()
+        raise
+    finally:
+        STAGE_DURATION.labels(symbol, stage).observe(time.perf_counter() - start)
+
+
+def record_stage(symbol, stage, seconds):
+    """다른 프로세스/콜백에서 잰 소요 시간 기록 (with 블록으로 감쌀 수 없는 경우)"""
+    STAGE_DURATION.labels(symbol, stage).observe(seconds)
+
+
+def record_error(symbol, stage):
+    ERRORS.labels(symbol, stage).inc()
+
+
+def record_cycle_lag(job, interval_sec, offset_sec=0):
+    """지금 시각 - 가장 최근 스케줄 경계(interval 정렬, offset 제외 = 봉 마감 시각)"""
+    now = time.time()
+    boundary = (now - offset_sec) // interval_sec * interval_sec
+    CYCLE_LAG.labels(job).set(now - boundary)
+
+
+def record_write_stats(stats):
+    for state, value in stats.items():
+        WRITE_POINTS.labels(state).set(value)
+
+
+def record_write(seconds, ok):
+    """BufferedWriter on_send 콜백"""
+    STAGE_DURATION.labels(ALL_SYMBOLS, "write").observe(seconds)
+    if not ok:
+        record_error(ALL_SYMBOLS, "write")
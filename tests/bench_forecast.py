@@ -0,0 +1,127 @@
+"""
+예측 모드별 벤치마크 (scripts/forecasting.py)
+- 심볼당 24시간 예측 지연 (캐시 없이 매번 예측 / ForecastCache로 1시간 뒤 구간을 슬라이스)
+- 구간 정확도: 기준(full, --reference-samples번 시뮬레이션) 대비 경계 오차(구간 폭 대비 %)와
+  학습에서 뺀 다음 24개 봉이 구간 안에 들어간 비율(coverage, interval_width=0.8 기준)
+- Worker 기본값은 full. 심볼이 많은 배포는 이 결과를 보고 FORECAST_MODE=analytic 설정 권장
+
+실행: python tests/bench_forecast.py --symbols 3 --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+
+import benchutil  # noqa: F401 (sys.path 준비)
+
+from forecasting import ForecastCache, predict  # noqa
+from model_trainer import quiet_cmdstanpy  # noqa
+from tests.fakes import synthetic_bars  # noqa
+
+HOLDOUT = 24
+
+
+def make_series(symbol, days, seed):
+    """합성 봉 종가에 랜덤 워크 노이즈를 섞은 시계열 (ds, y)"""
+    step_ms = 3_600_000
+    end_ms = int(time.time() * 1000) // step_ms * step_ms
+    bars = synthetic_bars(symbol, end_ms - days * 86_400_000, end_ms, step_ms)
+    close = np.array([bar[4] for bar in bars])
+    rng = np.random.default_rng(seed)
+    close *= np.exp(np.cumsum(rng.normal(0, 0.004, close.size)))
+    ds = pd.to_datetime([bar[0] for bar in bars], unit="ms")
+    return pd.DataFrame({"ds": ds, "y": close})
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=3)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--samples", default="100,200")
+    parser.add_argument("--reference-samples", type=int, default=5000)
+    args = parser.parse_args()
+
+    from prophet import Prophet
+
+    quiet_cmdstanpy()
+    modes = [("full", None)]
+    modes += [("sampled", int(s)) for s in args.samples.split(",")]
+    modes += [("analytic", None)]
+    rows = {
+        mode: {"predict": [], "cached": [], "error": [], "cover": []} for mode in modes
+    }
+
+    for i in range(args.symbols):
+        series = make_series(f"S{i:03d}/USDT", args.days, seed=i)
+        train, holdout = series.iloc[:-HOLDOUT], series.iloc[-HOLDOUT:]
+        model = Prophet(interval_width=0.8).fit(train)
+        future = holdout[["ds"]].reset_index(drop=True)
+
+        np.random.seed(0)
+        model.uncertainty_samples = args.reference_samples
+        reference = model.predict(future)
+        ref_width = (reference["yhat_upper"] - reference["yhat_lower"]).to_numpy()
+
+        for mode, samples in modes:
+            model.uncertainty_samples = 1000  # full 모드 = Prophet 기본값
+            ms, forecast = timed(
+                lambda: predict(model, future, mode, samples), args.repeat
+            )
+            lower = forecast["yhat_lower"].to_numpy()
+            upper = forecast["yhat_upper"].to_numpy()
+            error = (
+                np.abs(lower - reference["yhat_lower"].to_numpy())
+                + np.abs(upper - reference["yhat_upper"].to_numpy())
+            ) / (2 * ref_width)
+            y = holdout["y"].to_numpy()
+
+            # 캐시: 최초 1회 72시간 예측 후, 1시간 뒤 24시간 구간은 슬라이스
+            cache = ForecastCache(mode, samples, cache_hours=72)
+            start = future["ds"].iloc[0]
+            cache.get("S", model, "v1", start, 24)
+            cached_ms, _ = timed(
+                lambda: cache.get(
+                    "S", model, "v1", start + pd.Timedelta(hours=1), 24
+                ),
+                args.repeat,
+            )
+
+            row = rows[(mode, samples)]
+            row["predict"].append(ms)
+            row["cached"].append(cached_ms)
+            row["error"].append(float(np.mean(error)))
+            row["cover"].append(float(np.mean((y >= lower) & (y <= upper))))
+
+    print(
+        f"심볼 {args.symbols}개, 학습 {args.days * 24 - HOLDOUT}봉, 예측 {HOLDOUT}개 "
+        f"(기준: full {args.reference_samples} samples)"
+    )
+    print(
+        f"{'mode':>14} {'predict(ms)':>12} {'cached(ms)':>11} "
+        f"{'bound err':>10} {'coverage':>9}"
+    )
+    for (mode, samples), row in rows.items():
+        label = f"{mode}({samples})" if samples else mode
+        print(
+            f"{label:>14} {statistics.mean(row['predict']):>12.1f} "
+            f"{statistics.mean(row['cached']):>11.2f} "
+            f"{statistics.mean(row['error']):>9.1%} "
+            f"{statistics.mean(row['cover']):>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
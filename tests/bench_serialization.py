@@ -0,0 +1,104 @@
+"""
+API 응답 직렬화 마이크로 벤치마크
+- legacy : to_dict(orient="records") + FastAPI jsonable_encoder + json.dumps (기존 경로)
+- rows   : zip으로 만든 row dict + orjson (기본 포맷, 응답 형태 동일)
+- columnar: 필드별 NumPy 배열 + epoch ms + orjson (format=columnar)
+
+실행: python tests/bench_serialization.py --rows 720 --repeat 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+import benchutil  # noqa: F401 (sys.path 준비)
+
+from api.serialization import HISTORY_COLUMNS, FastJSONResponse, frame_payload  # noqa
+
+
+def make_history(rows):
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(rows).cumsum()
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="h", tz="UTC"),
+            "open": close + rng.standard_normal(rows),
+            "high": close + 2,
+            "low": close - 2,
+            "close": close,
+            "volume": rng.uniform(0, 1000, rows),
+        }
+    )
+
+
+def encode_legacy(df):
+    payload = {"symbol": "BTC/USDT", "data": df.to_dict(orient="records")}
+    # Starlette JSONResponse.render와 같은 설정
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_rows(df):
+    payload = {"symbol": "BTC/USDT", "data": frame_payload(df, HISTORY_COLUMNS)}
+    return FastJSONResponse(payload).body
+
+
+def encode_columnar(df):
+    payload = {
+        "symbol": "BTC/USDT",
+        "data": frame_payload(df, HISTORY_COLUMNS, "columnar"),
+    }
+    return FastJSONResponse(payload).body
+
+
+def bench(fn, df, repeat):
+    fn(df)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(df)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "bytes": len(body),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=720)  # 30일 x 24h
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    df = make_history(args.rows)
+    results = {
+        name: bench(fn, df, args.repeat)
+        for name, fn in [
+            ("legacy", encode_legacy),
+            ("rows", encode_rows),
+            ("columnar", encode_columnar),
+        ]
+    }
+
+    base = results["legacy"]["p50_ms"]
+    print(f"rows={args.rows}, repeat={args.repeat}")
+    for name, r in results.items():
+        print(
+            f"{name:>9}: p50 {r['p50_ms']:8.3f} ms | p99 {r['p99_ms']:8.3f} ms | "
+            f"{r['bytes']:>8} bytes | x{base / r['p50_ms']:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Worker 샤딩 멀티 프로세스 테스트 (거래소 / InfluxDB는 tests/fakes.py, 수집 코드는 그대로 실행)
+- 시나리오마다 Worker 프로세스 W개를 띄우고 심볼 수도 W * --symbols-per-worker로 같이 늘림
+- 모든 Worker가 서로의 heartbeat를 본 뒤 수집 사이클을 반복 -> Worker별 담당 심볼 수 / 사이클 시간
+  (Worker와 심볼이 같이 늘면 replica당 사이클 비용이 거의 일정해야 함)
+- 사이클마다 replica의 CPU 시간(발행 CPU는 따로)을 재서 담당 심볼 1개당 비용으로 비교
+  CPU 수보다 Worker가 많으면 서로 CPU를 나눠 쓰느라 사이클 시간이 늘어나므로
+  사이클을 한 replica씩 차례로 실행해서 (replica마다 CPU 1개가 있는 것처럼) 잼
+  (첫 시나리오 대비 --tolerance 이상 늘면 종료 코드 1)
+- --failover: 마지막 시나리오에서 Worker 1개를 강제 종료(heartbeat 정리 없음)하고
+  남은 Worker들이 전체 심볼을 다시 나눠 맡기까지 걸린 시간 확인
+- --spool-restart: DB 장애 중 spool이 쌓인 Worker를 강제 종료하고 다른 id로 다시 띄워서
+  (컨테이너 재생성) 새 Worker가 이전 spool을 이어받아 재전송하는지 확인
+
+실행: python tests/bench_sharding.py --workers 1,2,4 --symbols-per-worker 10 --failover
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import queue
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchutil import bench_symbols
+
+from tests.fakes import FakeExchange, FakeInflux  # noqa
+
+BUCKET = "bench"
+
+
+def worker_main(
+    worker_id,
+    shard_dir,
+    static_dir,
+    symbols,
+    args,
+    workers,
+    results,
+    stop,
+    turn=None,
+    outage=False,
+):
+    """
+    (Worker 프로세스) 다른 Worker가 모두 보일 때까지 기다린 뒤 stop까지 수집 사이클 반복
+    turn: 있으면 이 lock을 잡은 동안만 사이클 실행 (다른 replica와 CPU를 나눠 쓰지 않음)
+    outage: DB 쓰기가 계속 실패 (재시도 없이 바로 spool)
+    """
+    import pipeline_worker as pw
+    from exchange_client import ExchangeClient
+    from influx_writer import BufferedWriter
+    from ohlcv_store import OHLCVStore
+    from static_publisher import StaticPublisher
+    from symbol_universe import ShardMembership
+
+    # 정적 파일(manifest 포함) / 로컬 저장소 / spool은 모든 Worker가 같은 디렉토리에 씀
+    pw.STATIC_DIR = pw.STATE_DIR = Path(static_dir)
+    pw.static_publisher = StaticPublisher(pw.STATIC_DIR)
+    pw.local_store = OHLCVStore(pw.STATIC_DIR / "ohlcv_store")
+    pw.INFLUXDB_BUCKET = BUCKET
+    pw.TARGET_COINS = symbols
+    pw.WORKER_ID = worker_id
+    pw.shard = ShardMembership(shard_dir, worker_id, args.ttl, args.ttl / 4)
+    pw.shard.start()
+
+    deadline = time.time() + 30
+    while len(pw.shard.members()) < workers and time.time() < deadline:
+        time.sleep(0.1)
+
+    influx = FakeInflux(args.query_latency_ms / 1000, args.write_latency_ms / 1000)
+    influx.fail_writes = outage
+    writer = BufferedWriter(
+        influx,
+        BUCKET,
+        BUCKET,
+        pw.STATE_DIR / f"write_spool_{worker_id}.lp",
+        max_retries=1 if outage else 3,
+        on_flush=pw.notify_data_changed,
+    )
+    exchange = ExchangeClient(min_interval_ms=args.exchange_interval_ms)
+    exchange.exchange = FakeExchange(args.exchange_latency_ms / 1000)
+    executor = ThreadPoolExecutor(max_workers=pw.WORKER_CONCURRENCY)
+    in_flight = {}
+
+    # 발행(JSON/Arrow 압축)에 쓴 CPU 시간은 따로 집계 (호출한 스레드의 thread_time)
+    publish_cpu = [0.0]
+    publish_lock = threading.Lock()
+    publish_bytes = pw.static_publisher.publish_bytes
+
+    def timed_publish_bytes(name, data):
+        start = time.thread_time()
+        try:
+            return publish_bytes(name, data)
+        finally:
+            with publish_lock:
+                publish_cpu[0] += time.thread_time() - start
+
+    pw.static_publisher.publish_bytes = timed_publish_bytes
+
+    cycle = 0
+    while not stop.is_set():
+        with turn or contextlib.nullcontext():
+            start, cpu_start, publish_start = (
+                time.perf_counter(),
+                time.process_time(),
+                publish_cpu[0],
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                pw.run_ingest(executor, in_flight, influx, writer, exchange)
+            elapsed = time.perf_counter() - start
+            cpu = time.process_time() - cpu_start
+            publish = publish_cpu[0] - publish_start
+        record = (worker_id, cycle, len(pw.active_symbols), elapsed, time.time())
+        stats = writer.stats()
+        results.put(record + (cpu, publish, stats["adopted"], stats["replayed"]))
+        cycle += 1
+        stop.wait(max(0.0, args.interval - elapsed))
+
+    pw.shard.leave()
+    with contextlib.redirect_stdout(io.StringIO()):
+        writer.close()
+    executor.shutdown()
+
+
+def per_symbol_ms(records, column):
+    return statistics.median(rec[column] / rec[2] for rec in records) * 1000
+
+
+def run_scenario(context, workers, args, failover):
+    symbols = bench_symbols(workers * args.symbols_per_worker)
+    shard_dir = tempfile.mkdtemp(prefix="bench_shards_")
+    static_dir = tempfile.mkdtemp(prefix="bench_static_")
+    results = context.Queue()
+    stop = context.Event()
+    turn = context.Lock() if workers > os.cpu_count() else None
+    procs = {}
+    for i in range(workers):
+        worker_id = f"w{i}"
+        procs[worker_id] = context.Process(
+            target=worker_main,
+            args=(
+                worker_id,
+                shard_dir,
+                static_dir,
+                symbols,
+                args,
+                workers,
+                results,
+                stop,
+                turn,
+            ),
+        )
+        procs[worker_id].start()
+
+    # 첫 사이클(30일 초기 수집)은 제외하고 --cycles개씩 모일 때까지
+    records = {worker_id: [] for worker_id in procs}
+    deadline = time.time() + args.timeout
+    while min(len(r) for r in records.values()) < args.cycles + 1:
+        if time.time() > deadline:
+            raise RuntimeError(f"timeout: {[len(r) for r in records.values()]}")
+        with contextlib.suppress(queue.Empty):
+            record = results.get(timeout=1)
+            records[record[0]].append(record)
+
+    owned = [r[-1][2] for r in records.values()]
+    steady = [rec for r in records.values() for rec in r[1 : args.cycles + 1]]
+    summary = {
+        "workers": workers,
+        "symbols": len(symbols),
+        "owned_min": min(owned),
+        "owned_max": max(owned),
+        "owned_total": sum(owned),
+        "cycle_mean": statistics.mean(rec[3] for rec in steady),
+        "cycle_max": max(rec[3] for rec in steady),
+        # replica 1개가 심볼 1개에 쓰는 시간 (담당 심볼 수 편차의 영향 제외, 중앙값)
+        "cycle_per_symbol_ms": per_symbol_ms(steady, 3),
+        "cpu_per_symbol_ms": per_symbol_ms(steady, 5),
+        "publish_cpu_per_symbol_ms": per_symbol_ms(steady, 6),
+    }
+
+    if failover:
+        summary["recovery_sec"] = kill_and_recover(
+            procs, records, results, symbols, args, turn
+        )
+
+    stop.set()
+    for proc in procs.values():
+        proc.join(timeout=30)
+    return summary
+
+
+def kill_and_recover(procs, records, results, symbols, args, turn=None):
+    """w0을 강제 종료 -> 남은 Worker들의 최신 담당 수 합이 전체 심볼 수가 될 때까지 시간"""
+    victim = procs.pop("w0")
+    # turn을 잡은 채로 죽으면 아무도 풀 수 없으므로 w0이 사이클 밖일 때 종료
+    with turn or contextlib.nullcontext():
+        victim.kill()
+        victim.join()
+    killed_at = time.time()
+    latest = {worker_id: records[worker_id][-1] for worker_id in procs}
+
+    deadline = killed_at + args.timeout
+    while time.time() < deadline:
+        with contextlib.suppress(queue.Empty):
+            record = results.get(timeout=1)
+            if record[0] in latest:
+                latest[record[0]] = record
+        after_kill = all(r[4] > killed_at for r in latest.values())
+        if after_kill and sum(r[2] for r in latest.values()) == len(symbols):
+            return max(r[4] for r in latest.values()) - killed_at
+    return None
+
+
+def spool_restart(context, args):
+    """
+    DB 장애 중인 Worker(w0)가 spool을 남긴 채 강제 종료 -> 다른 id(w0-new)로 재시작
+    반환: (spool 포인트 수, 이어받아 재전송한 포인트 수, 종료 후 재전송까지 걸린 시간)
+    """
+    symbols = bench_symbols(args.symbols_per_worker)
+    shard_dir = tempfile.mkdtemp(prefix="bench_shards_")
+    static_dir = Path(tempfile.mkdtemp(prefix="bench_static_"))
+    spool_path = static_dir / "write_spool_w0.lp"
+
+    def start(worker_id, outage):
+        # 강제 종료된 프로세스가 잡고 있던 lock이 남지 않도록 Queue / Event는 프로세스별로
+        results, stop = context.Queue(), context.Event()
+        proc = context.Process(
+            target=worker_main,
+            args=(worker_id, shard_dir, static_dir, symbols, args, 1, results, stop),
+            kwargs={"outage": outage},
+        )
+        proc.start()
+        return proc, results, stop
+
+    # 초기 수집 + 다음 사이클까지 끝나면 spool에 두 사이클 치 포인트가 있음
+    old, results, _ = start("w0", outage=True)
+    deadline = time.time() + args.timeout
+    cycles = 0
+    while cycles < 2 or not spool_path.exists():
+        if time.time() > deadline:
+            raise RuntimeError("timeout: spool이 만들어지지 않음")
+        with contextlib.suppress(queue.Empty):
+            results.get(timeout=1)
+            cycles += 1
+    old.kill()  # heartbeat / spool 정리 없이 종료 (컨테이너 강제 재생성)
+    old.join()
+    killed_at = time.time()
+    with open(spool_path) as f:
+        spooled = sum(1 for line in f if line.strip())
+
+    # w0의 heartbeat가 ttl 동안은 살아 있어 보이므로 그 뒤에 이어받음
+    new, results, stop = start("w0-new", outage=False)
+    replayed, recovery_sec = 0, None
+    while time.time() < killed_at + args.timeout:
+        with contextlib.suppress(queue.Empty):
+            record = results.get(timeout=1)
+            if record[7] >= spooled and record[8] >= spooled:
+                replayed, recovery_sec = record[8], record[4] - killed_at
+                break
+    stop.set()
+    new.join(timeout=30)
+    if spool_path.exists():
+        replayed = 0  # 이전 spool이 남아 있으면 실패
+    return spooled, replayed, recovery_sec
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--symbols-per-worker", type=int, default=10)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0, help="사이클 간격(초)")
+    parser.add_argument("--ttl", type=float, default=3.0, help="heartbeat 만료(초)")
+    parser.add_argument("--failover", action="store_true")
+    parser.add_argument("--spool-restart", action="store_true")
+    parser.add_argument("--exchange-latency-ms", type=float, default=20)
+    parser.add_argument("--exchange-interval-ms", type=int, default=20)
+    parser.add_argument("--query-latency-ms", type=float, default=5)
+    parser.add_argument("--write-latency-ms", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="첫 시나리오 대비 허용 증가율"
+    )
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    counts = [int(w) for w in args.workers.split(",")]
+    cpus = os.cpu_count()
+    print(f"CPU {cpus}개 (Worker가 더 많은 시나리오는 사이클을 한 replica씩 차례로 실행)")
+    print(
+        f"{'workers':>7} {'symbols':>7} {'owned/worker':>12} {'total':>5} "
+        f"{'cycle mean(s)':>13} {'cycle max(s)':>12} "
+        f"{'cpu/sym(ms)':>11} {'publish/sym':>11}"
+    )
+    summaries = []
+    for i, workers in enumerate(counts):
+        failover = args.failover and i == len(counts) - 1 and workers > 1
+        s = run_scenario(context, workers, args, failover)
+        summaries.append(s)
+        print(
+            f"{s['workers']:>7} {s['symbols']:>7} "
+            f"{s['owned_min']:>5}-{s['owned_max']:<6} {s['owned_total']:>5} "
+            f"{s['cycle_mean']:>13.3f} {s['cycle_max']:>12.3f} "
+            f"{s['cpu_per_symbol_ms']:>11.1f} {s['publish_cpu_per_symbol_ms']:>11.1f}"
+        )
+
+    # replica당 심볼 1개 비용이 Worker 수와 함께 늘지 않는지 (첫 시나리오 기준)
+    base = summaries[0]
+    metrics = ["cycle_per_symbol_ms", "cpu_per_symbol_ms", "publish_cpu_per_symbol_ms"]
+    ok = True
+    for metric in metrics:
+        worst = max(summaries, key=lambda s: s[metric])
+        ratio = worst[metric] / base[metric]
+        passed = ratio <= 1 + args.tolerance
+        ok = ok and passed
+        print(
+            f"{metric}: workers={base['workers']} {base[metric]:.1f} -> "
+            f"workers={worst['workers']} {worst[metric]:.1f} "
+            f"(x{ratio:.2f}, 허용 x{1 + args.tolerance:.2f}) {'OK' if passed else 'FAIL'}"
+        )
+
+    last = summaries[-1]
+    if "recovery_sec" in last:
+        if last["recovery_sec"] is None:
+            print("failover: 남은 Worker가 전체 심볼을 넘겨받지 못함")
+            sys.exit(1)
+        print(
+            f"failover: w0 강제 종료 후 {last['recovery_sec']:.1f}s 만에 "
+            f"남은 {last['workers'] - 1}개 Worker가 {last['symbols']}개 심볼 전부 담당 "
+            f"(ttl {args.ttl}s)"
+        )
+
+    if args.spool_restart:
+        spooled, replayed, recovery_sec = spool_restart(context, args)
+        passed = recovery_sec is not None and replayed >= spooled
+        ok = ok and passed
+        if passed:
+            print(
+                f"spool: w0 강제 종료 후 {recovery_sec:.1f}s 만에 w0-new가 "
+                f"spool {spooled}개 포인트를 이어받아 재전송 (ttl {args.ttl}s)"
+            )
+        else:
+            print(f"spool: w0의 spool {spooled}개 포인트를 이어받지 못함 (FAIL)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+오프라인 벤치마크 스위트 (네트워크 / Binance / InfluxDB 없이 노트북에서 재현 가능)
+거래소와 InfluxDB는 tests/fakes.py의 가짜 구현을 사용하고, Worker / API 코드는 그대로 실행함.
+
+시나리오
+- worker: 심볼 수별 수집 사이클 시간 (첫 사이클 = 30일 초기 수집, 이후 = 증분)
+- api   : /history, /predict 동시 요청 수별 p50 / p99 지연, 처리량 (uvicorn 별도 프로세스)
+          응답 캐시 있음(cached) / 없음(uncached) / 로컬 OHLCV 저장소(store) 각각
+- static: 정적 스냅샷(json / arrow) 크기와 서빙 지연 (기본: python http.server, --static-base-url로 nginx)
+
+실행:
+  python tests/bench_suite.py run --scenarios worker,api,static
+  python tests/bench_suite.py compare bench_results/old.json bench_results/new.json
+결과는 커밋 해시가 들어간 JSON으로 저장되므로 커밋 간 비교 가능.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchutil import ROOT, bench_symbols, free_port
+
+from tests.fakes import (  # noqa
+    FakeAsyncClient,
+    FakeExchange,
+    FakeInflux,
+    seed_history,
+    seed_predictions,
+)
+
+BUCKET = "bench"
+
+
+def summarize(latencies_ms, elapsed_sec, errors):
+    if not latencies_ms:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "rps": round(len(latencies_ms) / elapsed_sec, 1),
+        "p50_ms": round(statistics.median(latencies_ms), 2),
+        "p90_ms": round(float(np.percentile(latencies_ms, 90)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+    }
+
+
+# worker
+def bench_worker(args):
+    import pipeline_worker as pw
+    from exchange_client import ExchangeClient
+    from influx_writer import BufferedWriter
+    from ohlcv_store import OHLCVStore
+    from static_publisher import StaticPublisher
+
+    # 정적 파일 / 버전 파일 / 로컬 저장소는 임시 디렉토리로
+    static_dir = Path(tempfile.mkdtemp(prefix="bench_static_"))
+    pw.STATIC_DIR = static_dir
+    pw.static_publisher = StaticPublisher(static_dir)
+    pw.local_store = OHLCVStore(static_dir / "ohlcv_store")
+    pw.INFLUXDB_BUCKET = BUCKET
+
+    results = {}
+    for n in args.symbol_counts:
+        pw.TARGET_COINS = bench_symbols(n)
+        for state in (pw.history_windows, pw.rollup_windows, pw.recent_tails):
+            state.clear()
+        pw.history_rebuild_pending.clear()
+
+        influx = FakeInflux(args.query_latency_ms / 1000, args.write_latency_ms / 1000)
+        writer = BufferedWriter(
+            influx,
+            BUCKET,
+            BUCKET,
+            static_dir / "spool.lp",
+            on_flush=pw.notify_data_changed,
+        )
+        exchange = ExchangeClient(min_interval_ms=args.exchange_interval_ms)
+        exchange.exchange = FakeExchange(args.exchange_latency_ms / 1000)
+        executor = ThreadPoolExecutor(max_workers=pw.WORKER_CONCURRENCY)
+        in_flight = {}
+
+        def cycle():
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                pw.run_ingest(executor, in_flight, influx, writer, exchange)
+            return time.perf_counter() - start
+
+        cold = cycle()
+        steady = [cycle() for _ in range(args.cycles)]
+        drain_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            writer.close()
+        drain = time.perf_counter() - drain_start
+        executor.shutdown()
+
+        results[f"symbols={n}"] = {
+            "cold_cycle_sec": round(cold, 3),
+            "steady_cycle_sec_mean": round(statistics.mean(steady), 3),
+            "steady_cycle_sec_max": round(max(steady), 3),
+            "writer_drain_sec": round(drain, 3),
+            "exchange_calls": exchange.exchange.calls,
+            "points_written": influx.counters["points"],
+            "db_queries": influx.counters["queries"],
+        }
+        print(f"[worker] symbols={n}: {results[f'symbols={n}']}")
+    return results
+
+
+# api
+def serve_api(args):
+    """(서브 프로세스) 가짜 InfluxDB를 채워서 API를 uvicorn으로 실행"""
+    import uvicorn
+
+    os.environ["WORKER_EVENTS_HOST"] = ""  # 스트림 hub 비활성화
+    os.environ["INFLUXDB_BUCKET"] = BUCKET
+    os.environ["CACHE_MAX_SIZE"] = str(args.cache_size)
+
+    import api.main as api_main
+    import pandas as pd
+    from scripts.ohlcv_store import OHLCVStore
+
+    symbols = bench_symbols(args.symbols)
+    influx = FakeInflux(query_latency_sec=args.query_latency_ms / 1000)
+    seed_history(influx, symbols, args.days)
+    seed_predictions(influx, symbols)
+
+    api_main.InfluxDBClientAsync = lambda **kwargs: FakeAsyncClient(influx)
+    api_main.STATIC_DIR = Path(tempfile.mkdtemp(prefix="bench_versions_"))
+    api_main.store = None
+    if args.store:
+        # Worker가 DB에서 History를 재생성한 직후와 같은 상태로 저장소를 채움
+        api_main.store = OHLCVStore(tempfile.mkdtemp(prefix="bench_store_"))
+        since = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=args.days)
+        for symbol in symbols:
+            frame = influx.frame("ohlcv", symbol)
+            api_main.store.replace("ohlcv", symbol, frame, since)
+    uvicorn.run(api_main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+async def load(url, concurrency, duration_sec, headers=None):
+    """concurrency개의 클라이언트가 duration_sec 동안 쉬지 않고 요청"""
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30, headers=headers) as http:
+        await http.get(url)  # warm-up (캐시 채우기)
+        deadline = time.perf_counter() + duration_sec
+
+        async def client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await http.get(url)
+                    await response.aread()
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, errors)
+
+
+def wait_until_up(url, timeout_sec=30):
+    deadline = time.time() + timeout_sec
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not start: {url}")
+
+
+@contextlib.contextmanager
+def background_process(cmd, health_url, quiet=False):
+    stderr = subprocess.DEVNULL if quiet else None  # http.server 접근 로그 숨김
+    proc = subprocess.Popen(cmd, cwd=ROOT, stderr=stderr)
+    try:
+        wait_until_up(health_url)
+        yield proc
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def bench_api(args):
+    symbol = bench_symbols(1)[0]
+    endpoints = {
+        "history": f"/history/{symbol}",
+        "history_columnar": f"/history/{symbol}?format=columnar",
+        "predict": f"/predict/{symbol}",
+    }
+    results = {}
+    variants = [("cached", 256, []), ("uncached", 0, []), ("store", 0, ["--store"])]
+    for label, cache_size, extra in variants:
+        port = free_port()
+        cmd = [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            "serve-api",
+            "--port", str(port),
+            "--symbols", str(args.api_symbols),
+            "--days", str(args.days),
+            "--cache-size", str(cache_size),
+            "--query-latency-ms", str(args.query_latency_ms),
+            *extra,
+        ]  # fmt: skip
+        base = f"http://127.0.0.1:{port}"
+        with background_process(cmd, base + "/"):
+            for name, path in endpoints.items():
+                for concurrency in args.concurrency:
+                    key = f"{label}.{name}.c={concurrency}"
+                    results[key] = asyncio.run(
+                        load(base + path, concurrency, args.duration)
+                    )
+                    print(f"[api] {key}: {results[key]}")
+    return results
+
+
+# static
+def publish_static_fixtures(static_dir, days):
+    from static_publisher import StaticPublisher
+
+    influx = FakeInflux()
+    symbol = bench_symbols(1)[0]
+    seed_history(influx, [symbol], days)
+    seed_predictions(influx, [symbol])
+    history = influx.frame("ohlcv", symbol)
+    forecast = influx.frame("prediction", symbol)
+
+    def rows(df):
+        out = df.copy()
+        out.insert(0, "timestamp", df.index.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        return out.to_dict(orient="records")
+
+    publisher = StaticPublisher(static_dir)
+    publisher.publish("history.json", {"symbol": symbol, "data": rows(history)})
+    publisher.publish_frame("history.arrow", history)
+    publisher.publish("prediction.json", {"symbol": symbol, "forecast": rows(forecast)})
+    return json.loads((static_dir / "manifest.json").read_text())["files"]
+
+
+def bench_static(args):
+    static_dir = Path(tempfile.mkdtemp(prefix="bench_served_"))
+    manifest = publish_static_fixtures(static_dir, args.days)
+    results = {
+        f"size.{name}": {k: v for k, v in entry.items() if k.endswith("bytes")}
+        for name, entry in manifest.items()
+    }
+
+    if args.static_base_url:
+        # 실행 중인 nginx 등에 미리 같은 파일을 올려둔 경우 (gzip_static 포함 측정)
+        server = contextlib.nullcontext()
+        base = args.static_base_url.rstrip("/")
+    else:
+        port = free_port()
+        cmd = [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1"]
+        cmd += ["--directory", str(static_dir)]
+        server = background_process(
+            cmd, f"http://127.0.0.1:{port}/manifest.json", quiet=True
+        )
+        base = f"http://127.0.0.1:{port}"
+
+    with server:
+        for name in ["history.json", "history.arrow", "prediction.json"]:
+            for concurrency in args.concurrency:
+                key = f"serve.{name}.c={concurrency}"
+                results[key] = asyncio.run(
+                    load(f"{base}/{name}", concurrency, args.duration)
+                )
+                print(f"[static] {key}: {results[key]}")
+    return results
+
+
+# 결과 저장 / 비교
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args):
+    scenarios = {"worker": bench_worker, "api": bench_api, "static": bench_static}
+    results = {}
+    for name in args.scenarios:
+        results[name] = scenarios[name](args)
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k != "func"},
+        },
+        "results": results,
+    }
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = out_dir / f"bench_{stamp}_{commit}.json"
+    path.write_text(json.dumps(report, indent=2))
+    print(f"결과 저장: {path}")
+
+
+def flatten(tree, prefix=""):
+    flat = {}
+    for key, value in tree.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(args):
+    """두 결과 파일의 같은 지표 비교 (threshold 이상 나빠진 항목 표시, rps는 높을수록 좋음)"""
+    old = json.loads(Path(args.old).read_text())
+    new = json.loads(Path(args.new).read_text())
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+
+    regressions = 0
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        if not before:
+            continue
+        change = (after - before) / before
+        worse = -change if key.endswith("rps") else change
+        mark = "REGRESSION" if worse > args.threshold else ""
+        regressions += bool(mark)
+        print(f"{key:<55} {before:>12} -> {after:>12} ({change:+.1%}) {mark}")
+    sys.exit(1 if regressions else 0)
+
+
+def parse_int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run")
+    p_run.add_argument(
+        "--scenarios",
+        type=lambda v: v.split(","),
+        default=["worker", "api", "static"],
+    )
+    p_run.add_argument(
+        "--symbol-counts", type=parse_int_list, default=[5, 20, 50, 100]
+    )
+    p_run.add_argument("--cycles", type=int, default=3)
+    p_run.add_argument("--concurrency", type=parse_int_list, default=[1, 10, 50])
+    p_run.add_argument("--duration", type=float, default=5.0)
+    p_run.add_argument("--days", type=int, default=30)
+    p_run.add_argument("--api-symbols", type=int, default=5)
+    # 가짜 외부 시스템의 지연 (실제 환경에 맞게 조정)
+    p_run.add_argument("--exchange-latency-ms", type=float, default=20)
+    p_run.add_argument("--exchange-interval-ms", type=int, default=50)
+    p_run.add_argument("--query-latency-ms", type=float, default=5)
+    p_run.add_argument("--write-latency-ms", type=float, default=5)
+    p_run.add_argument("--static-base-url", default=None)
+    p_run.add_argument("--out", default="bench_results")
+    p_run.set_defaults(func=run)
+
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=0.10)
+    p_cmp.set_defaults(func=compare)
+
+    p_serve = sub.add_parser("serve-api")
+    p_serve.add_argument("--port", type=int, required=True)
+    p_serve.add_argument("--symbols", type=int, default=5)
+    p_serve.add_argument("--days", type=int, default=30)
+    p_serve.add_argument("--cache-size", type=int, default=256)
+    p_serve.add_argument("--query-latency-ms", type=float, default=5)
+    p_serve.add_argument("--store", action="store_true", help="로컬 OHLCV 저장소 사용")
+    p_serve.set_defaults(func=serve_api)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    args.func(args)
@@ -0,0 +1,98 @@
+"""
+모델 재학습 벤치마크 (Worker의 프로세스 풀과 같은 방식, InfluxDB 없이 합성 OHLCV 사용)
+- cold : 모델이 없는 상태에서 전체 심볼 학습
+- check: 새 봉이 없을 때 drift 검사만 (재학습 없음)
+- warm : 기존 모델 파라미터로 warm start 재학습 (--force)
+프로세스 수별 라운드 wall-clock / 심볼당 소요 시간 / 1프로세스 대비 speedup 출력
+
+실행: python tests/bench_training.py --symbols 8 --processes 1,2,4 --days 90
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+import benchutil  # noqa: F401 (sys.path 준비)
+
+from model_trainer import refresh_model  # noqa
+from tests.fakes import synthetic_bars  # noqa
+
+
+def make_frames(count, days):
+    step_ms = 3_600_000
+    end_ms = int(time.time() * 1000) // step_ms * step_ms
+    frames = {}
+    for i in range(count):
+        symbol = f"S{i:03d}/USDT"
+        bars = synthetic_bars(symbol, end_ms - days * 86_400_000, end_ms, step_ms)
+        df = pd.DataFrame(bars, columns=["ms", "open", "high", "low", "close", "vol"])
+        df["timestamp"] = pd.to_datetime(df["ms"], unit="ms", utc=True)
+        frames[symbol] = df[["timestamp", "close"]]
+    return frames
+
+
+def warm_up(_):
+    import prophet  # noqa
+
+    time.sleep(0.2)  # 모든 프로세스가 하나씩 받도록
+
+
+def run_round(pool, frames, model_dir, force=False):
+    start = time.perf_counter()
+    futures = [
+        pool.submit(
+            refresh_model,
+            symbol,
+            df,
+            str(model_dir / f"model_{symbol.replace('/', '_')}.json"),
+            None,
+            force,
+        )
+        for symbol, df in frames.items()
+    ]
+    results = [f.result() for f in futures]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=8)
+    parser.add_argument("--processes", default="1,2,4")
+    parser.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    frames = make_frames(args.symbols, args.days)
+    print(f"심볼 {args.symbols}개 x {args.days}일 ({args.days * 24}봉)")
+    print(
+        f"{'processes':>9} {'mode':>5} {'wall(s)':>8} {'per symbol(s)':>14} "
+        f"{'retrained':>9} {'speedup':>8}"
+    )
+
+    baseline = {}
+    context = multiprocessing.get_context("spawn")
+    for processes in [int(p) for p in args.processes.split(",")]:
+        with tempfile.TemporaryDirectory() as tmp, ProcessPoolExecutor(
+            max_workers=processes, mp_context=context
+        ) as pool:
+            # 프로세스 기동 + prophet import 비용은 측정에서 제외
+            list(pool.map(warm_up, range(processes)))
+            model_dir = Path(tmp)
+            for mode, force in [("cold", False), ("check", False), ("warm", True)]:
+                wall, results = run_round(pool, frames, model_dir, force)
+                per_symbol = statistics.mean(r["seconds"] for r in results)
+                retrained = sum(r["retrained"] for r in results)
+                baseline.setdefault(mode, wall)
+                print(
+                    f"{processes:>9} {mode:>5} {wall:>8.2f} {per_symbol:>14.2f} "
+                    f"{retrained:>9} {baseline[mode] / wall:>7.2f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
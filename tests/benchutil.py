@@ -0,0 +1,26 @@
+"""
+벤치 / 하네스 스크립트 공통 준비
+- python tests/<스크립트>.py로 실행하면 tests/가 sys.path에 들어가므로 다른 import보다
+  먼저 `from benchutil import ...` 해서 저장소 루트(api. / scripts. / tests.)와
+  scripts/(pipeline_worker의 형제 모듈 import 방식)를 sys.path에 추가
+"""
+
+import socket
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+for path in (ROOT, ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def bench_symbols(n):
+    return [f"S{i:03d}/USDT" for i in range(n)]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,301 @@
+"""
+오프라인 벤치마크용 가짜 거래소 / InfluxDB (네트워크 없이 Worker, API를 그대로 실행)
+- FakeExchange: ccxt 거래소 대신 합성 OHLCV 생성 (심볼/시각이 같으면 항상 같은 값, 열린 봉만 시간에 따라 변함)
+- FakeInflux: write_api(line protocol) / query_api(query, query_data_frame) / async query_raw
+  Worker, API가 만드는 Flux 쿼리에서 measurement / symbol / range / field / aggregateWindow / tail만
+  해석해서 메모리 저장소로 응답함 (Flux 엔진이 아님)
+"""
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from scripts.flux_queries import OHLCV_AGGREGATES
+from scripts.rollups import bucket_starts
+
+HISTORY_FIELDS = ["open", "high", "low", "close", "volume"]
+FORECAST_FIELDS = ["yhat", "yhat_lower", "yhat_upper"]
+
+
+def symbol_seed(symbol):
+    return zlib.crc32(symbol.encode())
+
+
+def synthetic_bars(symbol, start_ms, end_ms, step_ms, now_ms=None):
+    """
+    [start_ms, end_ms] 구간의 합성 OHLCV (ccxt fetch_ohlcv 형식)
+    마지막(현재 진행 중인) 봉은 now_ms에 따라 close/high/low/volume이 바뀜
+    """
+    if end_ms < start_ms:
+        return []
+    first = start_ms - start_ms % step_ms
+    times = np.arange(first, end_ms + 1, step_ms, dtype=np.int64)
+    times = times[times >= start_ms]
+    if times.size == 0:
+        return []
+
+    seed = symbol_seed(symbol)
+    base = 10 + seed % 50000
+    phase = (times // step_ms).astype(np.float64)
+    # 심볼마다 다른 주기/진폭의 결정적 가격 곡선
+    wave = 0.05 * np.sin(phase / (24 + seed % 13)) + 0.01 * np.sin(phase / 3)
+    mid = base * (1 + wave)
+    opens = mid * (1 - 0.002 * np.cos(phase))
+    closes = mid * (1 + 0.002 * np.sin(phase * 1.7))
+    volume = 100 + (seed % 997) + 50 * np.abs(np.sin(phase / 5))
+
+    if now_ms is not None and times[-1] <= now_ms < times[-1] + step_ms:
+        progress = (now_ms - times[-1]) / step_ms  # 열린 봉 진행률
+        closes[-1] = opens[-1] * (1 + 0.003 * np.sin(now_ms / 7_000))
+        volume[-1] *= max(progress, 0.01)
+
+    highs = np.maximum(opens, closes) * 1.003
+    lows = np.minimum(opens, closes) * 0.997
+    return [
+        [int(t), float(o), float(h), float(l_), float(c), float(v)]
+        for t, o, h, l_, c, v in zip(times, opens, highs, lows, closes, volume)
+    ]
+
+
+class FakeExchange:
+    """ExchangeClient.exchange 대신 쓰는 ccxt 호환 객체 (latency_sec: 요청당 네트워크 지연 흉내)"""
+
+    rateLimit = 50
+
+    def __init__(self, latency_sec=0.0):
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return int(pd.Timedelta(timeframe).total_seconds())
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=1000):
+        with self._lock:
+            self.calls += 1
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        step_ms = self.parse_timeframe(timeframe) * 1000
+        now_ms = int(time.time() * 1000)
+        end_ms = min(now_ms, since + step_ms * (limit - 1))
+        return synthetic_bars(symbol, since, end_ms, step_ms, now_ms)
+
+
+def parse_line(line):
+    """'ohlcv,symbol=BTC/USDT open=1.0,close=2.0 1700000000000000000' -> (measurement, tags, fields, ns)"""
+    head, field_part, ts = line.rsplit(" ", 2)
+    measurement, *tag_parts = head.split(",")
+    tags = dict(t.split("=", 1) for t in tag_parts)
+    fields = {}
+    for item in field_part.split(","):
+        key, value = item.split("=", 1)
+        fields[key] = float(value[:-1] if value.endswith("i") else value)
+    return measurement, tags, fields, int(ts)
+
+
+def parse_flux_time(value, now):
+    """-30d / 2d / 2024-01-01T00:00:00Z -> Timestamp"""
+    match = re.fullmatch(r"(-?)(\d+)(ns|us|ms|s|m|h|d|w|mo|y)", value)
+    if not match:
+        return pd.Timestamp(value)
+    sign, amount, unit = match.groups()
+    amount = int(amount)
+    if unit == "mo":
+        amount, unit = amount * 30, "d"
+    elif unit == "y":
+        amount, unit = amount * 365, "d"
+    elif unit == "m":
+        unit = "min"
+    delta = pd.Timedelta(amount, unit=unit)
+    return now - delta if sign else now + delta
+
+
+class FakeTable:
+    def __init__(self, records):
+        self.records = records
+
+
+class FakeRecord:
+    def __init__(self, values):
+        self.values = values
+
+    def get_time(self):
+        return self.values["_time"]
+
+
+class FakeInflux:
+    """measurement/symbol별 시계열을 메모리에 저장하는 InfluxDB 대역 (query_latency_sec: 쿼리당 지연)"""
+
+    def __init__(self, query_latency_sec=0.0, write_latency_sec=0.0):
+        self.query_latency_sec = query_latency_sec
+        self.write_latency_sec = write_latency_sec
+        self.fail_writes = False  # True면 DB 장애처럼 write가 예외 (spool 테스트)
+        self._series = {}  # (measurement, symbol) -> {ns: {field: value}}
+        self._frames = {}  # (measurement, symbol) -> DataFrame 캐시 (쓰기 시 무효화)
+        self._lock = threading.Lock()
+        self.counters = {"writes": 0, "points": 0, "queries": 0}
+
+    # 쓰기
+    def write(self, bucket=None, org=None, record=None, **kwargs):
+        if self.write_latency_sec:
+            time.sleep(self.write_latency_sec)
+        if self.fail_writes:
+            raise ConnectionError("fake InfluxDB outage")
+        lines = [record] if isinstance(record, str) else record
+        with self._lock:
+            for line in lines:
+                measurement, tags, fields, ns = parse_line(line)
+                key = (measurement, tags.get("symbol"))
+                self._series.setdefault(key, {}).setdefault(ns, {}).update(fields)
+                self._frames.pop(key, None)
+            self.counters["writes"] += 1
+            self.counters["points"] += len(lines)
+
+    def write_df(self, measurement, symbol, df):
+        """벤치마크 준비용: DatetimeIndex DataFrame을 바로 저장"""
+        with self._lock:
+            series = self._series.setdefault((measurement, symbol), {})
+            stamps = df.index.as_unit("ns").asi8
+            for ts, row in zip(stamps, df.to_dict(orient="records")):
+                series.setdefault(int(ts), {}).update(row)
+            self._frames.pop((measurement, symbol), None)
+
+    def write_api(self):
+        return self
+
+    # 조회
+    def frame(self, measurement, symbol):
+        key = (measurement, symbol)
+        with self._lock:
+            df = self._frames.get(key)
+            if df is None:
+                series = self._series.get(key)
+                if not series:
+                    return None
+                df = pd.DataFrame.from_dict(series, orient="index").sort_index()
+                df.index = pd.to_datetime(df.index, unit="ns", utc=True)
+                self._frames[key] = df
+            return df
+
+    def run_query(self, query):
+        """Flux 쿼리 -> 심볼별로 합친 DataFrame (_time, symbol, 필드들)"""
+        self.counters["queries"] += 1
+        if self.query_latency_sec:
+            time.sleep(self.query_latency_sec)
+
+        now = pd.Timestamp.now(tz="UTC")
+        measurement = re.search(r'r\["_measurement"\] == "([^"]+)"', query).group(1)
+        symbols = re.findall(r'r\["symbol"\] == "([^"]+)"', query)
+        fields = list(dict.fromkeys(re.findall(r'r\["_field"\] == "([^"]+)"', query)))
+        start_match = re.search(r"range\(start: ([^,)]+)", query)
+        start = parse_flux_time(start_match.group(1), now)
+        stop_match = re.search(r"range\([^)]*stop: ([^,)]+)", query)
+        stop = parse_flux_time(stop_match.group(1), now) if stop_match else now
+        every = re.search(r"aggregateWindow\(every: (\w+)", query)
+        tail = re.search(r"tail\(n: (\d+)\)", query)
+        last_only = "last(column" in query
+
+        frames = []
+        for symbol in symbols:
+            df = self.frame(measurement, symbol)
+            if df is None:
+                continue
+            df = df[(df.index >= start) & (df.index < stop)]
+            if fields:
+                df = df[[f for f in fields if f in df.columns]]
+            if df.empty:
+                continue
+            if every:
+                # aggregateWindow(timeSrc: "_start"): 창 시작 시각 / OHLCV는 필드별 집계
+                aggs = {
+                    f: OHLCV_AGGREGATES.get(f, "mean")
+                    if measurement.startswith("ohlcv")
+                    else "mean"
+                    for f in df.columns
+                }
+                # Flux처럼 첫 창은 range 시작에서 잘림 -> 그 봉의 _start는 start
+                starts = bucket_starts(df.index, every.group(1))
+                df = df.groupby(starts.where(starts >= start, start)).agg(aggs)
+            if last_only:
+                df = df.iloc[-1:][[]]
+            elif tail:
+                df = df.tail(int(tail.group(1)))
+            df = df.rename_axis("_time").reset_index()
+            df.insert(1, "symbol", symbol)
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def query_api(self):
+        return self
+
+    def query(self, query, **kwargs):
+        """query_last_times용 (FluxTable / FluxRecord 흉내)"""
+        df = self.run_query(query)
+        return [FakeTable([FakeRecord(row) for row in df.to_dict(orient="records")])]
+
+    def query_data_frame(self, query, **kwargs):
+        return self.run_query(query)
+
+    def close(self):
+        pass
+
+
+class FakeAsyncQueryApi:
+    def __init__(self, influx):
+        self.influx = influx
+
+    async def query_raw(self, query, org=None, dialect=None):
+        df = self.influx.run_query(query)
+        if df.empty:
+            return ""
+        df.insert(0, "table", 0)
+        df.insert(0, "result", "_result")
+        df["_time"] = df["_time"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return df.to_csv(index_label="")
+
+
+class FakeAsyncClient:
+    """InfluxDBClientAsync 대역 (api.main.lifespan에서 생성되는 자리에 넣어서 사용)"""
+
+    def __init__(self, influx):
+        self.influx = influx
+
+    def query_api(self):
+        return FakeAsyncQueryApi(self.influx)
+
+    async def close(self):
+        pass
+
+
+def seed_history(influx, symbols, days, timeframe="1h"):
+    """심볼별 과거 OHLCV를 저장소에 미리 채움 (API 벤치마크 준비)"""
+    step_ms = FakeExchange.parse_timeframe(timeframe) * 1000
+    now_ms = int(time.time() * 1000)
+    for symbol in symbols:
+        start_ms = now_ms - days * 86_400_000
+        bars = synthetic_bars(symbol, start_ms, now_ms, step_ms, now_ms)
+        df = pd.DataFrame(bars, columns=["timestamp", *HISTORY_FIELDS])
+        df.index = pd.to_datetime(df.pop("timestamp"), unit="ms", utc=True)
+        influx.write_df("ohlcv", symbol, df)
+
+
+def seed_predictions(influx, symbols, hours=24):
+    """심볼별 미래 24시간 예측값을 저장소에 미리 채움"""
+    start = pd.Timestamp.now(tz="UTC").floor("h") + pd.Timedelta(hours=1)
+    index = pd.date_range(start, periods=hours, freq="h")
+    for symbol in symbols:
+        base = 10 + symbol_seed(symbol) % 50000
+        yhat = base * (1 + 0.01 * np.sin(np.arange(hours) / 4))
+        df = pd.DataFrame(
+            {"yhat": yhat, "yhat_lower": yhat * 0.98, "yhat_upper": yhat * 1.02},
+            index=index,
+        )
+        influx.write_df("prediction", symbol, df)
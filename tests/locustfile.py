@@ -1,33 +1,336 @@
-from locust import HttpUser, task, between
-import json
+"""
+부하 테스트 프로필 (locust)
+- DashboardUser: 대시보드 사용자 (static history/prediction JSON, 인기 심볼일수록 자주 조회)
+- ApiBurstUser: /history, /predict를 짧은 간격으로 연속 호출 (FastAPI)
+- CacheBustingUser: 무작위 심볼/구간 -> API 캐시 미스 유도 (없는 심볼은 404가 정상)
+모든 응답은 형식 + 신선도(updated_at / 마지막 봉 시각)를 검사하고 어긋나면 실패로 기록함
 
+부하 모양 (LOAD_MODE)
+- step: STEP_USERS씩 STEP_SEC마다 늘려서 STEP_COUNT단계까지 -> 어디서 SLO가 깨지는지 확인
+- soak: SOAK_RAMP_SEC 동안 SOAK_USERS까지 올린 뒤 SOAK_SEC 유지 -> 장시간 누수/지연 증가 확인
+- 없음: -u / -r / -t 그대로
+종료 시 SLO(SLO_P95_MS / SLO_P99_MS / SLO_FAIL_RATIO)를 넘으면 exit code 1
 
-class CoinUser(HttpUser):
+실행 예:
+  LOAD_MODE=step locust -f tests/locustfile.py --headless DashboardUser ApiBurstUser
+호스트는 STATIC_HOST(nginx) / API_HOST(FastAPI)로 지정
+(--host를 주면 모든 User에 같은 호스트가 적용되므로 주지 않음)
+"""
+
+import os
+import random
+from datetime import datetime, timezone
+
+from locust import HttpUser, LoadTestShape, between, events, task
+from locust.runners import WorkerRunner
+
+STATIC_HOST = os.getenv("STATIC_HOST", "http://localhost")
+API_HOST = os.getenv("API_HOST", "http://localhost:8000")
+
+# 심볼별 인기도 (대시보드에서 조회되는 비율) "BTC/USDT:40,ETH/USDT:25,..."
+SYMBOL_WEIGHTS = os.getenv(
+    "SYMBOL_WEIGHTS", "BTC/USDT:40,ETH/USDT:25,SOL/USDT:15,XRP/USDT:10,DOGE/USDT:10"
+)
+WEIGHTED_SYMBOLS = [
+    (item.split(":")[0], float(item.split(":")[1]))
+    for item in SYMBOL_WEIGHTS.split(",")
+    if item.strip()
+]
+SYMBOLS = [symbol for symbol, _ in WEIGHTED_SYMBOLS]
+
+# 신선도 기준: 1시간 봉 + 매시 예측이므로 기본 2시간까지 허용
+HISTORY_MAX_AGE_SEC = int(os.getenv("HISTORY_MAX_AGE_SEC", "7200"))
+PREDICTION_MAX_AGE_SEC = int(os.getenv("PREDICTION_MAX_AGE_SEC", "7200"))
+
+# CacheBustingUser에서 없는 심볼을 섞는 비율
+UNKNOWN_SYMBOL_RATIO = float(os.getenv("UNKNOWN_SYMBOL_RATIO", "0.1"))
+
+# 부하 모양
+LOAD_MODE = os.getenv("LOAD_MODE", "")
+STEP_USERS = int(os.getenv("STEP_USERS", "20"))
+STEP_SPAWN_RATE = float(os.getenv("STEP_SPAWN_RATE", "5"))
+STEP_SEC = int(os.getenv("STEP_SEC", "120"))
+STEP_COUNT = int(os.getenv("STEP_COUNT", "5"))
+SOAK_USERS = int(os.getenv("SOAK_USERS", "100"))
+SOAK_RAMP_SEC = int(os.getenv("SOAK_RAMP_SEC", "300"))
+SOAK_SEC = int(os.getenv("SOAK_SEC", "3600"))
+
+# SLO (전체 + 요청 이름별, 0이면 검사 안 함)
+SLO_P95_MS = float(os.getenv("SLO_P95_MS", "500"))
+SLO_P99_MS = float(os.getenv("SLO_P99_MS", "1500"))
+SLO_FAIL_RATIO = float(os.getenv("SLO_FAIL_RATIO", "0.01"))
+SLO_MIN_REQUESTS = int(os.getenv("SLO_MIN_REQUESTS", "20"))  # 이보다 적으면 이름별 검사 제외
+
+
+def pick_symbol():
+    symbols, weights = zip(*WEIGHTED_SYMBOLS)
+    return random.choices(symbols, weights=weights)[0]
+
+
+def safe_name(symbol):
+    return symbol.replace("/", "_")
+
+
+def age_sec(value):
+    """ISO 8601 시각 -> 지금까지 지난 초"""
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return (datetime.now(timezone.utc) - ts).total_seconds()
+
+
+def check(response, validate, expected=(200,)):
+    """
+    상태 코드 + JSON 형식 + validate(body) 검사
+    validate는 문제가 있으면 사유 문자열, 없으면 None -> 사유가 locust 실패 통계에 그대로 남음
+    """
+    if response.status_code == 0:
+        response.failure(f"Network Fail: {response.error}")
+        return
+    if response.status_code not in expected:
+        response.failure(f"Status {response.status_code}")
+        return
+    if response.status_code != 200:
+        response.success()  # 예상된 에러 응답 (예: 없는 심볼 404)
+        return
+    try:
+        body = response.json()
+    except ValueError:
+        response.failure("JSON Decode Error")
+        return
+    try:
+        error = validate(body)
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        error = f"Malformed body: {e!r}"
+    if error:
+        response.failure(error)
+    else:
+        response.success()
+
+
+def fresh(value, max_age_sec, what):
+    age = age_sec(value)
+    if age > max_age_sec:
+        return f"Stale {what}: {int(age)}s old"
+    return None
+
+
+def validate_static_history(symbol):
+    def validate(body):
+        if body["symbol"] != symbol:
+            return f"Wrong symbol: {body['symbol']}"
+        rows = body["data"]
+        if not rows:
+            return "Empty history"
+        last = rows[-1]
+        if not last["low"] <= min(last["open"], last["close"]) <= last["high"]:
+            return f"Invalid OHLC: {last}"
+        return fresh(body["updated_at"], HISTORY_MAX_AGE_SEC, "history")
+
+    return validate
+
+
+def validate_static_prediction(symbol):
+    def validate(body):
+        if body["symbol"] != symbol:
+            return f"Wrong symbol: {body['symbol']}"
+        rows = body["forecast"]
+        if not rows:
+            return "Empty forecast"
+        first = rows[0]
+        if not first["lower_bound"] <= first["price"] <= first["upper_bound"]:
+            return f"Invalid bounds: {first}"
+        return fresh(body["updated_at"], PREDICTION_MAX_AGE_SEC, "prediction")
+
+    return validate
+
+
+def validate_api_history(symbol):
+    def validate(body):
+        if body["symbol"] != symbol:
+            return f"Wrong symbol: {body['symbol']}"
+        rows = body["data"]
+        if not rows or body["count"] != len(rows):
+            return f"count {body['count']} != rows {len(rows)}"
+        # 마지막 봉 시작 시각 = 봉 간격(1h) + 수집 지연 이내여야 함
+        return fresh(rows[-1]["timestamp"], HISTORY_MAX_AGE_SEC, "last bar")
+
+    return validate
+
+
+def validate_api_predict(symbol):
+    def validate(body):
+        if body["symbol"] != symbol:
+            return f"Wrong symbol: {body['symbol']}"
+        rows = body["forecast"]
+        if not rows:
+            return "Empty forecast"
+        # API는 미래 예측값만 반환 -> 마지막 예측 시각은 지금 이후여야 함
+        if age_sec(rows[-1]["timestamp"]) > 0:
+            return f"Forecast in the past: {rows[-1]['timestamp']}"
+        return None
+
+    return validate
+
+
+class DashboardUser(HttpUser):
+    """대시보드 사용자: 심볼 하나를 골라 차트(history) + 예측(prediction) 정적 파일 조회"""
+
+    host = STATIC_HOST
+    weight = 8
     wait_time = between(1, 3)
 
-    # @task
-    # def predict_btc(self):
-    #     with self.client.get("/predict/BTC/USDT", catch_response=True) as response:
-
-    #         if response.status_code == 0:
-    #             print(f"\nStatus 0 Detected!")
-    #             print(f"Reason: {response.error}")
-    #             response.failure(f"Network Fail: {response.error}")
-    #             return
-
-    #         if response.status_code != 200:
-    #             print(
-    #                 f"[ERROR] Status: {response.status_code} | Body: {response.text[:50]}..."
-    #             )
-    #             response.failure(f"Status {response.status_code}")
-    #             return
-
-    #         try:
-    #             response.json()
-    #         except json.JSONDecodeError:
-    #             response.failure("JSON Decode Error")
-                
-    @task
-    def get_static_prediction(self):
-        with self.client.get("/static/prediction_BTC_USDT.json", catch_response=True) as response:
-            pass
\ No newline at end of file
+    @task(3)
+    def static_history(self):
+        symbol = pick_symbol()
+        with self.client.get(
+            f"/static/history_{safe_name(symbol)}.json",
+            name="/static/history_[symbol].json",
+            catch_response=True,
+        ) as response:
+            check(response, validate_static_history(symbol))
+
+    @task(2)
+    def static_prediction(self):
+        symbol = pick_symbol()
+        with self.client.get(
+            f"/static/prediction_{safe_name(symbol)}.json",
+            name="/static/prediction_[symbol].json",
+            catch_response=True,
+        ) as response:
+            check(response, validate_static_prediction(symbol))
+
+
+class ApiBurstUser(HttpUser):
+    """API 연속 호출: 짧은 대기로 /history, /predict를 몰아서 호출 (캐시 적중 경로)"""
+
+    host = API_HOST
+    weight = 1
+    wait_time = between(0.05, 0.2)
+
+    @task(3)
+    def history(self):
+        symbol = pick_symbol()
+        with self.client.get(
+            f"/history/{symbol}",
+            params={"start": "-7d"},
+            name="/history/[symbol]",
+            catch_response=True,
+        ) as response:
+            check(response, validate_api_history(symbol))
+
+    @task(2)
+    def predict(self):
+        symbol = pick_symbol()
+        with self.client.get(
+            f"/predict/{symbol}", name="/predict/[symbol]", catch_response=True
+        ) as response:
+            check(response, validate_api_predict(symbol))
+
+
+class CacheBustingUser(HttpUser):
+    """
+    캐시 무력화: 심볼(없는 심볼 포함) / 시작 시각 / limit을 무작위로 골라
+    매 요청이 다른 캐시 키가 되도록 함 -> InfluxDB까지 내려가는 경로의 지연 측정
+    """
+
+    host = API_HOST
+    weight = 1
+    wait_time = between(0.5, 2)
+
+    def random_symbol(self):
+        if random.random() < UNKNOWN_SYMBOL_RATIO:
+            return f"NONE{random.randint(0, 10**6)}/USDT", True
+        return random.choice(SYMBOLS), False
+
+    @task(3)
+    def history(self):
+        symbol, unknown = self.random_symbol()
+        with self.client.get(
+            f"/history/{symbol}",
+            params={
+                "start": f"-{random.randint(24, 30 * 24)}h",
+                "limit": random.randint(10, 720),
+            },
+            name="/history/[symbol] (bust)",
+            catch_response=True,
+        ) as response:
+            check(
+                response,
+                validate_api_history(symbol),
+                expected=(404,) if unknown else (200,),
+            )
+
+    @task(1)
+    def predict(self):
+        symbol, unknown = self.random_symbol()
+        with self.client.get(
+            f"/predict/{symbol}", name="/predict/[symbol] (bust)", catch_response=True
+        ) as response:
+            check(
+                response,
+                validate_api_predict(symbol),
+                expected=(404,) if unknown else (200,),
+            )
+
+
+# LoadTestShape는 정의되어 있으면 항상 사용되므로 LOAD_MODE를 지정했을 때만 정의
+if LOAD_MODE == "step":
+
+    class StepLoadShape(LoadTestShape):
+        """STEP_SEC마다 STEP_USERS명씩 늘림 (STEP_COUNT단계 후 종료)"""
+
+        def tick(self):
+            step = int(self.get_run_time() // STEP_SEC) + 1
+            if step > STEP_COUNT:
+                return None
+            return step * STEP_USERS, STEP_SPAWN_RATE
+
+elif LOAD_MODE == "soak":
+
+    class SoakLoadShape(LoadTestShape):
+        """SOAK_RAMP_SEC 동안 SOAK_USERS명까지 올린 뒤 SOAK_SEC 동안 유지"""
+
+        def tick(self):
+            if self.get_run_time() > SOAK_RAMP_SEC + SOAK_SEC:
+                return None
+            return SOAK_USERS, SOAK_USERS / max(SOAK_RAMP_SEC, 1)
+
+elif LOAD_MODE:
+    raise ValueError(f"Unknown LOAD_MODE: {LOAD_MODE} (step, soak)")
+
+
+def slo_violations(entry, label):
+    violations = []
+    if entry.num_requests == 0:
+        return violations
+    p95 = entry.get_response_time_percentile(0.95)
+    p99 = entry.get_response_time_percentile(0.99)
+    if SLO_P95_MS and p95 > SLO_P95_MS:
+        violations.append(f"{label}: p95 {p95:.0f}ms > {SLO_P95_MS:.0f}ms")
+    if SLO_P99_MS and p99 > SLO_P99_MS:
+        violations.append(f"{label}: p99 {p99:.0f}ms > {SLO_P99_MS:.0f}ms")
+    if SLO_FAIL_RATIO and entry.fail_ratio > SLO_FAIL_RATIO:
+        violations.append(
+            f"{label}: fail ratio {entry.fail_ratio:.2%} > {SLO_FAIL_RATIO:.2%}"
+        )
+    return violations
+
+
+@events.quitting.add_listener
+def check_slo(environment, **kwargs):
+    """종료 시 SLO 검사 -> 하나라도 넘으면 exit code 1 (CI에서 실행 실패로 처리)"""
+    if isinstance(environment.runner, WorkerRunner):
+        return  # 분산 실행에서는 전체 통계를 가진 master에서만 검사
+
+    stats = environment.stats
+    violations = slo_violations(stats.total, "Total")
+    for (name, method), entry in sorted(stats.entries.items()):
+        if entry.num_requests >= SLO_MIN_REQUESTS:
+            violations.extend(slo_violations(entry, f"{method} {name}"))
+
+    if violations:
+        print("SLO 위반:")
+        for line in violations:
+            print(f"  - {line}")
+        environment.process_exit_code = 1
+    else:
+        print("SLO 통과")
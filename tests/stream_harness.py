@@ -0,0 +1,134 @@
+"""
+/stream/{symbol} (SSE) 부하 테스트 하네스
+- 이 프로세스 안에서 Worker 쪽 EventPublisher + API(uvicorn)를 띄우고 (InfluxDB는 tests/fakes.py)
+- 구독자 N개가 접속해 snapshot을 받은 뒤, 이벤트 K개를 publish해서
+  모든 구독자가 전부 받았는지 / publish -> 수신 지연(p50, p99)을 측정
+
+실행: python tests/stream_harness.py --subscribers 500 --events 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+import uvicorn
+
+from benchutil import free_port
+
+from scripts.event_bus import EventPublisher, bars_event  # noqa
+from tests.fakes import FakeAsyncClient, FakeInflux, seed_history  # noqa
+
+SYMBOL = "BTC/USDT"
+COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+async def subscriber(http, url, expected, latencies, ready):
+    """snapshot 수신 후 ready 표시, 이벤트 expected개를 받을 때까지 대기"""
+    received = 0
+    event = None
+    async with http.stream("GET", url) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                if event == "snapshot":
+                    ready.release()
+                elif event == "bars":
+                    payload = json.loads(line[6:])
+                    latencies.append((time.time() - payload["published_at"]) * 1000)
+                    received += 1
+                    if received >= expected:
+                        break
+    return received
+
+
+async def run(args):
+    publisher = EventPublisher(host="127.0.0.1", port=0)
+    os.environ["WORKER_EVENTS_HOST"] = "127.0.0.1"
+    os.environ["WORKER_EVENTS_PORT"] = str(publisher.port)
+    os.environ.setdefault("INFLUXDB_URL", "http://127.0.0.1:8086")  # 접속은 안 함
+
+    import api.main as api_main
+
+    port = free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(api_main.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    # snapshot용 최근 1일치 봉만 있는 InfluxDB 대역 (prediction은 빈 결과)
+    influx = FakeInflux()
+    seed_history(influx, [SYMBOL], days=1)
+    await api_main.client.close()
+    api_main.client = FakeAsyncClient(influx)
+    while publisher.subscribers() == 0:  # API 프로세스의 hub가 접속할 때까지
+        await asyncio.sleep(0.05)
+
+    url = f"http://127.0.0.1:{port}/stream/{SYMBOL}"
+    limits = httpx.Limits(max_connections=args.subscribers + 10)
+    latencies = []
+    ready = asyncio.Semaphore(0)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(subscriber(http, url, args.events, latencies, ready))
+            for _ in range(args.subscribers)
+        ]
+        for _ in range(args.subscribers):
+            await ready.acquire()
+        connect_sec = time.perf_counter() - start
+
+        rng = np.random.default_rng(0)
+        for _ in range(args.events):
+            ts = pd.Timestamp.now(tz="UTC").floor("h")
+            bar = pd.DataFrame(
+                {c: [float(v)] for c, v in zip(COLUMNS, rng.uniform(90, 110, 5))},
+                index=pd.DatetimeIndex([ts]),
+            )
+            publisher.publish(bars_event(SYMBOL, "1h", bar, COLUMNS))
+            await asyncio.sleep(args.interval)
+
+        received = await asyncio.wait_for(asyncio.gather(*tasks), timeout=60)
+
+    stats = api_main.hub.stats()
+    server.should_exit = True
+    await server_task
+    publisher.close()
+
+    delivered = sum(received)
+    expected = args.subscribers * args.events
+    print(
+        f"subscribers={args.subscribers}, events={args.events}, "
+        f"connect+snapshot {connect_sec:.2f}s"
+    )
+    print(f"delivered {delivered}/{expected} ({delivered / expected:.1%})")
+    if latencies:
+        print(
+            f"latency p50 {statistics.median(latencies):.1f} ms | "
+            f"p99 {np.percentile(latencies, 99):.1f} ms | max {max(latencies):.1f} ms"
+        )
+    print(f"hub: {stats}")
+    return delivered == expected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+    ok = asyncio.run(run(args))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()